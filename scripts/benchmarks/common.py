@@ -0,0 +1,81 @@
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+# Metrics where a bigger value is better; all others are "lower is better"
+HIGHER_IS_BETTER = {"updates_per_sec", "ops_per_sec"}
+# Counters and single-sample extremes are reported but never compared
+NOT_COMPARED = {"updates", "operations", "max_ms"}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def environment() -> Dict[str, str]:
+    return {"python": sys.version.split()[0], "implementation": platform.python_implementation(), "machine": platform.machine()}
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--save", type=Path, help="Write results as a JSON baseline to this path")
+    parser.add_argument("--baseline", type=Path, help="Compare results against a previously saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default: 0.10)")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare numeric metrics of two result sets.
+
+    Args:
+        current: Fresh results
+        baseline: Saved baseline results
+        tolerance: Allowed relative regression
+
+    Returns:
+        List[str]: Human readable descriptions of regressions
+    """
+    regressions: List[str] = []
+    for scenario, metrics in current.get("results", {}).items():
+        base_metrics = baseline.get("results", {}).get(scenario)
+        if not base_metrics:
+            continue
+        for name, value in metrics.items():
+            if name in NOT_COMPARED:
+                continue
+            base = base_metrics.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            regressed = change < -tolerance if name in HIGHER_IS_BETTER else change > tolerance
+            marker = "REGRESSION" if regressed else "ok"
+            print(f"  [{marker:>10}] {scenario}.{name}: {base:.4g} -> {value:.4g} ({change:+.1%})")
+            if regressed:
+                regressions.append(f"{scenario}.{name}")
+    return regressions
+
+
+def finalize(report: Dict[str, Any], args: argparse.Namespace) -> int:
+    """Print the report, save and/or compare it. Returns the process exit code."""
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Baseline saved: {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        print(f"Comparison with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
@@ -0,0 +1,120 @@
+"""
+Router dispatch benchmark.
+
+Registers `--handlers` callback handlers (one CallbackData class each, compact and plain
+prefixes mixed) and as many command handlers, spread over a few nested routers like the
+bot's `main` → feature routers tree, and measures the time to route a callback query and a
+command to the last registered handler with the plain aiogram `Router` and `IndexedRouter`.
+
+Usage:
+    python -m scripts.benchmarks.dispatch --handlers 120 --save bench/dispatch.json
+    python -m scripts.benchmarks.dispatch --baseline bench/dispatch.json
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Type
+
+from aiogram import Bot, F, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery, Chat, Message, TelegramObject, User
+
+from scripts.benchmarks.common import add_baseline_arguments, environment, finalize
+from src.callbacks.codec import CompactCallbackData
+from src.infrastructure.telegram.router import IndexedRouter
+
+CODE_BASE = 10_000
+USER = User(id=1, is_bot=False, first_name="Bench")
+
+
+def callback_classes(count: int) -> List[Type[CallbackData]]:
+    classes: List[Type[CallbackData]] = []
+    for number in range(count):
+        if number % 2:
+            cls = type(f"Plain{number}", (CallbackData,), {"__annotations__": {"value": int}}, prefix=f"plain{number}")
+        else:
+            cls = type(
+                f"Compact{number}",
+                (CompactCallbackData,),
+                {"__annotations__": {"value": int}},
+                prefix=f"compact{number}",
+                code=CODE_BASE + number,
+            )
+        classes.append(cls)
+    return classes
+
+
+def build_tree(router_class: Type[Router], classes: List[Type[CallbackData]], routers: int) -> Router:
+    async def handler(event: TelegramObject) -> bool:
+        return True
+
+    main = router_class(name="main")
+    children = [router_class(name=f"feature{number}") for number in range(routers)]
+    for number, cls in enumerate(classes):
+        child = children[number * routers // len(classes)]
+        child.callback_query.register(handler, cls.filter(F.value >= 0))
+        child.message.register(handler, Command(f"command{number}"))
+    for child in children:
+        main.include_router(child)
+    return main
+
+
+async def measure(router: Router, update_type: str, event: TelegramObject, bot: Bot, seconds: float) -> Dict[str, float]:
+    assert await router.propagate_event(update_type=update_type, event=event, bot=bot) is not UNHANDLED
+    loops, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for _ in range(100):
+            await router.propagate_event(update_type=update_type, event=event, bot=bot)
+        loops += 100
+    elapsed = time.perf_counter() - started
+    return {"operations": loops, "ops_per_sec": loops / elapsed, "mean_us": elapsed / loops * 1e6}
+
+
+async def run(handlers: int, routers: int, seconds: float) -> Dict[str, Dict[str, Any]]:
+    classes = callback_classes(handlers)
+    last = classes[-1]
+    query = CallbackQuery(id="1", from_user=USER, chat_instance="bench", data=last(value=42).pack())
+    message = Message(
+        message_id=1,
+        date=datetime.now(timezone.utc),
+        chat=Chat(id=1, type="private"),
+        from_user=USER,
+        text=f"/command{handlers - 1} payload",
+    )
+
+    # Command filters need a bot instance, no requests are made
+    bot = Bot(token="42:BENCHMARK")
+    results: Dict[str, Dict[str, Any]] = {}
+    for router_class in (Router, IndexedRouter):
+        tree = build_tree(router_class, classes, routers)
+        name = router_class.__name__
+        results[f"callback:{name}"] = await measure(tree, "callback_query", query, bot, seconds)
+        results[f"command:{name}"] = await measure(tree, "message", message, bot, seconds)
+    await bot.session.close()
+    return results
+
+
+def main(args: argparse.Namespace) -> int:
+    report = {
+        "benchmark": "dispatch",
+        "environment": environment(),
+        "parameters": {"handlers": args.handlers, "routers": args.routers, "seconds": args.seconds},
+        "results": asyncio.run(run(args.handlers, args.routers, args.seconds)),
+    }
+    return finalize(report, args)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Router dispatch benchmark")
+    parser.add_argument("--handlers", type=int, default=120, help="Callback handlers and command handlers each")
+    parser.add_argument("--routers", type=int, default=4, help="Feature routers under `main`")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per scenario")
+    add_baseline_arguments(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(setup_parser().parse_args()))
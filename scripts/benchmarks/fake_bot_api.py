@@ -0,0 +1,244 @@
+"""
+Local fake Telegram Bot API server for offline load testing.
+
+Serves `getUpdates` from a generator (synthetic traffic or a recorded JSONL file) and
+accepts outgoing methods with configurable latency, random 429 injection and an
+optional per-chat send limit that mimics Telegram flood control. Every call is recorded;
+`GET /_stats` returns a summary, `GET /_calls` the raw log and `POST /_reset` clears it.
+
+Point the bot at it with `APPLICATION__API_SERVER=http://127.0.0.1:8081`.
+
+Usage:
+    python -m scripts.benchmarks.fake_bot_api --port 8081 --rate 500 --total 100000
+    python -m scripts.benchmarks.fake_bot_api --recorded updates.jsonl --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from aiohttp import web
+
+from scripts.benchmarks.updates import recorded_updates, synthetic_updates
+
+SEND_METHODS = {"sendmessage", "editmessagetext", "sendphoto", "senddocument", "copymessage", "forwardmessage"}
+
+
+@dataclass
+class FakeApiOptions:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    retry_after: int = 1
+    chat_limit: int = 0  # messages per second per chat, 0 disables
+    global_limit: int = 0  # messages per second overall, 0 disables
+    rate: float = 0.0  # generated updates per second, 0 means "as fast as polled"
+
+
+@dataclass
+class RecordedCall:
+    method: str
+    params: Dict[str, Any]
+    status: int
+    at: float = field(default_factory=time.time)
+
+
+class FakeBotAPI:
+    """In-memory Bot API emulation backed by an update iterator."""
+
+    def __init__(self, updates: Iterator[Dict[str, Any]], options: FakeApiOptions) -> None:
+        self.options = options
+        self.calls: List[RecordedCall] = []
+        self._updates = updates
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._exhausted = False
+        self._message_ids = itertools.count(1)
+        self._chat_windows: Dict[str, Deque[float]] = defaultdict(deque)
+        self._global_window: Deque[float] = deque()
+        self._generated = 0
+        self._started = time.monotonic()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/_stats", self.stats)
+        app.router.add_get("/_calls", self.raw_calls)
+        app.router.add_post("/_reset", self.reset)
+        app.router.add_route("*", "/bot{token}/{method}", self.dispatch)
+        return app
+
+    async def dispatch(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = {key: _decode(value) for key, value in (await request.post()).items()}
+
+        if self.options.latency or self.options.jitter:
+            await asyncio.sleep(self.options.latency + random.uniform(0, self.options.jitter))
+
+        lowered = method.lower()
+        if lowered in SEND_METHODS and self._limited(str(params.get("chat_id"))):
+            return self._too_many_requests(method, params)
+
+        handler = getattr(self, f"method_{lowered}", None)
+        result = await handler(request.match_info["token"], params) if handler else True
+
+        self.calls.append(RecordedCall(method=method, params=params, status=200))
+        return web.json_response({"ok": True, "result": result})
+
+    def _limited(self, chat_id: str) -> bool:
+        if self.options.error_rate and random.random() < self.options.error_rate:
+            return True
+
+        now = time.monotonic()
+        for window, limit in ((self._chat_windows[chat_id], self.options.chat_limit), (self._global_window, self.options.global_limit)):
+            if not limit:
+                continue
+            while window and now - window[0] > 1.0:
+                window.popleft()
+            if len(window) >= limit:
+                return True
+        for window, limit in ((self._chat_windows[chat_id], self.options.chat_limit), (self._global_window, self.options.global_limit)):
+            if limit:
+                window.append(now)
+        return False
+
+    def _too_many_requests(self, method: str, params: Dict[str, Any]) -> web.Response:
+        self.calls.append(RecordedCall(method=method, params=params, status=429))
+        retry_after = self.options.retry_after
+        return web.json_response(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            },
+            status=429,
+        )
+
+    async def method_getme(self, token: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        bot_id = int(token.split(":", 1)[0]) if token.split(":", 1)[0].isdigit() else 42
+        return {"id": bot_id, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+    async def method_getupdates(self, token: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+
+        while self._pending and self._pending[0]["update_id"] < offset:
+            self._pending.popleft()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            self._generate(limit - len(self._pending))
+            if self._pending or self._exhausted or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.01)
+        return list(itertools.islice(self._pending, limit))
+
+    def _generate(self, wanted: int) -> None:
+        if wanted <= 0 or self._exhausted:
+            return
+        if self.options.rate:
+            allowed = int((time.monotonic() - self._started) * self.options.rate) - self._generated
+            wanted = min(wanted, allowed)
+        for _ in range(max(0, wanted)):
+            try:
+                update = next(self._updates)
+            except StopIteration:
+                self._exhausted = True
+                return
+            self._pending.append(update)
+            self._generated += 1
+
+    async def method_sendmessage(self, token: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._message(params)
+
+    async def method_editmessagetext(self, token: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._message(params)
+
+    def _message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params.get("chat_id") or 0)
+        return {
+            "message_id": int(params.get("message_id") or next(self._message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text"),
+        }
+
+    async def stats(self, _: web.Request) -> web.Response:
+        elapsed = max(1e-9, time.monotonic() - self._started)
+        by_method = Counter(call.method for call in self.calls)
+        throttled = Counter(call.method for call in self.calls if call.status == 429)
+        return web.json_response({
+            "elapsed": elapsed,
+            "updates_generated": self._generated,
+            "updates_pending": len(self._pending),
+            "calls": dict(by_method),
+            "throttled": dict(throttled),
+            "calls_per_sec": len(self.calls) / elapsed,
+        })
+
+    async def raw_calls(self, _: web.Request) -> web.Response:
+        return web.json_response([call.__dict__ for call in self.calls])
+
+    async def reset(self, _: web.Request) -> web.Response:
+        self.calls.clear()
+        self._started = time.monotonic()
+        self._generated = 0
+        return web.json_response({"ok": True})
+
+
+def _decode(value: Any) -> Any:
+    """aiogram sends complex fields JSON-encoded inside form data."""
+    if isinstance(value, str) and value[:1] in "[{":
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def update_source(recorded: Optional[Path], total: int, users: int) -> Iterator[Dict[str, Any]]:
+    if recorded:
+        return iter(recorded_updates(recorded))
+    return iter(synthetic_updates(total, users))
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--recorded", type=Path, help="JSONL file with raw updates to serve")
+    parser.add_argument("--total", type=int, default=10000, help="Synthetic updates to serve")
+    parser.add_argument("--users", type=int, default=500, help="Distinct synthetic users")
+    parser.add_argument("--rate", type=float, default=0.0, help="Updates generated per second (0: unlimited)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a random 429 on send methods")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after reported with 429")
+    parser.add_argument("--chat-limit", type=int, default=0, help="Per-chat messages per second before 429 (0: off)")
+    parser.add_argument("--global-limit", type=int, default=0, help="Global messages per second before 429 (0: off)")
+    return parser
+
+
+def main() -> None:
+    args = setup_parser().parse_args()
+    options = FakeApiOptions(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        chat_limit=args.chat_limit,
+        global_limit=args.global_limit,
+        rate=args.rate,
+    )
+    api = FakeBotAPI(update_source(args.recorded, args.total, args.users), options)
+    web.run_app(api.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
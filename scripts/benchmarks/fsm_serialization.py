@@ -0,0 +1,132 @@
+"""
+FSM data serialization benchmark.
+
+Measures encode/decode time and encoded size of typical FSM payloads for every
+serializer in `src.infrastructure.fsm.serializers`, including decoding legacy JSON
+through the migration reader. With `--redis-url` the payloads are also written to Redis
+and `MEMORY USAGE` per key is reported.
+
+Usage:
+    python -m scripts.benchmarks.fsm_serialization --save bench/fsm_serialization.json
+    python -m scripts.benchmarks.fsm_serialization --baseline bench/fsm_serialization.json
+    python -m scripts.benchmarks.fsm_serialization --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from scripts.benchmarks.common import add_baseline_arguments, environment, finalize
+from src.infrastructure.fsm.serializers import SERIALIZERS, FsmSerializer, JsonSerializer, get_serializer
+
+
+def payloads() -> Dict[str, Dict[str, Any]]:
+    """FSM data shapes seen in the bot: a step marker, a profile draft, a paginated selection."""
+    draft = {
+        "message_id": 4812,
+        "role": "freelancer",
+        "git": "https://github.com/example/example",
+        "personal_site_url": "https://example.dev",
+        "about": "Backend-разработчик, Python/Go, 6 лет коммерческого опыта. " * 3,
+        "languages": [{"id": i, "name": f"Language {i}", "url": f"https://example.dev/lang/{i}"} for i in range(8)],
+        "stacks": [{"id": i, "name": f"Stack {i}", "url": f"https://example.dev/stack/{i}"} for i in range(6)],
+    }
+    return {
+        "small": {"step": "await_git", "message_id": 4812},
+        "medium": draft,
+        "large": {
+            "page": 7,
+            "selected": list(range(0, 400, 3)),
+            "items": [{"id": i, "title": f"Заказ #{i}", "budget": 1000 + i * 25, "tags": ["python", "aiogram"]} for i in range(100)],
+            "draft": draft,
+        },
+    }
+
+
+def measure(func: Callable[[], Any], seconds: float) -> float:
+    """Average call time in microseconds, auto-scaling the loop to roughly `seconds`."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / 10 or loops >= 1 << 24:
+            break
+        loops *= 4
+
+    loops = max(1, int(loops * seconds / max(elapsed, 1e-9) / 10))
+    best = float("inf")
+    for _ in range(10):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best * 1e6
+
+
+async def redis_memory(redis_url: str, encoded: Dict[str, bytes]) -> Dict[str, int]:
+    from redis.asyncio import Redis  # noqa: PLC0415 - optional part of the benchmark
+
+    redis = Redis.from_url(redis_url)
+    try:
+        usage: Dict[str, int] = {}
+        for name, value in encoded.items():
+            key = f"bench:fsm:{name}"
+            await redis.set(key, value)
+            usage[name] = await redis.memory_usage(key)
+            await redis.delete(key)
+        return usage
+    finally:
+        await redis.aclose()
+
+
+def run(seconds: float, redis_url: Optional[str]) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    encoded: Dict[str, bytes] = {}
+    legacy = JsonSerializer()
+
+    for payload_name, data in payloads().items():
+        for name in SERIALIZERS:
+            serializer: FsmSerializer = get_serializer(name)
+            value = serializer.dumps(data)
+            assert serializer.loads(value) == data, f"{name} does not round-trip {payload_name}"
+
+            scenario = f"{payload_name}:{name}"
+            encoded[scenario] = value
+            results[scenario] = {
+                "encode_us": measure(lambda: serializer.dumps(data), seconds),
+                "decode_us": measure(lambda: serializer.loads(value), seconds),
+                "size_bytes": len(value),
+            }
+
+        # Reading values left by the previous JSON format through the migration reader
+        migrating, legacy_value = get_serializer(), legacy.dumps(data)
+        results[f"{payload_name}:legacy_json_read"] = {"decode_us": measure(lambda: migrating.loads(legacy_value), seconds)}
+
+    if redis_url:
+        for scenario, usage in asyncio.run(redis_memory(redis_url, encoded)).items():
+            results[scenario]["redis_bytes"] = usage
+    return results
+
+
+def main(args: argparse.Namespace) -> int:
+    report = {
+        "benchmark": "fsm_serialization",
+        "environment": environment(),
+        "parameters": {"seconds": args.seconds, "redis": bool(args.redis_url)},
+        "results": run(args.seconds, args.redis_url),
+    }
+    return finalize(report, args)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="FSM data serialization benchmark")
+    parser.add_argument("--seconds", type=float, default=0.2, help="Approximate time per measurement")
+    parser.add_argument("--redis-url", help="Also report Redis MEMORY USAGE per key (use a scratch database)")
+    add_baseline_arguments(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(setup_parser().parse_args()))
@@ -0,0 +1,306 @@
+"""
+Replayable update benchmark.
+
+Feeds synthetic or recorded `Update` objects through the real `Dispatcher` with the
+routers and middlewares installed by `TelegramBotManager`. Telegram is replaced by an
+in-process mock session, FSM storage by `MemoryStorage`; the database is either an
+in-memory repository stand-in (default) or a local PostgreSQL (`make dev-build`).
+NATS is not touched on the update path, so the client is never connected.
+
+Usage:
+    python -m scripts.benchmarks.updates --updates-count 5000 --save bench/updates.json
+    python -m scripts.benchmarks.updates --baseline bench/updates.json
+    python -m scripts.benchmarks.updates --recorded updates.jsonl --database postgres
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, Message, Update
+
+from scripts.benchmarks.common import add_baseline_arguments, environment, finalize, percentile
+from src import Loggers
+from src.core.domain.entities import BroadcastRecipientEntity, FreelancerProfileEntity, UserEntity
+from src.core.domain.interfaces.database.profile import AbstractFreelancerProfileRepo
+from src.core.domain.interfaces.database.user import AbstractUserRepo
+from src.core.domain.middlewares.database import SessionMiddleware
+from src.infrastructure.repository.models import RoleEnum
+from src.infrastructure.telegram.outbound import OutboundScheduler
+
+BENCH_CHAT_BASE = 10_000_000
+
+
+@dataclass
+class InMemoryDatabase:
+    """Shared state of the PostgreSQL stand-in."""
+
+    users: Dict[int, UserEntity] = field(default_factory=dict)
+    profiles: Dict[int, FreelancerProfileEntity] = field(default_factory=dict)
+    sequence: Iterator[int] = field(default_factory=lambda: itertools.count(1))
+
+
+class InMemoryUserRepo(AbstractUserRepo):
+    def __init__(self, database: InMemoryDatabase) -> None:
+        self.database = database
+
+    async def get_user_by_telegram_id(self, user_telegram_id: int) -> Optional[UserEntity]:
+        return self.database.users.get(user_telegram_id)
+
+    async def get_users_by_telegram_ids(self, user_telegram_ids: List[int]) -> List[UserEntity]:
+        return [self.database.users[telegram_id] for telegram_id in user_telegram_ids if telegram_id in self.database.users]
+
+    async def add_user(self, user: UserEntity) -> UserEntity:
+        stored = replace(user, id=user.id or next(self.database.sequence), created_at=datetime.now(timezone.utc))
+        self.database.users[stored.telegram_id] = stored
+        return stored
+
+    async def stream_recipients(self, after_user_id: int = 0, batch_size: int = 1000) -> AsyncIterator[List[BroadcastRecipientEntity]]:
+        users = sorted((user.id, user.telegram_id) for user in self.database.users.values() if user.id > after_user_id)
+        for offset in range(0, len(users), batch_size):
+            yield [BroadcastRecipientEntity(user_id=u, telegram_id=t) for u, t in users[offset:offset + batch_size]]
+
+
+class InMemoryProfileRepo(AbstractFreelancerProfileRepo):
+    def __init__(self, database: InMemoryDatabase) -> None:
+        self.database = database
+
+    async def get_profile_by_user_id(self, user_id: int) -> Optional[FreelancerProfileEntity]:
+        return self.database.profiles.get(user_id)
+
+    async def add_profile(self, profile: FreelancerProfileEntity) -> FreelancerProfileEntity:
+        stored = replace(profile, id=profile.id or next(self.database.sequence), created_at=datetime.now(timezone.utc))
+        self.database.profiles[stored.user_id] = stored
+        return stored
+
+
+class MockTelegramSession(AiohttpSession):
+    """AiohttpSession that answers Bot API methods locally instead of calling Telegram."""
+
+    def __init__(self, latency: float = 0.0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None) -> TelegramType:
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if getattr(method, "chat_id", None) is None and getattr(method, "message_id", None) is None:
+            return True  # answerCallbackQuery, setMyCommands, deleteWebhook, ...
+
+        return Message(
+            message_id=getattr(method, "message_id", None) or next(self._message_ids),
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=getattr(method, "chat_id", None) or 0, type="private"),
+            text=getattr(method, "text", None),
+        ).as_(bot)
+
+
+def synthetic_updates(count: int, users: int) -> List[Dict[str, Any]]:
+    """
+    Build a realistic mix: every user sends `/start`, picks the freelancer role and
+    keeps sending `/start` afterwards (the "welcome back" path).
+    """
+    updates: List[Dict[str, Any]] = []
+    now = int(time.time())
+    for update_id in range(count):
+        user_id = BENCH_CHAT_BASE + update_id % users
+        user = {"id": user_id, "is_bot": False, "first_name": "Bench", "username": f"bench{user_id}"}
+        chat = {"id": user_id, "type": "private"}
+        round_number = update_id // users
+
+        if round_number == 1:
+            raw = {
+                "update_id": update_id,
+                "callback_query": {
+                    "id": str(update_id),
+                    "from": user,
+                    "chat_instance": str(user_id),
+                    "data": f"setrole:{RoleEnum.freelancer.value}",
+                    "message": {"message_id": update_id, "date": now, "chat": chat, "from": user, "text": "role"},
+                },
+            }
+        else:
+            raw = {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": now,
+                    "chat": chat,
+                    "from": user,
+                    "text": "/start",
+                    "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+                },
+            }
+        updates.append(raw)
+    return updates
+
+
+def recorded_updates(path: Path) -> List[Dict[str, Any]]:
+    """Load updates recorded as one raw Bot API JSON object per line."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def mount(raw_updates: List[Dict[str, Any]], bot: Bot) -> List[Update]:
+    """Validate raw updates with the bot in context, so shortcuts like `message.answer` work."""
+    return [Update.model_validate(raw, context={"bot": bot}) for raw in raw_updates]
+
+
+async def build_manager(database: str, telegram_latency: float, outbound_limits: bool = False):
+    """Create `TelegramBotManager` and install its real middlewares and routers."""
+    os.environ.setdefault("APPLICATION__TOKEN", "42:BENCHMARK-TOKEN")
+    from src.core.application import TelegramBotManager  # noqa: PLC0415 - after env defaults
+
+    manager = TelegramBotManager()
+    mock_session = MockTelegramSession(latency=telegram_latency)
+    mock_session.middleware = manager.session.middleware  # keep the production outbound middleware chain
+    if not outbound_limits:
+        # Telegram send limits would dominate a synthetic load with few chats
+        for middleware in list(mock_session.middleware[:]):
+            if isinstance(middleware, OutboundScheduler):
+                mock_session.middleware.unregister(middleware)
+    manager.bot.session = mock_session
+    manager.dp.fsm.storage = MemoryStorage()
+    # Updates are replayed (allocation pass, recorded files) and would be dropped as duplicates
+    manager.deduplication = None
+    # Synthetic users send a few updates per millisecond and would be throttled
+    manager.throttling = None
+
+    await manager.middlewares_installer(manager.dp)
+    await manager.routers_installer(dispatcher=manager.dp)
+
+    if database == "memory":
+        stand_in = InMemoryDatabase()
+        for middleware in manager.dp.update.middleware:
+            if isinstance(middleware, SessionMiddleware):
+                middleware.user_repo_factory = lambda _: InMemoryUserRepo(stand_in)
+                middleware.profile_repo_factory = lambda _: InMemoryProfileRepo(stand_in)
+    return manager
+
+
+async def run_scenario(manager, updates: List[Update], concurrency: int) -> Dict[str, float]:
+    bot, dp = manager.bot, manager.dp
+    latencies: List[float] = []
+
+    async def feed(update: Update) -> None:
+        start = time.perf_counter()
+        await dp.feed_update(bot, update)
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    for offset in range(0, len(updates), concurrency):
+        await asyncio.gather(*(feed(update) for update in updates[offset:offset + concurrency]))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "updates": len(updates),
+        "updates_per_sec": len(updates) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+async def measure_allocations(manager, updates: List[Update]) -> Dict[str, float]:
+    """Run updates one by one under tracemalloc; reports per-update peak and retained memory."""
+    bot, dp = manager.bot, manager.dp
+    peaks: List[int] = []
+
+    tracemalloc.start()
+    try:
+        start_current, _ = tracemalloc.get_traced_memory()
+        for update in updates:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await dp.feed_update(bot, update)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "alloc_peak_bytes_p50": percentile(peaks, 50),
+        "alloc_peak_bytes_p99": percentile(peaks, 99),
+        "retained_bytes_per_update": (end_current - start_current) / max(1, len(updates)),
+    }
+
+
+def configure_logging(level: str) -> None:
+    Loggers(developer_mode=False)
+    for name in ("MAIN", "middlewares", "monitoring", "NATS", "aiogram"):
+        logging.getLogger(name).setLevel(level)
+
+
+async def main(args: argparse.Namespace) -> int:
+    configure_logging(args.log_level)
+
+    if args.recorded:
+        raw_updates = recorded_updates(args.recorded)
+        scenario = f"recorded:{args.recorded.name}"
+    else:
+        raw_updates = synthetic_updates(args.updates_count, args.users)
+        scenario = "synthetic"
+
+    manager = await build_manager(args.database, args.telegram_latency, args.outbound_limits)
+    updates = mount(raw_updates, manager.bot)
+    warmup, measured = updates[:args.warmup], updates[args.warmup:]
+    await run_scenario(manager, warmup, args.concurrency)
+
+    results = await run_scenario(manager, measured, args.concurrency)
+    if args.allocations:
+        results.update(await measure_allocations(manager, measured[:args.allocations]))
+
+    report = {
+        "benchmark": "updates",
+        "environment": environment(),
+        "parameters": {
+            "scenario": scenario,
+            "database": args.database,
+            "concurrency": args.concurrency,
+            "telegram_latency": args.telegram_latency,
+            "outbound_limits": args.outbound_limits,
+        },
+        "telegram_calls": dict(manager.bot.session.calls),
+        "results": {f"{scenario}:{args.database}:c{args.concurrency}": results},
+    }
+    await manager.bot.session.close()
+    return finalize(report, args)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Dispatcher throughput benchmark")
+    parser.add_argument("--updates-count", type=int, default=3000, help="Number of synthetic updates")
+    parser.add_argument("--users", type=int, default=500, help="Distinct synthetic users")
+    parser.add_argument("--recorded", type=Path, help="JSONL file with recorded raw updates")
+    parser.add_argument("--warmup", type=int, default=200, help="Updates fed before measuring")
+    parser.add_argument("--concurrency", type=int, default=1, help="Updates processed concurrently")
+    parser.add_argument("--database", choices=("memory", "postgres"), default="memory", help="Repository backend")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Simulated Bot API latency, seconds")
+    parser.add_argument("--outbound-limits", action="store_true", help="Keep the outbound Telegram rate limiter")
+    parser.add_argument("--allocations", type=int, default=300, help="Updates measured under tracemalloc (0 disables)")
+    parser.add_argument("--log-level", default="WARNING", help="Level for project loggers")
+    add_baseline_arguments(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main(setup_parser().parse_args())))
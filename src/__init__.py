@@ -1,4 +1,4 @@
-from src.config.lmuwj4 import Settings
+from src.config.models import Settings
 from src.infrastructure.logger.main import InitLoggers, LoggerReg
 
 
@@ -7,6 +7,7 @@ class Loggers(InitLoggers):
 
     main = LoggerReg(name="MAIN", level=LoggerReg.Level.DEBUG)
     middlewares = LoggerReg(name="middlewares", level=LoggerReg.Level.DEBUG)
+    monitoring = LoggerReg(name="monitoring", level=LoggerReg.Level.INFO)
 
 
 __all__ = ["Settings", "Loggers"]
@@ -0,0 +1,222 @@
+import hashlib
+import types
+import typing
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, ClassVar, Dict, List, Literal, Optional, Tuple, Type
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData, CallbackQueryFilter
+from aiogram.types import CallbackQuery
+from magic_filter import MagicFilter
+
+INLINE_MARKER = "~"
+STORED_MARKER = "!"
+SEPARATOR = "|"
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+Codec = Tuple[Callable[[Any], str], Callable[[str], Any]]
+
+
+def to_base36(value: int) -> str:
+    if value < 0:
+        return "-" + to_base36(-value)
+    result = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        result = DIGITS[remainder] + result
+        if not value:
+            return result
+
+
+class CallbackStore(ABC):
+    """Server-side storage for callback data longer than 64 bytes."""
+
+    @abstractmethod
+    async def put(self, token: str, value: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, token: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class _LRU(OrderedDict):
+    def __init__(self, max_size: int) -> None:
+        super().__init__()
+        self.max_size = max_size
+
+    def remember(self, key: Any, value: Any) -> Any:
+        self[key] = value
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+        return value
+
+
+class CompactCallbackData(CallbackData, prefix="compact"):
+    """
+    CallbackData with a short numeric code instead of the text prefix and compact fields.
+
+    `class SetRoleCallback(CompactCallbackData, prefix="setrole", code=1)` packs into
+    `~1|1`: ints are base36, enums are member indexes, bools are `0`/`1`. Decoding does
+    not run pydantic validation and is cached per raw string, so the returned instance is
+    shared and must not be modified. Data in the old `prefix:...` format is still accepted.
+
+    Payloads longer than 64 bytes are packed with `await obj.apack()`: the full value goes
+    to `CompactCallbackData.store` and the button carries only a short token (`!1|<token>`).
+    """
+
+    __code__: ClassVar[str]
+    __codecs__: ClassVar[List[Tuple[str, Codec]]]
+
+    store: ClassVar[Optional[CallbackStore]] = None
+    _codes: ClassVar[Dict[str, Type["CompactCallbackData"]]] = {}
+    _decoded: ClassVar[_LRU] = _LRU(max_size=4096)
+    _resolved: ClassVar[_LRU] = _LRU(max_size=1024)
+
+    def __init_subclass__(cls, code: Optional[int] = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if code is None:
+            raise ValueError(f"code required, usage example: `class {cls.__name__}(CompactCallbackData, prefix='name', code=1)`")
+
+        cls.__code__ = to_base36(code)
+        registered = CompactCallbackData._codes.get(cls.__code__)
+        if registered is not None and registered.__qualname__ != cls.__qualname__:
+            raise ValueError(f"Callback code {code} is already used by {registered.__name__}")
+        CompactCallbackData._codes[cls.__code__] = cls
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls.__codecs__ = [(name, _field_codec(field.annotation)) for name, field in cls.model_fields.items()]
+
+    def pack(self) -> str:
+        packed = self._pack_inline()
+        if len(packed.encode()) > MAX_CALLBACK_LENGTH:
+            raise ValueError(f"Callback data is too long ({packed!r}), use `await {type(self).__name__}(...).apack()`")
+        return packed
+
+    async def apack(self) -> str:
+        """Pack, moving payloads that exceed the Telegram limit to `store`."""
+        packed = self._pack_inline()
+        if len(packed.encode()) <= MAX_CALLBACK_LENGTH:
+            return packed
+        if self.store is None:
+            raise ValueError("Callback data is too long and CompactCallbackData.store is not configured")
+
+        token = hashlib.blake2b(packed.encode(), digest_size=12).hexdigest()
+        await self.store.put(token, packed)
+        self._resolved.remember(token, packed)
+        return f"{STORED_MARKER}{self.__code__}{SEPARATOR}{token}"
+
+    def _pack_inline(self) -> str:
+        parts = [INLINE_MARKER + self.__code__]
+        for name, (encode, _) in self.__codecs__:
+            value = encode(getattr(self, name))
+            if SEPARATOR in value:
+                raise ValueError(f"Separator symbol {SEPARATOR!r} can not be used in value {name}={value!r}")
+            parts.append(value)
+        return SEPARATOR.join(parts)
+
+    @classmethod
+    def unpack(cls, value: str) -> "CompactCallbackData":
+        if not value.startswith(INLINE_MARKER):
+            return super().unpack(value)  # buttons sent before the compact format
+
+        key = (cls, value)
+        cached = cls._decoded.get(key)
+        if cached is not None:
+            return cached
+
+        code, *parts = value[1:].split(SEPARATOR)
+        if code != cls.__code__:
+            raise ValueError(f"Bad code ({code!r} != {cls.__code__!r})")
+        if len(parts) != len(cls.__codecs__):
+            raise TypeError(f"Callback data {cls.__name__!r} takes {len(cls.__codecs__)} arguments but {len(parts)} were given")
+
+        payload = {name: decode(part) for (name, (_, decode)), part in zip(cls.__codecs__, parts)}
+        return cls._decoded.remember(key, cls.model_construct(**payload))
+
+    @classmethod
+    async def resolve(cls, value: str) -> Optional[str]:
+        """Return the inline form of stored callback data, or None when it is not ours or expired."""
+        code, _, token = value[1:].partition(SEPARATOR)
+        if code != cls.__code__:
+            return None
+        resolved = cls._resolved.get(token)
+        if resolved is None and cls.store is not None:
+            resolved = await cls.store.get(token)
+            if resolved is not None:
+                cls._resolved.remember(token, resolved)
+        return resolved
+
+    @classmethod
+    def filter(cls, rule: Optional[MagicFilter] = None) -> "CompactCallbackQueryFilter":
+        return CompactCallbackQueryFilter(callback_data=cls, rule=rule)
+
+
+class CompactCallbackQueryFilter(CallbackQueryFilter):
+    """Rejects foreign callbacks by their marker and code before decoding."""
+
+    async def __call__(self, query: CallbackQuery) -> Literal[False] | Dict[str, Any]:
+        if not isinstance(query, CallbackQuery) or not query.data:
+            return False
+
+        data = query.data
+        head = INLINE_MARKER + self.callback_data.__code__
+        if data[0] == INLINE_MARKER and not (data == head or data.startswith(head + SEPARATOR)):
+            return False
+        if data[0] == STORED_MARKER:
+            data = await self.callback_data.resolve(data)
+            if data is None:
+                return False
+
+        try:
+            callback_data = self.callback_data.unpack(data)
+        except (TypeError, ValueError):
+            return False
+
+        if self.rule is None or self.rule.resolve(callback_data):
+            return {"callback_data": callback_data}
+        return False
+
+
+def _field_codec(annotation: Any) -> Codec:
+    nullable = False
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        nullable = len(args) < len(typing.get_args(annotation))
+        annotation = args[0] if len(args) == 1 else str
+
+    encode, decode = _type_codec(annotation)
+    if not nullable:
+        return encode, decode
+    return (
+        lambda value: "" if value is None else encode(value),
+        lambda raw: None if raw == "" else decode(raw),
+    )
+
+
+def _type_codec(annotation: Any) -> Codec:
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        members = list(annotation)
+        indexes = {member: to_base36(index) for index, member in enumerate(members)}
+        return indexes.__getitem__, _enum_decoder(annotation, members)
+    if annotation is bool:
+        return lambda value: "1" if value else "0", lambda raw: raw == "1"
+    if annotation is int:
+        return to_base36, lambda raw: int(raw, 36)
+    if annotation is float:
+        return repr, float
+    return str, str
+
+
+def _enum_decoder(annotation: Type[Enum], members: List[Enum]) -> Callable[[str], Enum]:
+    def decode(raw: str) -> Enum:
+        # Callback data comes from the client: an unknown index is bad input, not a lookup error
+        index = int(raw, 36)
+        if not 0 <= index < len(members):
+            raise ValueError(f"Bad {annotation.__name__} index {raw!r}")
+        return members[index]
+
+    return decode
@@ -1,11 +1,10 @@
-from aiogram.filters.callback_data import CallbackData
-
+from src.callbacks.codec import CompactCallbackData
 from src.infrastructure.repository.models import RoleEnum
 
 
-class SetRoleCallback(CallbackData, prefix="setrole"):
+class SetRoleCallback(CompactCallbackData, prefix="setrole", code=1):
     role: RoleEnum
 
 
-class Commands(CallbackData, prefix="commands"):
+class Commands(CompactCallbackData, prefix="commands", code=2):
     command: str
@@ -0,0 +1,161 @@
+"""
+Settings models generated from src/config/settings.yml. Do not edit by hand, run:
+
+    python -m src.infrastructure.configuration.dynaconf_controller.generate
+"""
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional
+
+from pydantic import AnyUrl, BaseModel, ConfigDict, TypeAdapter
+
+
+class FrozenModel(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+
+class PostgresqlModel(FrozenModel):
+    host: Optional[str] = None
+    port: Optional[int] = None
+    user: Optional[str] = None
+    password: Optional[str] = None
+    path: Optional[str] = None
+    replicas: Optional[str] = None
+    replica_check_interval: Optional[float] = None
+    replica_sticky_ttl: Optional[float] = None
+    shards: Optional[str] = None
+
+
+class RedisModel(FrozenModel):
+    host: Optional[str] = None
+    port: Optional[int] = None
+
+
+class ApplicationModel(FrozenModel):
+    host: Optional[str] = None
+    domain: Optional[str] = None
+    port: Optional[int] = None
+    token: Optional[str] = None
+    api_server: Optional[str] = None
+    administrators: Optional[List[int]] = None
+    chief_administrator: Optional[int] = None
+    migrations: Optional[str] = None
+
+
+class NatsOtherPortsModel(FrozenModel):
+    monitoring: Optional[int] = None
+
+
+class NatsModel(FrozenModel):
+    host: Optional[str] = None
+    port: Optional[int] = None
+    other_ports: Optional[NatsOtherPortsModel] = None
+
+
+class MonitoringModel(FrozenModel):
+    loop_lag_interval: Optional[float] = None
+    slow_callback_threshold: Optional[float] = None
+
+
+class ProfilingModel(FrozenModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
+    user_ids: Optional[List[int]] = None
+    directory: Optional[str] = None
+    dump_every: Optional[int] = None
+
+
+class OutboundModel(FrozenModel):
+    global_rate: Optional[float] = None
+    private_chat_rate: Optional[float] = None
+    group_chat_rate: Optional[float] = None
+    chat_burst: Optional[int] = None
+    max_retries: Optional[int] = None
+
+
+class BroadcastModel(FrozenModel):
+    batch_size: Optional[int] = None
+    worker_batch: Optional[int] = None
+    flush_size: Optional[int] = None
+    flush_interval: Optional[float] = None
+    ack_wait: Optional[int] = None
+    lease_ttl: Optional[float] = None
+
+
+class FsmModel(FrozenModel):
+    backend: Optional[str] = None
+    serializer: Optional[str] = None
+    state_ttl: Optional[float] = None
+    data_ttl: Optional[float] = None
+    cache_size: Optional[int] = None
+    cache_ttl: Optional[float] = None
+
+
+class DedupModel(FrozenModel):
+    enabled: Optional[bool] = None
+    window: Optional[int] = None
+    ttl: Optional[int] = None
+    processing_ttl: Optional[float] = None
+
+
+class ThrottlingModel(FrozenModel):
+    enabled: Optional[bool] = None
+    user_rate: Optional[float] = None
+    user_burst: Optional[int] = None
+    chat_rate: Optional[float] = None
+    chat_burst: Optional[int] = None
+    shared: Optional[bool] = None
+
+
+class AdmissionModel(FrozenModel):
+    enabled: Optional[bool] = None
+    max_in_flight: Optional[int] = None
+    hard_in_flight: Optional[int] = None
+    latency_threshold: Optional[float] = None
+
+
+class BreakersModel(FrozenModel):
+    enabled: Optional[bool] = None
+    failure_threshold: Optional[int] = None
+    reset_timeout: Optional[float] = None
+    half_open_calls: Optional[int] = None
+    user_cache_size: Optional[int] = None
+
+
+class DeadlinesModel(FrozenModel):
+    enabled: Optional[bool] = None
+    update_timeout: Optional[float] = None
+
+
+class ShutdownModel(FrozenModel):
+    drain_timeout: Optional[float] = None
+
+
+class Settings(FrozenModel):
+    postgresql: Optional[PostgresqlModel] = None
+    redis: Optional[RedisModel] = None
+    application: Optional[ApplicationModel] = None
+    nats: Optional[NatsModel] = None
+    monitoring: Optional[MonitoringModel] = None
+    profiling: Optional[ProfilingModel] = None
+    outbound: Optional[OutboundModel] = None
+    broadcast: Optional[BroadcastModel] = None
+    fsm: Optional[FsmModel] = None
+    dedup: Optional[DedupModel] = None
+    throttling: Optional[ThrottlingModel] = None
+    admission: Optional[AdmissionModel] = None
+    breakers: Optional[BreakersModel] = None
+    deadlines: Optional[DeadlinesModel] = None
+    shutdown: Optional[ShutdownModel] = None
+    postgresql_url: Optional[AnyUrl] = None
+    redis_url: Optional[AnyUrl] = None
+    nats_url: Optional[AnyUrl] = None
+
+
+@lru_cache(maxsize=1)
+def settings_adapter() -> TypeAdapter[Settings]:
+    return TypeAdapter(Settings)
+
+
+def validate_settings(data: Mapping[str, Any]) -> Settings:
+    """Validate the resolved configuration in a single pass."""
+    return settings_adapter().validate_python(data)
@@ -1,30 +1,72 @@
+import importlib
+from typing import Optional
+
+import ormsgpack
 import structlog
-from aiogram import Bot, Dispatcher, Router
+from aiogram import Bot, Dispatcher, F
 from aiogram.client.default import DefaultBotProperties
 from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.base import DefaultKeyBuilder
-from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import BotCommand
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiohttp import web
+from nats.js.kv import KeyValue
 from pydantic import ValidationError
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from src import Settings, Loggers
+from src.callbacks.codec import CompactCallbackData
+from src.core.domain.middlewares.admission import AdmissionMiddleware
 from src.core.domain.middlewares.database import SessionMiddleware
+from src.core.domain.middlewares.deadline import DeadlineMiddleware, HandlerDeadlineMiddleware
+from src.core.domain.middlewares.dedup import DeduplicationMiddleware
 from src.core.domain.middlewares.ensure_user import EnsureUserMiddleware
 from src.core.domain.middlewares.errors import ErrorMiddleware
+from src.core.domain.middlewares.inflight import InFlightMiddleware
 from src.core.domain.middlewares.logs import LoggingMiddleware
 from src.core.domain.middlewares.nats_client import NatsClientMiddleware
-from src.infrastructure.configuration.dynaconf_controller.main import Config
+from src.core.domain.middlewares.profiling import ProfilingMiddleware
+from src.core.domain.middlewares.throttling import HandlerThrottlingMiddleware, ThrottlingMiddleware
+from src.infrastructure.configuration import snapshot
+from src.infrastructure.fsm.nats_kv import NatsKVStorage
+from src.infrastructure.fsm.redis import BinaryRedisStorage
+from src.infrastructure.fsm.serializers import OrmsgpackSerializer, get_serializer
+from src.infrastructure.fsm.tiered import TieredStorage
+from src.infrastructure.monitoring.loop_lag import LoopLagMonitor
+from src.infrastructure.monitoring.profiler import ApiTimingMiddleware, HandlerProfiler, install_db_timing, settings_from_config
+from src.infrastructure.monitoring.startup import StartupTimer
+from src.infrastructure.natslib.callback_store import NatsCallbackStore
 from src.infrastructure.natslib.client import NatsClient
+from src.infrastructure.natslib.configuration.configuration import ConfigurationWatcher
+from src.infrastructure.natslib.stream.stream import StreamClient
+from src.infrastructure.repository.migrator import MigrationMode, ensure_migrations
+from src.infrastructure.repository.replicas import ReplicaPool, replica_urls
+from src.infrastructure.repository.sharding import ShardMap
+from src.infrastructure.resilience import BREAKERS, GuardedStorage
+from src.infrastructure.resilience.dependencies import nats_breaker, postgres_breaker, redis_breaker
+from src.infrastructure.telegram.admission import LoadTracker
+from src.infrastructure.telegram.broadcast import BroadcastEngine
+from src.infrastructure.telegram.dedup import NatsUpdateClaims, RedisUpdateClaims
+from src.infrastructure.telegram.outbound import OutboundScheduler
+from src.infrastructure.telegram.router import IndexedRouter
+from src.infrastructure.telegram.shutdown import InFlightUpdates
+from src.infrastructure.telegram.throttling import Limit, MemoryLimiter, RedisLimiter
+from src.interface.api.metrics import router_metrics
 from src.interface.api.ping import router_ping
-from src.interface.handlers import default
-from src.interface.handlers.profile import lk
 
 logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
 
+PROFILING_BUCKET = "profiling"
+
+# Модули с хендлерами импортируются при установке роутеров, а не при импорте приложения
+ROUTER_MODULES = (
+    "src.interface.handlers.default",
+    "src.interface.handlers.profile.lk",
+)
+
 
 class WebhookConstructor:
     def __init__(self, domain: str):
@@ -37,15 +79,22 @@ class WebhookConstructor:
 
 
 class TelegramBotManager:
-    def __init__(self) -> None:
-        # Загрузка конфигурации
-        config_loader = Config(env="DEV", url_templates={
-            "postgresql": "postgresql+asyncpg",
-            "redis": "redis",
-            "nats": "nats"
-        })
+    def __init__(self, startup: Optional[StartupTimer] = None) -> None:
+        # Разбивка времени старта по этапам
+        self.startup = startup or StartupTimer()
+
+        with self.startup.stage("config"):
+            self.settings = self.load_settings()
+
+        with self.startup.stage("wiring"):
+            self.wiring()
+
+    @staticmethod
+    def load_settings() -> Settings:
+        """Загрузка конфигурации"""
         try:
-            self.settings = Settings(**config_loader.raw)
+            # Снимок конфигурации: Dynaconf и YAML разбираются только при изменении источников
+            return snapshot.load_settings()
         except ValidationError as e:
             print("Ошибка конфигурации:\n")
             for error in e.errors():
@@ -54,19 +103,106 @@ class TelegramBotManager:
                 print(f"  - {loc}: {msg}")
             raise SystemExit(1)
 
-        self.nats_client = NatsClient(servers=self.settings.nats_url)
+    def wiring(self) -> None:
+        """Создание клиентов, бота и диспетчера; без сетевых подключений"""
+        # Автоматы зависимостей: пока Postgres, Redis или NATS недоступны, запросы к ним
+        # сразу завершаются `CircuitOpenError`, а не копятся в ожидании таймаута
+        breakers = self.settings.breakers.model_dump(exclude_none=True) if self.settings.breakers else {}
+        breakers_enabled = breakers.pop("enabled", True)
+        self.user_cache_size = breakers.pop("user_cache_size", 10000)
+        BREAKERS.configure(**breakers)
+        self.postgres_breaker = postgres_breaker() if breakers_enabled else None
+
+        self.nats_client = NatsClient(servers=str(self.settings.nats_url), breaker=nats_breaker() if breakers_enabled else None)
+        # Callback data длиннее 64 байт хранится в NATS KV, в кнопке остаётся токен
+        CompactCallbackData.store = NatsCallbackStore(nats_client=self.nats_client)
+
+        # Мониторинг задержек event loop
+        monitoring = self.settings.monitoring
+        self.loop_monitor = LoopLagMonitor(
+            interval=(monitoring and monitoring.loop_lag_interval) or 0.5,
+            threshold=(monitoring and monitoring.slow_callback_threshold) or 0.25,
+        )
+
+        # Профилирование хендлеров, переключается в рантайме через NATS KV `profiling`
+        profiling = self.settings.profiling
+        self.profiler = HandlerProfiler(settings=settings_from_config(**(profiling.model_dump() if profiling else {})))
+        self.profiling_watcher = ConfigurationWatcher(nats_client=self.nats_client)
 
         # Создание webhook
         self.webhook_build = WebhookConstructor(domain=self.settings.application.domain)
 
-        # Инициализация RedisStorage
-        redis_storage = RedisStorage.from_url(
-            url=self.settings.redis_url,
-            key_builder=DefaultKeyBuilder(with_destiny=True, with_bot_id=True),
-        )
+        # Хранилище FSM: NATS KV или Redis с локальным кэшем
+        fsm = self.settings.fsm.model_dump(exclude_none=True) if self.settings.fsm else {}
+        backend, state_ttl, data_ttl = fsm.pop("backend", "redis"), fsm.pop("state_ttl", None), fsm.pop("data_ttl", None)
+        # Данные FSM в ormsgpack, старые JSON-значения читаются до первой перезаписи
+        serializer = get_serializer(fsm.pop("serializer", OrmsgpackSerializer.name))
+        if backend == "nats":
+            self.storage = NatsKVStorage(nats_client=self.nats_client, state_ttl=state_ttl, data_ttl=data_ttl, serializer=serializer)
+        else:
+            redis_storage = BinaryRedisStorage.from_url(
+                url=str(self.settings.redis_url),
+                serializer=serializer,
+                key_builder=DefaultKeyBuilder(with_destiny=True, with_bot_id=True),
+                state_ttl=int(state_ttl) if state_ttl else None,
+                data_ttl=int(data_ttl) if data_ttl else None,
+            )
+            self.storage = TieredStorage(storage=redis_storage, **fsm)
+        if breakers_enabled:
+            # При разомкнутом автомате чтение FSM отдаёт пустое состояние, запись — ошибку
+            self.storage = GuardedStorage(storage=self.storage, breaker=nats_breaker() if backend == "nats" else redis_breaker())
+
+        # Повторные доставки update: локальное окно и общий набор в хранилище FSM
+        dedup = self.settings.dedup.model_dump(exclude_none=True) if self.settings.dedup else {}
+        dedup_ttl, processing_ttl = dedup.get("ttl", 3600), dedup.get("processing_ttl", 60.0)
+        self.deduplication = DeduplicationMiddleware(
+            claims=NatsUpdateClaims(nats_client=self.nats_client, ttl=dedup_ttl, processing_ttl=processing_ttl) if backend == "nats"
+            else RedisUpdateClaims(redis=redis_storage.redis, ttl=dedup_ttl, processing_ttl=processing_ttl),
+            window=dedup.get("window", 1 << 16),
+        ) if dedup.get("enabled", True) else None
+
+        # Ограничение частоты по пользователю и чату, общий лимит между воркерами — через Redis
+        throttling = self.settings.throttling.model_dump(exclude_none=True) if self.settings.throttling else {}
+        # Собственный клиент Redis только у общего лимита при FSM в NATS; закрывается в on_shutdown
+        self.throttling_redis: Optional[Redis] = None
+        if throttling.get("shared"):
+            if backend == "nats":
+                self.throttling_redis = Redis.from_url(str(self.settings.redis_url))
+            limiter = RedisLimiter(redis=self.throttling_redis or redis_storage.redis)
+        else:
+            limiter = MemoryLimiter()
+        self.throttling = ThrottlingMiddleware(
+            user_limit=Limit(rate=throttling.get("user_rate", 2.0), burst=throttling.get("user_burst", 5)),
+            chat_limit=Limit(rate=throttling.get("chat_rate", 10.0), burst=throttling.get("chat_burst", 20)),
+            limiter=limiter,
+            exempt_user_ids=frozenset(self.settings.application.administrators or ()),
+        ) if throttling.get("enabled", True) else None
+        self.handler_throttling = HandlerThrottlingMiddleware(limiter=limiter)
+
+        # Контроль допуска: при перегрузке отбрасываются второстепенные события и callback
+        admission = self.settings.admission.model_dump(exclude_none=True) if self.settings.admission else {}
+        admission_enabled = admission.pop("enabled", True)
+        self.admission = AdmissionMiddleware(tracker=LoadTracker(**admission)) if admission_enabled else None
+
+        # Update в обработке: при остановке дожидаемся их не дольше `shutdown.drain_timeout`
+        self.in_flight = InFlightUpdates()
+        self.drain_timeout = (self.settings.shutdown and self.settings.shutdown.drain_timeout) or 15.0
+        self._stopped = False
+
+        # Бюджет времени на update: по истечении он отменяется, соединения возвращаются в пул
+        deadlines = self.settings.deadlines.model_dump(exclude_none=True) if self.settings.deadlines else {}
+        self.deadline = DeadlineMiddleware(budget=deadlines.get("update_timeout", 10.0)) if deadlines.get("enabled", True) else None
 
         # Инициализация бота
-        self.session = AiohttpSession()
+        # Собственный Bot API сервер (например, fake-сервер для нагрузочных тестов)
+        api_server = self.settings.application.api_server
+        self.session = AiohttpSession(api=TelegramAPIServer.from_base(api_server)) if api_server else AiohttpSession()
+        self.session.middleware(ApiTimingMiddleware())
+
+        # Планировщик исходящих запросов: лимиты Telegram, retry_after, схлопывание правок
+        outbound = self.settings.outbound.model_dump(exclude_none=True) if self.settings.outbound else {}
+        self.session.middleware(OutboundScheduler(**outbound))
+
         self.app = web.Application()
         self.bot = Bot(
             token=self.settings.application.token,
@@ -74,57 +210,186 @@ class TelegramBotManager:
             default=DefaultBotProperties(parse_mode=ParseMode.HTML, link_preview_is_disabled=True)
         )
 
+        # Подключение к базе данных
+        self.engine: AsyncEngine = create_async_engine(url=str(self.settings.postgresql_url), echo=False)
+        install_db_timing(self.engine)
+
+        # Реплики для чтения: методы репозиториев `@read_only` уходят на них по кругу
+        postgresql = self.settings.postgresql
+        replicas = replica_urls(str(self.settings.postgresql_url), postgresql and postgresql.replicas)
+        self.replicas = ReplicaPool(
+            urls=replicas,
+            check_interval=postgresql.replica_check_interval or 5.0,
+            sticky_ttl=postgresql.replica_sticky_ttl if postgresql.replica_sticky_ttl is not None else 5.0,
+        ) if replicas else None
+        for replica in self.replicas.engines if self.replicas else ():
+            install_db_timing(replica)
+
+        # Шарды пользователей по telegram_id; нулевой — основной сервер
+        self.shards = ShardMap(primary=self.engine, urls=replica_urls(str(self.settings.postgresql_url), postgresql and postgresql.shards))
+        for shard in self.shards.engines[1:]:
+            install_db_timing(shard)
+
+        # Рассылки через JetStream
+        broadcast_settings = self.settings.broadcast.model_dump(exclude_none=True) if self.settings.broadcast else {}
+        self.broadcast_engine = BroadcastEngine(
+            engine=self.engine,
+            shards=self.shards,
+            stream_client=StreamClient(nats_client=self.nats_client),
+            bot=self.bot,
+            **broadcast_settings
+        )
+
         # Инициализация диспетчера
-        self.dp = Dispatcher(storage=redis_storage)
+        self.dp = Dispatcher(storage=self.storage, broadcast_engine=self.broadcast_engine)
         self.dp.startup.register(self.on_startup)
+        self.dp.shutdown.register(self.on_shutdown)
+        # Раньше собственного обработчика Dispatcher, закрывающего хранилище FSM: оно нужно
+        # update, которые ещё обрабатываются
+        self.dp.shutdown.handlers.insert(0, self.dp.shutdown.handlers.pop())
+
+        # Установка; остановка диспетчера регистрируется до закрытия сессии бота обработчиком webhook
+        setup_application(self.app, self.dp, bot=self.bot)
 
         # Обработчик экземпляра бота
         SimpleRequestHandler(dispatcher=self.dp, bot=self.bot).register(self.app, path=self.webhook_build.webhook_path)
 
-        # Установка
-        setup_application(self.app, self.dp, bot=self.bot)
-
         # Добавление кастомных роутеров
-        self.app.router.add_get("/ping", router_ping)
+        self.add_service_routes(self.app)
+
+        # В режиме polling webhook-приложение не запускается: /ping и /metrics отдаёт отдельный сервер
+        self.polling = False
+        self.service_runner: Optional[web.AppRunner] = None
+
+    @staticmethod
+    def add_service_routes(app: web.Application) -> None:
+        """Служебные эндпоинты: проверка живости и метрики"""
+        app.router.add_get("/ping", router_ping)
+        app.router.add_get("/metrics", router_metrics)
+
+    async def start_service_server(self) -> None:
+        """Запуск сервера /ping и /metrics на `application.host`/`application.port`"""
+        app = web.Application()
+        self.add_service_routes(app)
+        self.service_runner = web.AppRunner(app)
+        await self.service_runner.setup()
+        host, port = self.settings.application.host, self.settings.application.port
+        await web.TCPSite(self.service_runner, host=host, port=port).start()
+        await logger.ainfo("Service server started", host=host, port=port)
 
     async def on_startup(self, dispatcher: Dispatcher, bot: Bot) -> None:
         """Действия перед запуском"""
-        # Подключение к NATS JetStream
-        await self.nats_client.connect()
+        # Запуск мониторинга блокировок event loop
+        await self.loop_monitor.start()
+        if self.polling:
+            await self.start_service_server()
+
+        with self.startup.stage("connections"):
+            # Подключение к NATS JetStream
+            await self.nats_client.connect()
+
+            # Бакеты NATS KV или инвалидация локального кэша FSM между процессами
+            await self.storage.start()
+
+            # Подписка на изменения настроек профилирования
+            await self.nats_client.get_or_create_kv_bucket(PROFILING_BUCKET)
+            await self.profiling_watcher.set_watching(PROFILING_BUCKET, self.on_profiling_changed)
+
+            # Проверка исключённых реплик
+            if self.replicas is not None:
+                await self.replicas.start()
+
+            # Запуск воркеров рассылок и продолжение прерванных
+            await self.broadcast_engine.start()
 
         # await bot.set_my_commands([BotCommand(command='help', description='Помощь')])
 
         _url = self.webhook_build.webhook
 
-        # Инициализация middlewares
-        await self.middlewares_installer(dispatcher)
+        with self.startup.stage("routers"):
+            # Инициализация middlewares
+            await self.middlewares_installer(dispatcher)
+
+            # Инициализация роутеров
+            await self.routers_installer(dispatcher=dispatcher)
 
-        # Инициализация роутеров
-        await self.routers_installer(dispatcher=dispatcher)
+        self.startup.report()
+
+    async def check_migrations(self) -> None:
+        """Сверка ревизии каждого шарда с head; миграции выполняются только в режиме `upgrade`"""
+        mode = self.settings.application.migrations or MigrationMode.upgrade
+        with self.startup.stage("migrations"):
+            for shard, (engine, url) in enumerate(zip(self.shards.engines, self.shards.urls)):
+                result = await ensure_migrations(engine=engine, url=url, mode=mode)
+                await logger.ainfo("Database migrations checked", mode=mode, shard=shard, result=result)
 
     async def routers_installer(self, dispatcher: Dispatcher) -> None:
         """Инициализация роутеров"""
-        route = Router(name="main")
+        from src.interface.handlers import broadcast  # noqa: PLC0415 - ленивый импорт хендлеров
+
+        route = IndexedRouter(name="main")
+
+        for module_name in ROUTER_MODULES:
+            route.include_router(importlib.import_module(module_name).router)
 
-        route.include_router(default.router)
-        route.include_router(lk.router)
+        administrators = self.settings.application.administrators or []
+        broadcast.router.message.filter(F.from_user.id.in_(set(administrators)))
+        route.include_router(broadcast.router)
 
         dispatcher.include_router(route)
         await logger.adebug("Routers installed")
 
     async def middlewares_installer(self, dispatcher: Dispatcher) -> None:
         """Инициализация middlewares"""
+        # Самым первым: остановка дожидается всех принятых update
+        dispatcher.update.outer_middleware(InFlightMiddleware(updates=self.in_flight))
+        # Дубликаты не доходят ни до логов, ни до сессии БД
+        if self.deduplication is not None:
+            dispatcher.update.outer_middleware(self.deduplication)
+        if self.admission is not None:
+            dispatcher.update.outer_middleware(self.admission)
         dispatcher.update.middleware(ErrorMiddleware())
+        # Бюджет охватывает транзакцию SessionMiddleware и запросы к Telegram
+        if self.deadline is not None:
+            dispatcher.update.middleware(self.deadline)
+        # До логов и SessionMiddleware: флуд не открывает транзакций
+        if self.throttling is not None:
+            dispatcher.update.middleware(self.throttling)
         dispatcher.update.middleware(LoggingMiddleware())
 
-        engine: AsyncEngine = create_async_engine(url=self.settings.postgresql_url, echo=False)
-        dispatcher.update.middleware(SessionMiddleware(engine=engine))
+        dispatcher.update.middleware(SessionMiddleware(
+            engine=self.engine,
+            breaker=self.postgres_breaker,
+            replicas=self.replicas,
+            shards=self.shards if len(self.shards) > 1 else None,
+        ))
 
         dispatcher.update.middleware(NatsClientMiddleware(nats_client=self.nats_client))
 
-        dispatcher.update.middleware(EnsureUserMiddleware())
+        dispatcher.update.middleware(EnsureUserMiddleware(cache_size=self.user_cache_size))
+
+        # Inner middlewares: видят выбранный хендлер
+        if self.deadline is not None:
+            handler_deadline = HandlerDeadlineMiddleware()
+            dispatcher.message.middleware(handler_deadline)
+            dispatcher.callback_query.middleware(handler_deadline)
+        profiling_middleware = ProfilingMiddleware(profiler=self.profiler)
+        dispatcher.message.middleware(profiling_middleware)
+        dispatcher.callback_query.middleware(profiling_middleware)
+        dispatcher.message.middleware(self.handler_throttling)
+        dispatcher.callback_query.middleware(self.handler_throttling)
         await logger.adebug("Middlewares installed")
 
+    async def on_profiling_changed(self, entry: KeyValue.Entry) -> None:
+        """Применение настроек профилирования из NATS KV"""
+        if not entry.value:
+            return
+        try:
+            self.profiler.configure(**ormsgpack.unpackb(entry.value))
+        except (ormsgpack.MsgpackDecodeError, TypeError, ValueError) as err:
+            # Некорректное значение не должно останавливать наблюдение за бакетом
+            await logger.aerror("Profiling settings are not applied", key=entry.key, error=str(err))
+
     def start(self) -> None:
         """Запуск приложения"""
         _d = {"host": self.settings.application.host, "port": self.settings.application.port}
@@ -132,12 +397,48 @@ class TelegramBotManager:
         web.run_app(self.app, **_d)
 
     async def start_polling(self) -> None:
+        self.polling = True
         await self.bot.delete_webhook()
         await logger.ainfo("Start polling")
         await self.dp.start_polling(self.bot)
 
+    async def on_shutdown(self, dispatcher: Dispatcher, bot: Bot) -> None:
+        """
+        Остановка: приём update уже прекращён (polling остановлен, webhook-сервер не принимает
+        запросов). Сессию бота после этого закрывает aiogram.
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        await logger.ainfo("Shutting down", drain_timeout=self.drain_timeout)
+
+        # Update, принятые до остановки: их offset уже подтверждён, повторно они не придут
+        await self.in_flight.drain(timeout=self.drain_timeout)
+
+        # Рассылки: текущие пачки дорабатывают, остальное — nak для немедленной повторной доставки
+        await self.broadcast_engine.stop(timeout=self.drain_timeout)
+        await self.profiling_watcher.stop_watching()
+
+        await self.loop_monitor.stop()
+        await self.profiler.dump()
+        if self.service_runner is not None:
+            await self.service_runner.cleanup()
+
+        # Пулы соединений закрываются последними
+        await self.engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.close()
+        await self.shards.close()
+        if self.throttling_redis is not None:
+            await self.throttling_redis.aclose()
+        await self.nats_client.disconnect()
+        await logger.ainfo("Shutdown complete")
+
     async def stop(self) -> None:
-        """Остановка приложения"""
+        """Остановка приложения: прекращение приёма update и `on_shutdown`"""
         await logger.adebug("Stop app")
-        await self.app.shutdown()
-        await self.session.close()
+        try:
+            await self.dp.stop_polling()
+        except RuntimeError:
+            # Polling не запущен: webhook, обработчики остановки вызывает aiohttp
+            await self.app.shutdown()
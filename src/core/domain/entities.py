@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Dict, Any, Union, Optional, List
 
-from src.infrastructure.repository.models import RoleEnum
+from src.infrastructure.repository.models import RoleEnum, BroadcastStatusEnum
 
 
 @dataclass
@@ -96,9 +96,61 @@ class FreelancerProfileEntity(DataClassMixin):
     reviews_count: int = 0
     karma: int = 0
     is_verified: bool = False
+    updated_at: Optional[datetime] = None
     languages: List[ProfileLanguageEntity] = field(default_factory=list)
     stacks: List[ProfileStackEntity] = field(default_factory=list)
 
+    def to_dict_database(self) -> Dict[str, Any]:
+        data = super().to_dict_database()
+        data.pop("updated_at")
+        return data
+
+
+@dataclass
+class BroadcastEntity(DataClassMixin):
+    id: Optional[int] = None
+    text: str = ""
+    author_telegram_id: Optional[int] = None
+    status: BroadcastStatusEnum = BroadcastStatusEnum.created
+    producer: Optional[str] = None
+    lease_until: Optional[datetime] = None
+    last_shard: int = 0
+    last_user_id: int = 0
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0
+
+
+@dataclass
+class BroadcastFailureEntity(DataClassMixin):
+    id: Optional[int] = None
+    broadcast_id: int = 0
+    telegram_id: int = 0
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class BroadcastRecipientEntity:
+    user_id: int
+    telegram_id: int
+
+
+@dataclass(slots=True)
+class PageRequestEntity:
+    """Запрос страницы: `offset` в режиме смещения или непрозрачный `cursor` в режиме курсора."""
+    limit: int
+    offset: int = 0
+    cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PageEntity:
+    items: List[Any] = field(default_factory=list)
+    total_count: Optional[int] = None
+    has_next: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
 
 class DetectGitEntity(Enum):
     gitlab = "Gitlab"
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from src.core.domain.entities import BroadcastEntity, BroadcastFailureEntity
+from src.infrastructure.repository.models import BroadcastStatusEnum
+
+
+class AbstractBroadcastRepo(ABC):
+    @abstractmethod
+    async def add_broadcast(self, broadcast: BroadcastEntity) -> BroadcastEntity:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_broadcast(self, broadcast_id: int) -> Optional[BroadcastEntity]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_broadcasts_by_status(self, status: BroadcastStatusEnum) -> List[BroadcastEntity]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_status(self, broadcast_id: int, status: BroadcastStatusEnum) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acquire_lease(self, broadcast_id: int, producer: str, lease_ttl: float) -> Optional[BroadcastEntity]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_checkpoint(
+            self,
+            broadcast_id: int,
+            producer: str,
+            lease_ttl: float,
+            last_user_id: int,
+            enqueued: int,
+            last_shard: int = 0,
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_lease(self, broadcast_id: int, producer: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_progress(self, broadcast_id: int, sent: int, failed: int) -> BroadcastEntity:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def finish_if_complete(self, broadcast_id: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_failures(self, failures: List[BroadcastFailureEntity]) -> None:
+        raise NotImplementedError
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
-from src.core.domain.entities import UserEntity
+from src.core.domain.entities import UserEntity, BroadcastRecipientEntity
 
 
 class AbstractUserRepo(ABC):
@@ -9,6 +9,14 @@ class AbstractUserRepo(ABC):
     async def get_user_by_telegram_id(self, user_telegram_id: int) -> Optional[UserEntity]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_users_by_telegram_ids(self, user_telegram_ids: List[int]) -> List[UserEntity]:
+        raise NotImplementedError
+
     @abstractmethod
     async def add_user(self, user: UserEntity) -> UserEntity:
         raise NotImplementedError
+
+    @abstractmethod
+    def stream_recipients(self, after_user_id: int = 0, batch_size: int = 1000) -> AsyncIterator[List[BroadcastRecipientEntity]]:
+        raise NotImplementedError
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+
+from src.core.domain.entities import PageEntity, PageRequestEntity
+
+
+class AbstractPageSource(ABC):
+    @abstractmethod
+    async def fetch_page(self, request: PageRequestEntity) -> PageEntity:
+        raise NotImplementedError
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, Set
+
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import TelegramObject, Update
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.telegram.admission import LoadTracker, Priority
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.middlewares.name)
+
+UPDATES_SHED_TOTAL = REGISTRY.counter("updates_shed_total", "Updates rejected by admission control", labelnames=("priority",))
+UPDATES_IN_FLIGHT = REGISTRY.gauge("updates_in_flight", "Updates being processed")
+UPDATE_LATENCY_AVERAGE = REGISTRY.gauge("update_latency_average_seconds", "Decayed EWMA of update processing time")
+
+BUSY_TEXT = "Бот перегружен, попробуйте через минуту"
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """
+    Outer middleware: контроль допуска по числу update в обработке и средней задержке.
+
+    При перегрузке первыми отбрасываются прочие события (`Priority.low`: всё, кроме
+    сообщений и callback), при сильной — callback, которые сразу получают ответ «занято».
+    Сообщения принимаются всегда. Ответ «занято» отправляется в фоне, не занимая слот.
+    """
+
+    def __init__(self, tracker: Optional[LoadTracker] = None, busy_text: str = BUSY_TEXT) -> None:
+        super().__init__()
+        self.tracker = tracker or LoadTracker()
+        self.busy_text = busy_text
+        self._answers: Set[asyncio.Task] = set()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        priority = self.priority(event)
+        if not self.tracker.admits(priority):
+            UPDATES_SHED_TOTAL.inc(priority=priority.name)
+            self._answer_busy(event)
+            return UNHANDLED
+
+        tracker = self.tracker
+        tracker.in_flight += 1
+        UPDATES_IN_FLIGHT.set(tracker.in_flight)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            tracker.in_flight -= 1
+            tracker.observe(time.perf_counter() - started)
+            UPDATES_IN_FLIGHT.set(tracker.in_flight)
+            UPDATE_LATENCY_AVERAGE.set(tracker.latency())
+
+    @staticmethod
+    def priority(event: TelegramObject) -> Priority:
+        if not isinstance(event, Update) or event.message is not None:
+            return Priority.high
+        if event.callback_query is not None:
+            return Priority.normal
+        return Priority.low
+
+    def _answer_busy(self, event: TelegramObject) -> None:
+        if not isinstance(event, Update) or event.callback_query is None:
+            return
+        task = asyncio.create_task(self._answer(event))
+        self._answers.add(task)
+        task.add_done_callback(self._answers.discard)
+
+    async def _answer(self, event: Update) -> None:
+        try:
+            await event.callback_query.answer(text=self.busy_text)
+        except Exception as err:
+            await logger.adebug("Busy answer is not sent", error=str(err))
@@ -1,18 +1,46 @@
-from typing import Any, Awaitable, Callable
+from typing import Any, Awaitable, Callable, Optional
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from src.core.domain.interfaces.database.profile import AbstractFreelancerProfileRepo
+from src.core.domain.interfaces.database.user import AbstractUserRepo
 from src.infrastructure.repository.queries.profile import FreelancerProfileQuery
 from src.infrastructure.repository.queries.user import UserQuery
+from src.infrastructure.repository.replicas import ReadRouting, ReplicaPool
+from src.infrastructure.repository.sharding import ShardMap
+from src.infrastructure.resilience.breaker import CircuitBreaker, Guarded
 from src.use_cases.services.profile import FreelancerProfileService
 from src.use_cases.services.user import UserService
 
 
 class SessionMiddleware(BaseMiddleware):
-    def __init__(self, engine: AsyncEngine):
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            user_repo_factory: Callable[[AsyncSession], AbstractUserRepo] = UserQuery,
+            profile_repo_factory: Callable[[AsyncSession], AbstractFreelancerProfileRepo] = FreelancerProfileQuery,
+            breaker: Optional[CircuitBreaker] = None,
+            replicas: Optional[ReplicaPool] = None,
+            shards: Optional[ShardMap] = None,
+    ):
+        """
+        Args:
+            breaker: Автомат для запросов репозиториев: пока база недоступна, они сразу
+                     завершаются `CircuitOpenError`, а не ждут таймаута подключения
+            replicas: Реплики для методов `@read_only`; запись и чтения после неё в том же
+                      update идут в основную сессию
+            shards: Шарды пользователей: сессия открывается на шарде автора update,
+                    реплики используются только для нулевого шарда; сам `ShardMap`
+                    передаётся хендлерам как `shards` для пакетных запросов
+        """
         super().__init__()
         self.engine = engine
+        self.user_repo_factory = user_repo_factory
+        self.profile_repo_factory = profile_repo_factory
+        self.breaker = breaker
+        self.replicas = replicas
+        self.shards = shards
 
     async def __call__(
         self,
@@ -20,11 +48,31 @@ class SessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        async with AsyncSession(self.engine) as session:
+        user = data.get("event_from_user")
+        engine, shard = self.engine, 0
+        if self.shards is not None:
+            shard = self.shards.session_shard(user.id if user is not None else None)
+            engine = self.shards.engines[shard]
+            data["shards"] = self.shards
 
-            data["user_query"] = UserService(repo=UserQuery(session=session))
-            data["freelancer_profile_query"] = FreelancerProfileService(repo=FreelancerProfileQuery(session=session))
+        async with AsyncSession(engine) as session:
 
-            async with session.begin():
-                result = await handler(event, data)
-                return result
+            user_repo, profile_repo = self.user_repo_factory(session), self.profile_repo_factory(session)
+            routing = None
+            if self.replicas is not None and engine is self.engine:
+                routing = ReadRouting(pool=self.replicas, key=user.id if user is not None else None)
+                user_repo = routing.repo(self.user_repo_factory, primary=user_repo)
+                profile_repo = routing.repo(self.profile_repo_factory, primary=profile_repo)
+            if self.breaker is not None:
+                user_repo, profile_repo = Guarded(user_repo, self.breaker), Guarded(profile_repo, self.breaker)
+
+            data["user_query"] = UserService(repo=user_repo)
+            data["freelancer_profile_query"] = FreelancerProfileService(repo=profile_repo, shard=shard)
+
+            try:
+                async with session.begin():
+                    result = await handler(event, data)
+                    return result
+            finally:
+                if routing is not None:
+                    await routing.close()
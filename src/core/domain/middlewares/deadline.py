@@ -0,0 +1,106 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.telegram.deadline import CURRENT_DEADLINE, deadline
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.middlewares.name)
+
+DEADLINE_EXCEEDED_TOTAL = REGISTRY.counter(
+    "updates_deadline_exceeded_total",
+    "Updates cancelled because their time budget expired",
+    labelnames=("router",),
+)
+
+DEADLINE_FLAG = "deadline"
+
+
+class DeadlineMiddleware(BaseMiddleware):
+    """
+    Middleware уровня update, сразу после ErrorMiddleware: бюджет времени на весь update,
+    включая транзакцию SessionMiddleware и запросы к Telegram.
+
+    По истечении бюджета задача update отменяется, блоки `async with` (сессия БД) закрываются
+    и соединение возвращается в пул; update считается необработанным.
+    Бюджет роутера (`IndexedRouter(deadline=...)`) и хендлера (флаг `deadline`) применяет
+    `HandlerDeadlineMiddleware`.
+    """
+
+    def __init__(self, budget: Optional[float] = 10.0) -> None:
+        super().__init__()
+        self.budget = budget
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        scope = None
+        try:
+            async with deadline(self.budget) as scope:
+                return await handler(event, data)
+        except TimeoutError:
+            if scope is None or not scope.expired():
+                raise  # таймаут внутри хендлера, а не бюджета update
+            router_name = scope.owner or "-"
+            DEADLINE_EXCEEDED_TOTAL.inc(router=router_name)
+            await logger.awarning(
+                "Update deadline exceeded",
+                update_id=getattr(event, "update_id", None),
+                router=router_name,
+                budget=round(scope.when - scope.started, 3),
+            )
+            return UNHANDLED
+
+
+class HandlerDeadlineMiddleware(BaseMiddleware):
+    """
+    Inner middleware: бюджет выбранного хендлера — флаг `deadline`, иначе `deadline`
+    ближайшего роутера, иначе остаётся бюджет update. Считается от начала update.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._budgets: Dict[int, Optional[float]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        current = CURRENT_DEADLINE.get()
+        if current is not None:
+            router: Optional[Router] = data.get("event_router")
+            current.owner = router.name if router is not None else None
+            budget = self._budget(data)
+            if budget is not None:
+                current.reschedule(budget)
+        return await handler(event, data)
+
+    def _budget(self, data: dict[str, Any]) -> Optional[float]:
+        handler_object = data.get("handler")
+        if handler_object is None:
+            return None
+        key = id(handler_object)
+        if key not in self._budgets:
+            budget = get_flag(data, DEADLINE_FLAG)
+            self._budgets[key] = budget if budget is not None else router_deadline(data.get("event_router"))
+        return self._budgets[key]
+
+
+def router_deadline(router: Optional[Router]) -> Optional[float]:
+    """`deadline` роутера или ближайшего родителя, где он задан"""
+    while router is not None:
+        budget = getattr(router, "deadline", None)
+        if budget is not None:
+            return budget
+        router = router.parent_router
+    return None
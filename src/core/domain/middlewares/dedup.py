@@ -0,0 +1,84 @@
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import TelegramObject, Update
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.telegram.dedup import UpdateClaims, UpdateWindow
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.middlewares.name)
+
+UPDATES_DUPLICATE_TOTAL = REGISTRY.counter(
+    "updates_duplicate_total",
+    "Updates dropped as already processed",
+    labelnames=("layer",),
+)
+
+
+class DeduplicationMiddleware(BaseMiddleware):
+    """
+    Outer middleware, пропускающий повторные доставки одного `update_id`.
+
+    Сначала проверяется локальное окно процесса, затем общий набор в Redis/NATS KV,
+    куда update записывается до обработки: из нескольких воркеров его обработает
+    только первый. Если общий набор недоступен, update обрабатывается.
+
+    Запись подтверждается только после успешной обработки. Если обработка завершилась
+    исключением (в webhook это 500 и повторная доставка от Telegram), запись снимается
+    и в окне, и в общем наборе: повтор будет обработан, а не отброшен как дубликат.
+    """
+
+    def __init__(self, claims: Optional[UpdateClaims] = None, window: int = 1 << 16) -> None:
+        super().__init__()
+        self.claims = claims
+        self.window = UpdateWindow(size=window)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        update_id = event.update_id
+        if self.window.seen(update_id):
+            UPDATES_DUPLICATE_TOTAL.inc(layer="local")
+            return UNHANDLED
+        self.window.add(update_id)
+
+        shared = False
+        if self.claims is not None:
+            try:
+                shared = await self.claims.claim(data["bot"].id, update_id)
+            except Exception as err:
+                await logger.awarning("Update deduplication is unavailable", update_id=update_id, error=str(err))
+            else:
+                if not shared:
+                    UPDATES_DUPLICATE_TOTAL.inc(layer="shared")
+                    return UNHANDLED
+
+        try:
+            result = await handler(event, data)
+        except BaseException:
+            # Повторная доставка должна дойти до хендлера
+            self.window.discard(update_id)
+            if shared:
+                await self._settle(self.claims.release, data, update_id)
+            raise
+
+        if shared:
+            await self._settle(self.claims.confirm, data, update_id)
+        return result
+
+    @staticmethod
+    async def _settle(action: Callable[[int, int], Awaitable[None]], data: dict[str, Any], update_id: int) -> None:
+        try:
+            await action(data["bot"].id, update_id)
+        except Exception as err:
+            # Запись в работе истечёт сама через `processing_ttl`
+            await logger.awarning("Update claim is not updated", update_id=update_id, action=action.__name__, error=str(err))
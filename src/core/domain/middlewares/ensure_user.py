@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import Any, Awaitable, Callable, Optional
 
 import structlog
@@ -6,12 +7,29 @@ from aiogram.types import TelegramObject, Update, User, Message, CallbackQuery
 
 from src import Loggers
 from src.core.domain.entities import UserEntity
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.resilience.breaker import CircuitOpenError
 from src.use_cases.services.user import UserService
 
 logger = structlog.getLogger(Loggers.middlewares.name)
 
+USERS_DEGRADED_TOTAL = REGISTRY.counter("users_degraded_total", "Users served from the local cache while the database is unavailable")
+
 
 class EnsureUserMiddleware(BaseMiddleware):
+    """
+    Загрузка или регистрация пользователя.
+
+    Последние `cache_size` пользователей хранятся в процессе: пока автомат базы разомкнут,
+    update обрабатывается с закэшированной `UserEntity` и `data["degraded"] = True`.
+    Неизвестный пользователь в этом режиме получает `CircuitOpenError`.
+    """
+
+    def __init__(self, cache_size: int = 10000) -> None:
+        super().__init__()
+        self.cache_size = cache_size
+        self._users: OrderedDict[int, UserEntity] = OrderedDict()
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
@@ -34,7 +52,14 @@ class EnsureUserMiddleware(BaseMiddleware):
             )
             raise ValueError("The update has no `Message` event or `CallbackQuery`.")
 
-        result: Optional[UserEntity] = await user_query.get_user(user_telegram_id=telegram_user.id)
+        try:
+            result: Optional[UserEntity] = await user_query.get_user(user_telegram_id=telegram_user.id)
+        except CircuitOpenError:
+            result = self._users.get(telegram_user.id)
+            if result is None:
+                raise
+            USERS_DEGRADED_TOTAL.inc()
+            data["degraded"] = True
         if not result:
             user_entity = UserEntity(
                 telegram_id=telegram_user.id,
@@ -46,6 +71,7 @@ class EnsureUserMiddleware(BaseMiddleware):
             )
             result: UserEntity = await user_query.add_user(user=user_entity)
             await logger.adebug("Added new user", user=result)
+        self._remember(result)
 
         data["user_entity"]: UserEntity = result
         data["user_telegram_id"]: int = result.telegram_id
@@ -53,6 +79,12 @@ class EnsureUserMiddleware(BaseMiddleware):
         result = await handler(event, data)
         return result
 
+    def _remember(self, user: UserEntity) -> None:
+        self._users[user.telegram_id] = user
+        self._users.move_to_end(user.telegram_id)
+        if len(self._users) > self.cache_size:
+            self._users.popitem(last=False)
+
     @staticmethod
     def get_telegram_user(event: Update) -> Optional[User]:
         telegram_event = event.event
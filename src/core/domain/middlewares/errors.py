@@ -2,13 +2,17 @@ from typing import Any, Awaitable, Callable
 
 import structlog
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import TelegramObject, Update
 
 from src import Loggers
 from src.core.domain.errors.default import UnexpectedErrorInBotOperation
+from src.infrastructure.resilience.breaker import CircuitOpenError
 
 logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
 
+UNAVAILABLE_TEXT = "Сервис временно недоступен, попробуйте через минуту"
+
 
 class ErrorMiddleware(BaseMiddleware):
     async def __call__(
@@ -23,5 +27,23 @@ class ErrorMiddleware(BaseMiddleware):
         # except Exception as err:
         #     raise UnexpectedErrorInBotOperation(logger) from err
 
-        result = await handler(event, data)
-        return result
\ No newline at end of file
+        try:
+            result = await handler(event, data)
+            return result
+        except CircuitOpenError as err:
+            # Зависимость недоступна: пользователь получает ответ сразу, update не повторяется
+            await logger.awarning("Dependency unavailable", breaker=err.name, retry_after=round(err.retry_after, 1))
+            await self.answer_unavailable(event)
+            return UNHANDLED
+
+    @staticmethod
+    async def answer_unavailable(event: TelegramObject) -> None:
+        if not isinstance(event, Update):
+            return
+        try:
+            if event.callback_query is not None:
+                await event.callback_query.answer(text=UNAVAILABLE_TEXT)
+            elif event.message is not None:
+                await event.message.answer(text=UNAVAILABLE_TEXT)
+        except Exception as err:
+            await logger.adebug("Unavailable answer is not sent", error=str(err))
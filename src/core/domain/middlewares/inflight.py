@@ -0,0 +1,26 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.infrastructure.telegram.shutdown import InFlightUpdates
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """Outer middleware, первым: регистрирует задачу update, чтобы остановка дождалась её"""
+
+    def __init__(self, updates: InFlightUpdates) -> None:
+        super().__init__()
+        self.updates = updates
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        task = asyncio.current_task()
+        if task is not None:
+            self.updates.add(task)
+        return await handler(event, data)
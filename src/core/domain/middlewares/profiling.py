@@ -0,0 +1,46 @@
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject, User
+
+from src.infrastructure.monitoring.profiler import HandlerProfiler
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Inner middleware: profiles the matched handler for sampled updates."""
+
+    def __init__(self, profiler: HandlerProfiler) -> None:
+        super().__init__()
+        self.profiler = profiler
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        if not self.profiler.should_sample(user.id if user else None):
+            return await handler(event, data)
+
+        breakdown, profile, token = self.profiler.begin()
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.profiler.finish(
+                handler_name=self.handler_name(data.get("handler")),
+                wall=time.perf_counter() - start,
+                breakdown=breakdown,
+                profile=profile,
+                token=token,
+            )
+
+    @staticmethod
+    def handler_name(handler_object: Optional[HandlerObject]) -> str:
+        if handler_object is None:
+            return "unknown"
+        callback = handler_object.callback
+        return f"{callback.__module__}.{getattr(callback, '__qualname__', type(callback).__name__)}"
@@ -0,0 +1,134 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Chat, TelegramObject, Update, User
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.telegram.throttling import Limit, Limiter, MemoryLimiter
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.middlewares.name)
+
+THROTTLED_TOTAL = REGISTRY.counter("updates_throttled_total", "Updates dropped by flood throttling", labelnames=("scope",))
+
+THROTTLING_FLAG = "throttling"
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Middleware уровня update, до SessionMiddleware: ограничивает частоту по пользователю
+    и по чату. Отброшенный callback получает пустой `answer()`, чтобы у клиента
+    не висели часы, остальное отбрасывается молча; ни сессия БД, ни хендлер не запускаются.
+
+    Лимиты отдельных хендлеров задаются флагом и проверяются `HandlerThrottlingMiddleware`:
+    `@router.callback_query(..., flags={"throttling": {"rate": 0.5, "burst": 2}})`.
+    """
+
+    def __init__(
+            self,
+            user_limit: Limit,
+            chat_limit: Optional[Limit] = None,
+            limiter: Optional[Limiter] = None,
+            exempt_user_ids: frozenset[int] = frozenset(),
+    ) -> None:
+        super().__init__()
+        self.user_limit = user_limit
+        self.chat_limit = chat_limit
+        self.limiter = limiter or MemoryLimiter()
+        self.exempt_user_ids = exempt_user_ids
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        chat: Optional[Chat] = data.get("event_chat")
+        if user is None or user.id in self.exempt_user_ids:
+            return await handler(event, data)
+
+        try:
+            scope = await self._exceeded(user, chat)
+        except Exception as err:
+            # Общий лимитер недоступен: лучше пропустить, чем отбросить всех
+            await logger.awarning("Throttling is unavailable", error=str(err))
+            scope = None
+
+        if scope is None:
+            return await handler(event, data)
+
+        THROTTLED_TOTAL.inc(scope=scope)
+        await answer_throttled(event)
+        return UNHANDLED
+
+    async def _exceeded(self, user: User, chat: Optional[Chat]) -> Optional[str]:
+        if await self.limiter.hit(("user", user.id), self.user_limit):
+            return "user"
+        # В личке чат совпадает с пользователем
+        if self.chat_limit is not None and chat is not None and chat.id != user.id:
+            if await self.limiter.hit(("chat", chat.id), self.chat_limit):
+                return "chat"
+        return None
+
+
+class HandlerThrottlingMiddleware(BaseMiddleware):
+    """
+    Inner middleware: лимит конкретного хендлера по флагу `throttling` (False — без лимита).
+    Корзина хендлера называется по его функции (`module.qualname`), поэтому общий
+    лимитер считает её одной на все воркеры.
+    """
+
+    def __init__(self, limiter: Optional[Limiter] = None) -> None:
+        super().__init__()
+        self.limiter = limiter or MemoryLimiter()
+        self._limits: Dict[int, Optional[Tuple[str, Limit]]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        limit = self._limit(data)
+        if user is None or limit is None:
+            return await handler(event, data)
+
+        name, handler_limit = limit
+        try:
+            exceeded = await self.limiter.hit(("handler", name, user.id), handler_limit)
+        except Exception as err:
+            # Как и в ThrottlingMiddleware: недоступный лимитер не должен ронять хендлеры
+            await logger.awarning("Handler throttling is unavailable", handler=name, error=str(err))
+            exceeded = False
+
+        if exceeded:
+            THROTTLED_TOTAL.inc(scope="handler")
+            await answer_throttled(event)
+            return UNHANDLED
+        return await handler(event, data)
+
+    def _limit(self, data: dict[str, Any]) -> Optional[Tuple[str, Limit]]:
+        handler_object = data.get("handler")
+        if handler_object is None:
+            return None
+        key = id(handler_object)
+        if key not in self._limits:
+            flag = get_flag(data, THROTTLING_FLAG)
+            callback = handler_object.callback
+            name = f"{callback.__module__}.{callback.__qualname__}"
+            self._limits[key] = (name, Limit(**flag)) if isinstance(flag, dict) else None
+        return self._limits[key]
+
+
+async def answer_throttled(event: TelegramObject) -> None:
+    query = event.callback_query if isinstance(event, Update) else event
+    if isinstance(query, CallbackQuery):
+        try:
+            await query.answer()
+        except Exception as err:
+            await logger.adebug("Throttled callback is not answered", error=str(err))
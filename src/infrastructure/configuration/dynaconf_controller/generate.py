@@ -1,20 +1,90 @@
 import os
 import yaml
-import random
-import string
-from typing import Any, Dict, List, Optional, Union, Tuple, Set
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Tuple, Set
+
+MODULE_NAME = "models"
+
+# Типы по имени ключа: значения null в YAML не говорят ничего о типе, а целые числа
+# в дробных параметрах (`global_rate: 30`) не должны превращать поле в int
+NAME_TYPES = {
+    "port": "int",
+    "failure_threshold": "int",  # счётчик ошибок, в отличие от порогов в секундах
+}
+SUFFIX_TYPES = {
+    "_port": "int",
+    "_rate": "float",
+    "_interval": "float",
+    "_threshold": "float",
+    "_ttl": "float",
+    "_timeout": "float",
+    "_ids": "List[int]",
+}
+# Ключи, все значения которых — порты (`nats.other_ports.*`)
+PORT_SECTIONS = {"other_ports"}
+
+HEADER = '''"""
+Settings models generated from src/config/settings.yml. Do not edit by hand, run:
+
+    python -m src.infrastructure.configuration.dynaconf_controller.generate
+"""
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional
+
+from pydantic import AnyUrl, BaseModel, ConfigDict, TypeAdapter
+
+
+class FrozenModel(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+
+'''
+
+LOADER = '''
+
+@lru_cache(maxsize=1)
+def settings_adapter() -> TypeAdapter[Settings]:
+    return TypeAdapter(Settings)
+
+
+def validate_settings(data: Mapping[str, Any]) -> Settings:
+    """Validate the resolved configuration in a single pass."""
+    return settings_adapter().validate_python(data)
+'''
 
 
 def to_camel_case(snake_str: str) -> str:
     return "".join(word.capitalize() for word in snake_str.split("_"))
 
 
+def merge_environments(environments: List[Any]) -> Any:
+    """Объединить окружения: для каждого ключа берётся первое значение, отличное от null"""
+    present = [env for env in environments if env is not None]
+    if not present:
+        return None
+    if all(isinstance(env, dict) for env in present):
+        keys = list(dict.fromkeys(key for env in present for key in env))
+        return {key: merge_environments([env.get(key) for env in present]) for key in keys}
+    return present[0]
+
+
+def field_type(key: str, value: Any, parent: str) -> str:
+    if key in NAME_TYPES or parent in PORT_SECTIONS:
+        return NAME_TYPES.get(key, "int")
+    for suffix, py_type in SUFFIX_TYPES.items():
+        if key.endswith(suffix):
+            return py_type
+    if isinstance(value, list):
+        elem_type = type(value[0]).__name__ if value else "Any"
+        return f"List[{elem_type}]"
+    return type(value).__name__ if value is not None else "str"
+
+
 def generate_model_code(
         section: str,
         data: Any,
         generated: Dict[str, str],
-        used_names: Set[str]
+        used_names: Set[str],
+        key: Optional[str] = None,
 ) -> Tuple[str, str]:
     class_name = to_camel_case(section) + "Model"
     original_name = class_name
@@ -30,33 +100,42 @@ def generate_model_code(
     fields = ""
     nested_code = ""
 
-    for key, value in data.items():
+    for name, value in data.items():
         if isinstance(value, dict):
             nested_class_name, nested_def = generate_model_code(
-                f"{section}_{key}", value, generated, used_names
+                f"{section}_{name}", value, generated, used_names, key=name
             )
-            fields += f"    {key}: Optional[{nested_class_name}] = None\n"
+            fields += f"    {name}: Optional[{nested_class_name}] = None\n"
+            nested_code += nested_def
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            nested_class_name, nested_def = generate_model_code(
+                f"{section}_{name}", value[0], generated, used_names, key=name
+            )
+            fields += f"    {name}: Optional[List[{nested_class_name}]] = None\n"
             nested_code += nested_def
-        elif isinstance(value, list):
-            if value and isinstance(value[0], dict):
-                nested_class_name, nested_def = generate_model_code(
-                    f"{section}_{key}", value[0], generated, used_names
-                )
-                fields += f"    {key}: Optional[List[{nested_class_name}]] = None\n"
-                nested_code += nested_def
-            else:
-                elem_type = type(value[0]).__name__ if value else "Any"
-                fields += f"    {key}: Optional[List[{elem_type}]] = None\n"
         else:
-            py_type = type(value).__name__ if value is not None else "str"
-            fields += f"    {key}: Optional[{py_type}] = None\n"
+            fields += f"    {name}: Optional[{field_type(name, value, key or section)}] = None\n"
 
-    class_def = f"class {class_name}(BaseModel):\n{fields or '    pass'}\n\n"
+    class_def = f"class {class_name}(FrozenModel):\n{fields or '    pass'}\n\n"
     generated[class_name] = class_def
     return class_name, nested_code + class_def
 
 
-def generate_pydantic_models(settings_path: str, env: str = "DEV", url_templates: Optional[List[str]] = None) -> None:
+def generate_pydantic_models(
+        settings_path: str,
+        env: str = "DEV",
+        url_templates: Optional[List[str]] = None,
+        module_name: str = MODULE_NAME,
+) -> str:
+    """
+    Сгенерировать модуль с моделями настроек рядом с settings.yml.
+
+    Структура берётся из окружения `env`, типы значений null — из остальных окружений
+    и имён ключей. Модели неизменяемые, URL-поля собираются Config и проверяются как AnyUrl.
+
+    Returns:
+        str: Путь к сгенерированному модулю
+    """
     if not os.path.exists(settings_path):
         raise FileNotFoundError(f"Файл '{settings_path}' не найден.")
 
@@ -67,7 +146,10 @@ def generate_pydantic_models(settings_path: str, env: str = "DEV", url_templates
     if not env_config:
         raise ValueError(f"Окружение '{env}' не найдено в конфигурации.")
 
-    imports = {"from typing import Optional, List, Any", "from pydantic import BaseModel"}
+    others = [data for name, data in config_yaml.items() if name != env]
+    env_config = merge_environments([env_config, *others])
+    env_config = {section: data for section, data in env_config.items() if section in config_yaml[env]}
+
     generated_models: Dict[str, str] = {}
     used_names: Set[str] = set()
     root_fields = ""
@@ -80,19 +162,19 @@ def generate_pydantic_models(settings_path: str, env: str = "DEV", url_templates
 
     if url_templates:
         for tmpl in url_templates:
-            root_fields += f"    {tmpl}_url: Optional[str] = None\n"
+            root_fields += f"    {tmpl}_url: Optional[AnyUrl] = None\n"
 
-    settings_model = f"class Settings(BaseModel):\n{root_fields or '    pass'}\n\n"
+    settings_model = f"class Settings(FrozenModel):\n{root_fields or '    pass'}"
 
-    full_code = "\n".join(sorted(imports)) + "\n\n" + nested_all_code + settings_model
+    full_code = HEADER + nested_all_code + settings_model + LOADER
 
-    filename = "".join(random.choices(string.ascii_lowercase + string.digits, k=6)) + ".py"
-    file_path = os.path.join(os.path.dirname(os.path.abspath(settings_path)), filename)
+    file_path = os.path.join(os.path.dirname(os.path.abspath(settings_path)), f"{module_name}.py")
 
     with open(file_path, "w") as f:
         f.write(full_code)
 
     print(f"Сгенерирован файл Pydantic-моделей: {file_path}")
+    return file_path
 
 
 if __name__ == "__main__":
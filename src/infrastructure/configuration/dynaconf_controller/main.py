@@ -8,12 +8,14 @@ from yarl import URL
 class AttrDict(dict):
     """
     Recursive dict with attribute access.
+
+    Nested dicts are converted once and stored back, attribute access never copies.
     """
 
     def __getattr__(self, item):
         val = self.get(item)
-        if isinstance(val, dict):
-            return AttrDict(val)
+        if isinstance(val, dict) and not isinstance(val, AttrDict):
+            val = self[item] = AttrDict(val)
         return val
 
     def __setattr__(self, key, value):
@@ -110,14 +112,14 @@ class Config:
 
 
 if __name__ == "__main__":
-    from src import Settings
+    from src.config.models import validate_settings
 
     config_loader = Config(env="DEV", url_templates={
         "postgresql": "postgresql+asyncpg",
         "redis": "redis",
         "nats": "nats"
     })
-    settings = Settings(**config_loader.raw)
+    settings = validate_settings(config_loader.raw)
 
     print(settings.postgresql.host)
 
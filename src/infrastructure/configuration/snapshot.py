@@ -0,0 +1,122 @@
+"""
+Compiled configuration snapshot.
+
+`settings.yml` + `.env` + environment are resolved by `Config` (Dynaconf) once, validated
+into `Settings` and written to a MessagePack file together with a fingerprint of their
+sources. Next starts load the file and validate the plain dict, skipping Dynaconf, YAML
+parsing and env resolution; a changed source changes the fingerprint and the snapshot is
+rebuilt. The snapshot contains secrets and is written with `0600` permissions.
+
+Usage:
+    python -m src.infrastructure.configuration.snapshot  # compile before rollout
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import ormsgpack
+import structlog
+from pydantic import ValidationError
+
+from src import Loggers, Settings
+from src.config.models import validate_settings
+from src.infrastructure.configuration.dynaconf_controller.main import Config
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+SETTINGS_FILE = Path("src/config/settings.yml")
+DOTENV_FILE = Path(".env")
+SNAPSHOT_FILE = Path(os.getenv("SETTINGS_SNAPSHOT", ".cache/settings.msgpack"))
+SNAPSHOT_VERSION = 1
+
+URL_TEMPLATES = {
+    "postgresql": "postgresql+asyncpg",
+    "redis": "redis",
+    "nats": "nats",
+}
+
+
+def fingerprint(env: str) -> str:
+    """
+    Hash of everything the configuration is resolved from.
+
+    Overrides are `SECTION__KEY` variables, so every variable containing `__` is included;
+    it is cheaper than parsing the YAML to find which of them are actually used.
+
+    Must be taken before `Config` is built: Dynaconf copies `.env` into `os.environ`, and
+    a fingerprint taken after that never matches the one of a fresh process.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{SNAPSHOT_VERSION}:{env}:{sorted(URL_TEMPLATES.items())}".encode())
+    for path in (SETTINGS_FILE, DOTENV_FILE):
+        digest.update(path.read_bytes() if path.exists() else b"-")
+    for key, value in sorted(os.environ.items()):
+        if "__" in key and not key.startswith("__"):
+            digest.update(f"{key}={value}\0".encode())
+    return digest.hexdigest()
+
+
+def compile_settings(env: str = "DEV") -> Settings:
+    """Resolve the configuration through Dynaconf and validate it."""
+    config_loader = Config(env=env, url_templates=URL_TEMPLATES)
+    return validate_settings(config_loader.raw)
+
+
+def save_snapshot(settings: Settings, env: str = "DEV", path: Path = SNAPSHOT_FILE, digest: Optional[str] = None) -> None:
+    """
+    Args:
+        digest: Fingerprint taken before the settings were compiled, see `fingerprint`
+    """
+    payload = {"fingerprint": digest or fingerprint(env), "settings": settings.model_dump(mode="json")}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    # Атомарная замена: параллельно стартующие воркеры не прочитают недописанный файл
+    with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as file:
+        file.write(ormsgpack.packb(payload))
+    os.replace(temporary, path)
+
+
+def read_snapshot(env: str = "DEV", path: Path = SNAPSHOT_FILE, digest: Optional[str] = None) -> Optional[Settings]:
+    """Settings from the snapshot, or None when it is missing, stale or unreadable."""
+    try:
+        payload: Dict[str, Any] = ormsgpack.unpackb(path.read_bytes())
+    except (OSError, ormsgpack.MsgpackDecodeError):
+        return None
+    if payload.get("fingerprint") != (digest or fingerprint(env)):
+        return None
+    try:
+        return validate_settings(payload["settings"])
+    except ValidationError:
+        return None  # written for other models
+
+
+@lru_cache(maxsize=None)
+def load_settings(env: str = "DEV", use_snapshot: bool = True) -> Settings:
+    """
+    Process-wide settings: from a fresh snapshot if there is one, otherwise compiled and
+    written to the snapshot. Repeated calls return the same object.
+
+    Raises:
+        ValidationError: The configuration does not match `Settings`
+    """
+    digest = fingerprint(env)
+    if use_snapshot:
+        settings = read_snapshot(env, digest=digest)
+        if settings is not None:
+            return settings
+
+    settings = compile_settings(env)
+    if use_snapshot:
+        try:
+            save_snapshot(settings, env, digest=digest)
+        except OSError as err:
+            logger.warning("Settings snapshot is not written", path=str(SNAPSHOT_FILE), error=str(err))
+    return settings
+
+
+if __name__ == "__main__":
+    source_digest = fingerprint("DEV")
+    save_snapshot(compile_settings(), digest=source_digest)
+    print(f"Settings snapshot written: {SNAPSHOT_FILE}")
@@ -0,0 +1,128 @@
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import ormsgpack
+import structlog
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from nats.js.errors import KeyDeletedError, KeyNotFoundError, KeyWrongLastSequenceError
+from nats.js.kv import KeyValue
+
+from src import Loggers
+from src.infrastructure.fsm.serializers import FsmSerializer, OrmsgpackSerializer
+from src.infrastructure.natslib.client import NatsClient
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+STATES_BUCKET = "fsm_states"
+DATA_BUCKET = "fsm_data"
+
+
+class NatsKVStorage(BaseStorage):
+    """
+    aiogram FSM storage on NATS JetStream KV.
+
+    States and data live in separate buckets (`fsm_states`, `fsm_data`) so each can have
+    its own TTL; JetStream expires keys per bucket. States are ormsgpack-encoded, data
+    goes through `serializer` (ormsgpack by default).
+    `update_data` is a compare-and-set loop on the key revision, so concurrent updates of
+    the same user never overwrite each other's fields.
+
+    Keys are built with `.` as separator, the only one allowed by NATS KV subjects.
+    """
+
+    def __init__(
+            self,
+            nats_client: NatsClient,
+            key_builder: Optional[KeyBuilder] = None,
+            state_ttl: Optional[float] = None,
+            data_ttl: Optional[float] = None,
+            max_update_attempts: int = 10,
+            serializer: Optional[FsmSerializer] = None,
+    ) -> None:
+        self.nats_client = nats_client
+        self.key_builder = key_builder or DefaultKeyBuilder(separator=".", with_bot_id=True, with_destiny=True)
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+        self.max_update_attempts = max_update_attempts
+        self.serializer = serializer or OrmsgpackSerializer()
+
+        self._states: Optional[KeyValue] = None
+        self._data: Optional[KeyValue] = None
+
+    async def start(self) -> None:
+        """Create buckets; requires a connected NATS client."""
+        self._states = await self.nats_client.get_or_create_kv_bucket(STATES_BUCKET, history=1, ttl=self.state_ttl)
+        self._data = await self.nats_client.get_or_create_kv_bucket(DATA_BUCKET, history=1, ttl=self.data_ttl)
+
+    async def close(self) -> None:
+        # The connection belongs to the application
+        self._states = self._data = None
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        kv, nats_key = await self._states_bucket(), self.key_builder.build(key)
+        if state is None:
+            await self._delete(kv, nats_key)
+            return
+        await kv.put(nats_key, ormsgpack.packb(state.state if isinstance(state, State) else state))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value, _ = await self._get(await self._states_bucket(), self.key_builder.build(key))
+        return value
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(f"Data must be a dict or dict-like object, got {type(data).__name__}")
+
+        kv, nats_key = await self._data_bucket(), self.key_builder.build(key)
+        if not data:
+            await self._delete(kv, nats_key)
+            return
+        await kv.put(nats_key, self.serializer.dumps(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value, _ = await self._get(await self._data_bucket(), self.key_builder.build(key), self.serializer.loads)
+        return value or {}
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> Dict[str, Any]:
+        kv, nats_key = await self._data_bucket(), self.key_builder.build(key)
+        for _ in range(self.max_update_attempts):
+            current, revision = await self._get(kv, nats_key, self.serializer.loads)
+            current = current or {}
+            current.update(data)
+            try:
+                if revision is None:
+                    await kv.create(nats_key, self.serializer.dumps(current))
+                else:
+                    await kv.update(nats_key, self.serializer.dumps(current), last=revision)
+            except KeyWrongLastSequenceError:
+                continue  # somebody wrote in between, merge into the fresh value
+            return current.copy()
+
+        raise RuntimeError(f"FSM data of `{nats_key}` is updated concurrently too often")
+
+    async def _states_bucket(self) -> KeyValue:
+        if self._states is None:
+            await self.start()
+        return self._states
+
+    async def _data_bucket(self) -> KeyValue:
+        if self._data is None:
+            await self.start()
+        return self._data
+
+    @staticmethod
+    async def _get(kv: KeyValue, nats_key: str, loads: Callable[[bytes], Any] = ormsgpack.unpackb) -> Tuple[Any, Optional[int]]:
+        """Return the decoded value and its revision, `(None, None)` for missing or deleted keys."""
+        try:
+            entry = await kv.get(nats_key)
+        except (KeyNotFoundError, KeyDeletedError):
+            return None, None
+        if not entry.value:
+            return None, entry.revision
+        return loads(entry.value), entry.revision
+
+    @staticmethod
+    async def _delete(kv: KeyValue, nats_key: str) -> None:
+        # Purge drops the history as well, the bucket keeps only the marker
+        await kv.purge(nats_key)
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+
+from src.infrastructure.fsm.serializers import FsmSerializer, get_serializer
+
+
+class BinaryRedisStorage(RedisStorage):
+    """
+    `RedisStorage` storing FSM data with a pluggable binary serializer.
+
+    The stock storage decodes values as UTF-8 text for its JSON loader, which rules out
+    binary formats; here raw bytes go straight to `serializer`. States stay plain strings.
+    """
+
+    def __init__(self, redis: Redis, serializer: Optional[FsmSerializer] = None, **kwargs: Any) -> None:
+        super().__init__(redis=redis, **kwargs)
+        self.serializer = serializer or get_serializer()
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(f"Data must be a dict or dict-like object, got {type(data).__name__}")
+
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.redis.delete(redis_key)
+            return
+        await self.redis.set(redis_key, self.serializer.dumps(data), ex=self.data_ttl)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value = await self.redis.get(self.key_builder.build(key, "data"))
+        if value is None:
+            return {}
+        if isinstance(value, str):
+            value = value.encode()
+        return self.serializer.loads(value)
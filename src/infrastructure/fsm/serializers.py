@@ -0,0 +1,89 @@
+import json
+from typing import Any, Dict, Optional, Protocol
+
+import ormsgpack
+
+
+class FsmSerializer(Protocol):
+    """Encodes FSM data dicts for storage backends."""
+
+    name: str
+
+    def dumps(self, data: Dict[str, Any]) -> bytes: ...
+
+    def loads(self, value: bytes) -> Dict[str, Any]: ...
+
+
+class JsonSerializer:
+    name = "json"
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, value: bytes) -> Dict[str, Any]:
+        return json.loads(value)
+
+
+class OrmsgpackSerializer:
+    """
+    MessagePack via ormsgpack. Non-string dict keys are allowed, `datetime`, `UUID`,
+    enums and dataclasses are encoded natively (datetimes come back as ISO strings).
+    """
+
+    name = "ormsgpack"
+    options = ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_PYDANTIC
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return ormsgpack.packb(data, option=self.options)
+
+    def loads(self, value: bytes) -> Dict[str, Any]:
+        return ormsgpack.unpackb(value)
+
+
+class MigratingSerializer:
+    """
+    Writes with `primary`, reads both `primary` and values written by `legacy` JSON.
+
+    A serialized JSON object always starts with `{`, which is never the first byte of a
+    MessagePack map, so the format is detected without a marker. Legacy values are
+    rewritten in the new format on the next `set_data` of the key.
+    """
+
+    def __init__(self, primary: FsmSerializer, legacy: Optional[FsmSerializer] = None) -> None:
+        self.primary = primary
+        self.legacy = legacy if legacy is not None else JsonSerializer()
+        self.name = primary.name
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return self.primary.dumps(data)
+
+    def loads(self, value: bytes) -> Dict[str, Any]:
+        if value[:1] == b"{":
+            return self.legacy.loads(value)
+        return self.primary.loads(value)
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    OrmsgpackSerializer.name: OrmsgpackSerializer,
+}
+
+
+def get_serializer(name: str = OrmsgpackSerializer.name, read_legacy_json: bool = True) -> FsmSerializer:
+    """
+    Build a serializer by name.
+
+    Args:
+        name: `ormsgpack` (default) or `json`
+        read_legacy_json: Accept JSON values left by the previous format
+
+    Returns:
+        FsmSerializer: Serializer instance
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown FSM serializer `{name}`, expected one of: {', '.join(SERIALIZERS)}")
+
+    serializer = SERIALIZERS[name]()
+    if read_legacy_json and name != JsonSerializer.name:
+        return MigratingSerializer(primary=serializer)
+    return serializer
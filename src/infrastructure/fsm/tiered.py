@@ -0,0 +1,148 @@
+import asyncio
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import structlog
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+FSM_CACHE_TOTAL = REGISTRY.counter("fsm_cache_total", "FSM reads served by the in-process cache", labelnames=("part", "result"))
+FSM_CACHE_SIZE = REGISTRY.gauge("fsm_cache_size", "FSM records held by the in-process cache")
+
+INVALIDATION_CHANNEL = "fsm:invalidate"
+_MISSING = object()
+
+
+class TieredStorage(BaseStorage):
+    """
+    FSM storage with a per-process LRU (L1) in front of a `RedisStorage` (L2).
+
+    * Reads are served from L1 while the record is younger than `cache_ttl`; empty
+      states and data are cached too, since most updates come from users without one.
+    * Writes go to Redis first and then replace the L1 record (write-through), after
+      which the key is published to `channel` so other processes drop their copy.
+    * A read that raced with an invalidation is not cached. If the invalidation
+      subscription is lost, the whole L1 is dropped and `cache_ttl` bounds staleness.
+    """
+
+    def __init__(
+            self,
+            storage: RedisStorage,
+            cache_size: int = 10000,
+            cache_ttl: float = 30.0,
+            channel: str = INVALIDATION_CHANNEL,
+    ) -> None:
+        self.storage = storage
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.channel = channel
+
+        self._origin = uuid.uuid4().hex
+        self._cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Subscribe to invalidations published by other processes."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self.storage.close()
+
+    def create_isolation(self, **kwargs: Any) -> BaseEventIsolation:
+        return self.storage.create_isolation(**kwargs)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self.storage.set_state(key=key, state=state)
+        value = state.state if isinstance(state, State) else state
+        await self._written(self.storage.key_builder.build(key, "state"), value)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        cache_key = self.storage.key_builder.build(key, "state")
+        value = self._get(cache_key, "state")
+        if value is _MISSING:
+            generation = self._generation
+            value = await self.storage.get_state(key=key)
+            self._put(cache_key, value, generation)
+        return value
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self.storage.set_data(key=key, data=data)
+        await self._written(self.storage.key_builder.build(key, "data"), copy.deepcopy(dict(data)))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        cache_key = self.storage.key_builder.build(key, "data")
+        value = self._get(cache_key, "data")
+        if value is _MISSING:
+            generation = self._generation
+            value = await self.storage.get_data(key=key)
+            self._put(cache_key, copy.deepcopy(value), generation)
+            return value
+        # Handlers are free to mutate what they get
+        return copy.deepcopy(value)
+
+    def _get(self, cache_key: str, part: str) -> Any:
+        entry = self._cache.get(cache_key)
+        if entry is None or entry[0] < time.monotonic():
+            FSM_CACHE_TOTAL.inc(part=part, result="miss")
+            return _MISSING
+        self._cache.move_to_end(cache_key)
+        FSM_CACHE_TOTAL.inc(part=part, result="hit")
+        return entry[1]
+
+    def _put(self, cache_key: str, value: Any, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self._generation:
+            return  # invalidated while reading, the value may already be stale
+        self._cache[cache_key] = (time.monotonic() + self.cache_ttl, value)
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _written(self, cache_key: str, value: Any) -> None:
+        self._put(cache_key, value)
+        await self.storage.redis.publish(self.channel, f"{self._origin} {cache_key}")
+
+    def _invalidate(self, cache_key: Optional[str] = None) -> None:
+        self._generation += 1
+        if cache_key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(cache_key, None)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.storage.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything written while we were not subscribed is unknown
+                self._invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    origin, _, cache_key = (data.decode() if isinstance(data, bytes) else data).partition(" ")
+                    if origin != self._origin:
+                        self._invalidate(cache_key)
+                    FSM_CACHE_SIZE.set(len(self._cache))
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self._invalidate()
+                await logger.awarning("FSM invalidation subscription lost", error=str(err))
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
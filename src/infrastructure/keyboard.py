@@ -1,4 +1,5 @@
-from typing import Optional, Union, List, Callable, Any, Type
+from dataclasses import dataclass
+from typing import Optional, Union, List, Callable, Any, Type, Dict, Tuple, Sequence
 from aiogram.types import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
@@ -7,10 +8,30 @@ from aiogram.types import (
 )
 from aiogram.filters.callback_data import CallbackData
 
+from src.core.domain.entities import PageEntity, PageRequestEntity
+from src.core.domain.interfaces.pagination import AbstractPageSource
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """Место для callback_data, заполняемое при `KeyboardTemplate.render`."""
+
+    name: str
+
+
+def slot(name: str) -> Slot:
+    """
+    Динамическая callback_data для `KeyboardTemplate`.
+
+    :param name: Имя аргумента `render`.
+    :return: Slot.
+    """
+    return Slot(name=name)
+
 
 def template(
     text: str,
-    callback_data: Optional[Union[str, CallbackData]] = None,
+    callback_data: Optional[Union[str, CallbackData, Slot]] = None,
     **kwargs
 ) -> dict:
     """
@@ -28,7 +49,7 @@ def template(
     )
 
     :param text: Текст кнопки.
-    :param callback_data: Строка или объект CallbackData для inline-кнопок.
+    :param callback_data: Строка, объект CallbackData или slot() для inline-кнопок.
     :param kwargs: Дополнительные параметры кнопки (например, url, switch_inline_query).
     :return: Словарь с параметрами кнопки.
     """
@@ -96,8 +117,121 @@ def generate_keyboard(
         return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=resize_keyboard, is_persistent=is_persistent)
 
 
+class KeyboardTemplate:
+    """
+    Клавиатура, собранная один раз (обычно при импорте модуля).
+
+    Статические кнопки валидируются и упаковываются (`CallbackData.pack()`) только при
+    создании шаблона; `markup` возвращает один и тот же объект, его нельзя изменять.
+    Кнопки со `slot()` заполняются в `render` копированием готовой кнопки без повторной
+    валидации pydantic; кнопка, для которой передано None, не выводится.
+
+    ##################################
+    Пример использования:
+    ##################################
+
+    ROLE_KEYBOARD = KeyboardTemplate([
+        [
+            template("Я фрилансер", callback_data=SetRoleCallback(role=RoleEnum.freelancer)),
+            template("Я заказчик", callback_data=SetRoleCallback(role=RoleEnum.customer))
+        ]
+    ])
+    await message.answer(text, reply_markup=ROLE_KEYBOARD.markup)
+
+    NAVIGATION = KeyboardTemplate([[template("⬅️ Назад", callback_data=slot("back"))]])
+    NAVIGATION.render(back=PageCallback(page=0))
+    """
+
+    def __init__(
+        self,
+        buttons: List[Union[str, list, dict]],
+        inline: bool = True,
+        resize_keyboard: bool = True,
+        is_persistent: bool = False,
+    ) -> None:
+        # (строка, позиция) -> имя слота; при компиляции слот заменяется заглушкой
+        self._slots: Dict[Tuple[int, int], str] = {}
+        compiled: List[Union[str, list, dict]] = []
+
+        for row in buttons:
+            row = row if isinstance(row, list) else [row]
+            row_index = len(compiled)
+            compiled_row = []
+            for button in row:
+                if not button:
+                    continue
+                if isinstance(button, dict) and isinstance(button.get("callback_data"), Slot):
+                    if not inline:
+                        raise ValueError("Slots are supported only by inline keyboards")
+                    self._slots[(row_index, len(compiled_row))] = button["callback_data"].name
+                    button = {**button, "callback_data": "-"}
+                compiled_row.append(button)
+            if compiled_row:
+                compiled.append(compiled_row)
+
+        self.markup = generate_keyboard(compiled, inline=inline, resize_keyboard=resize_keyboard, is_persistent=is_persistent)
+
+    def render(self, **values: Optional[Union[str, CallbackData]]) -> Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]:
+        """
+        Заполняет слоты значениями.
+
+        :param values: callback_data для каждого слота (строка, CallbackData или None, чтобы скрыть кнопку).
+        :return: Новая клавиатура; для шаблона без слотов — общий `markup`.
+        """
+        if not self._slots:
+            return self.markup
+
+        rows = []
+        for row_index, row in enumerate(self.markup.inline_keyboard):
+            rendered = []
+            for index, button in enumerate(row):
+                name = self._slots.get((row_index, index))
+                if name is None:
+                    rendered.append(button)
+                    continue
+                value = values.get(name)
+                if value is None:
+                    continue
+                if isinstance(value, CallbackData):
+                    value = value.pack()
+                rendered.append(button.model_copy(update={"callback_data": value}))
+            if rendered:
+                rows.append(rendered)
+
+        return self.markup.model_copy(update={"inline_keyboard": rows})
+
+
+class SequenceSource(AbstractPageSource):
+    """Источник страниц поверх уже загруженного списка (курсор — индекс следующего элемента)."""
+
+    def __init__(self, items: Sequence[Any]) -> None:
+        self.items = items
+
+    async def fetch_page(self, request: PageRequestEntity) -> PageEntity:
+        # Курсор из callback_data может быть подделан: некорректный означает первую страницу
+        start = int(request.cursor) if request.cursor and request.cursor.isdecimal() else request.offset
+        end = start + request.limit
+        has_next = end < len(self.items)
+        return PageEntity(
+            items=list(self.items[start:end]),
+            total_count=len(self.items),
+            has_next=has_next,
+            next_cursor=str(end) if has_next else None,
+            prev_cursor=str(max(0, start - request.limit)) if start > 0 else None,
+        )
+
+
 class Paginator:
     """
+    Страница списка с навигацией. Элементы запрашиваются у `source` постранично, по мере листания.
+
+    * Режим смещения (`cursor_mode=False`): фабрика callback_data имеет поле `page: int`.
+    * Режим курсора (`cursor_mode=True`): фабрика имеет поле `cursor: str`; подходит для больших
+      и часто меняющихся списков (keyset, без OFFSET).
+
+    Строка навигации скомпилирована один раз (`KeyboardTemplate`), при отрисовке подставляется
+    только callback_data. Число страниц показывается, если источник вернул `total_count`.
+
     ##################################
     Пример использования Paginator
     ##################################
@@ -106,120 +240,107 @@ class Paginator:
 
 
     class GroupPaginationCallbackFactory(CallbackData, prefix="group_pagination"):
-        page: int = 0
+        cursor: str = ""
 
 
     class ToggleGroupCallbackFactory(CallbackData, prefix="group_action"):
         group_id: int
 
 
-    @router.message(Command("show_groups"))
-    async def show_groups_command(message: Message, group_query: GroupQuery):
-        page = 0
-
-        paginator = Paginator(
-            message,
-            items=await group_query.get_groups_paginated(limit=GROUP_PER_PAGE, offset=page * GROUP_PER_PAGE),
-            total_count=await group_query.get_total_groups_count(),
-            item_renderer=lambda group: template(
-                text=f"{group['id']}:{group['name']} {group['chat_id']}",
-                callback_data=ToggleGroupCallbackFactory(group_id=group['chat_id'])
-            ),
-            paginate_callback_factory=GroupPaginationCallbackFactory,
-            items_per_page=GROUP_PER_PAGE,
-            page=page
-        )
-
-        # Отправляем сообщение с клавиатурой
-        await paginator.generate(format_text="Список групп (страница {page} из {pages})")
+    class GroupQuery(Query, AbstractPageSource):
+        async def fetch_page(self, request: PageRequestEntity) -> PageEntity:
+            return await self.paginate(select(Group), request, key=Group.id, mapper=lambda group: group.to_dict())
 
 
     @router.callback_query(GroupPaginationCallbackFactory.filter())
     async def paginate_groups(callback_query: CallbackQuery, callback_data: GroupPaginationCallbackFactory, group_query: GroupQuery):
-        page = callback_data.page
-
         paginator = Paginator(
             callback_query,
-            items=await group_query.get_groups_paginated(limit=GROUP_PER_PAGE, offset=page * GROUP_PER_PAGE),
-            total_count=await group_query.get_total_groups_count(),
+            source=group_query,
             item_renderer=lambda group: template(
                 text=f"{group['id']}:{group['name']} {group['chat_id']}",
                 callback_data=ToggleGroupCallbackFactory(group_id=group['chat_id'])
             ),
             paginate_callback_factory=GroupPaginationCallbackFactory,
             items_per_page=GROUP_PER_PAGE,
-            page=page
+            cursor=callback_data.cursor or None,
+            cursor_mode=True
         )
 
         # Обновляем сообщение с клавиатурой
-        await paginator.generate(format_text="Список групп (страница {page} из {pages})")
-
-
-    ##################################
-    Необходимые запросы к базе данных
-    ##################################
-
-    class GroupQuery(Query):
-        async def get_groups_paginated(self, limit: int, offset: int) -> list[Optional[dict]]:
-            result = await self.session.execute(
-                select(Group).offset(offset).limit(limit)
-            )
-            groups = [group.to_dict for group in result.scalars().all()]
-            return groups
-
-        async def get_total_groups_count(self) -> int:
-            result = await self.session.execute(
-                select(func.count()).select_from(Group)
-            )
-            return result.scalar()
+        await paginator.generate_answer(format_text="Список групп (страница {page})")
     """
 
+    NAVIGATION = KeyboardTemplate(
+        buttons=[
+            [
+                template(text="⬅️ Назад", callback_data=slot("prev")),
+                template(text="Вперед ➡️", callback_data=slot("next")),
+            ]
+        ],
+        inline=True
+    )
+
     def __init__(
         self,
         telegram_object: Message | CallbackQuery,
         *,
-        items: List[Any],  # Уже загруженные данные для текущей страницы
-        total_count: int,  # Общее количество элементов
+        source: AbstractPageSource,  # Источник элементов
         item_renderer: Callable[[Any], dict],  # Функция для рендера кнопки из элемента
         paginate_callback_factory: Type[CallbackData],  # Фабрика для callback_data
         items_per_page: int = 5,  # Количество элементов на страницу
-        page: int = 0,  # Текущая страница
+        page: int = 0,  # Текущая страница (режим смещения)
+        cursor: Optional[str] = None,  # Текущий курсор (режим курсора)
+        cursor_mode: bool = False,
         data_callback: Optional[dict] = None
     ) -> None:
         self.telegram_object = telegram_object
 
-        self.items = items
-        self.total_count = total_count
+        self.source = source
         self.item_renderer = item_renderer
         self.callback_factory = paginate_callback_factory
         self.items_per_page = items_per_page
-        self.page = page
+        # Номер страницы приходит из callback_data и может быть подделан: отрицательный — первая страница
+        self.page = max(page, 0)
+        self.cursor = cursor
+        self.cursor_mode = cursor_mode
         self.data_callback = data_callback if data_callback else {}
 
+    async def fetch(self) -> PageEntity:
+        """Запрашивает текущую страницу у источника."""
+        return await self.source.fetch_page(PageRequestEntity(
+            limit=self.items_per_page,
+            offset=self.page * self.items_per_page,
+            cursor=self.cursor if self.cursor_mode else None,
+        ))
+
+    def navigation(self, page: PageEntity) -> List[List[InlineKeyboardButton]]:
+        if self.cursor_mode:
+            prev = self.callback_factory(cursor=page.prev_cursor, **self.data_callback) if page.prev_cursor else None
+            following = self.callback_factory(cursor=page.next_cursor, **self.data_callback) if page.next_cursor else None
+        else:
+            prev = self.callback_factory(page=self.page - 1, **self.data_callback) if self.page > 0 else None
+            following = self.callback_factory(page=self.page + 1, **self.data_callback) if page.has_next else None
+        return self.NAVIGATION.render(prev=prev, next=following).inline_keyboard
+
     async def generate_answer(self, format_text: str, inline: bool = True) -> None:
         """
         Генерирует ответ пагинации.
 
+        :param format_text: Шаблон текста с полями {page}, {pages} и {total_count}.
         :return: None
         """
-        total_pages = (self.total_count - 1) // self.items_per_page + 1
+        page = await self.fetch()
 
-        buttons = [
-            self.item_renderer(item)
-            for item in self.items
-        ] + [
-            [
-                template(
-                    text="⬅️ Назад", callback_data=self.callback_factory(page=self.page - 1, **self.data_callback).pack()
-                ) if self.page > 0 else None,
-                template(
-                    text="Вперед ➡️", callback_data=self.callback_factory(page=self.page + 1, **self.data_callback).pack()
-                ) if self.page < total_pages - 1 else None,
-            ]
-        ]
+        total_count = page.total_count
+        pages = (total_count - 1) // self.items_per_page + 1 if total_count else "?"
+        page_number = self.page + 1 if not self.cursor_mode else "…"
+
+        keyboard = generate_keyboard([self.item_renderer(item) for item in page.items], inline=inline)
+        if inline:
+            keyboard = keyboard.model_copy(update={"inline_keyboard": keyboard.inline_keyboard + self.navigation(page)})
 
-        text = format_text.format(page=self.page + 1, pages=total_pages, total_count=self.total_count)
-        keyboard = generate_keyboard(buttons, inline=inline)
+        text = format_text.format(page=page_number, pages=pages, total_count=total_count if total_count is not None else "?")
 
         if isinstance(self.telegram_object, Message):
             await self.telegram_object.answer(text, reply_markup=keyboard)
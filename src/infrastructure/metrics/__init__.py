@@ -0,0 +1,3 @@
+from src.infrastructure.metrics.main import REGISTRY, Counter, Gauge, Histogram, MetricError, MetricsRegistry
+
+__all__ = ['REGISTRY', 'Counter', 'Gauge', 'Histogram', 'MetricError', 'MetricsRegistry']
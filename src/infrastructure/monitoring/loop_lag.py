@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+import structlog
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.monitoring.name)
+
+LOOP_LAG_SECONDS = REGISTRY.gauge("event_loop_lag_seconds", "Last measured event loop scheduling lag")
+LOOP_LAG_HISTOGRAM = REGISTRY.histogram(
+    "event_loop_lag_distribution_seconds",
+    "Distribution of event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS_TOTAL = REGISTRY.counter("event_loop_stalls_total", "Coroutine steps that blocked the loop longer than the threshold")
+LOOP_STALL_MAX_SECONDS = REGISTRY.gauge("event_loop_stall_max_seconds", "Longest observed loop stall since start")
+
+
+@dataclass(slots=True)
+class StallReport:
+    """A single blocked-loop observation."""
+
+    started_at: float
+    duration: float
+    stack: List[str]
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag and captures the stack of coroutine steps that block the loop.
+
+    A heartbeat coroutine wakes up every ``interval`` seconds and records how late it was
+    scheduled. A daemon watchdog thread checks the heartbeat; when it has not advanced for
+    longer than ``threshold`` the loop thread is stuck in a single step, and its current
+    stack is sampled via ``sys._current_frames``. The report is logged once the loop
+    recovers, together with the total stall duration.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.25, history: int = 50) -> None:
+        """
+        Args:
+            interval: Heartbeat period in seconds
+            threshold: Minimal blocking duration (seconds) that is reported as a stall
+            history: Number of recent stall reports kept in memory
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.reports: Deque[StallReport] = deque(maxlen=history)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = time.monotonic()
+        self._pending: Optional[StallReport] = None
+        self._pending_lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    async def start(self) -> None:
+        """Start the heartbeat task and the watchdog thread on the running loop."""
+        if self.is_running:
+            await logger.awarning("Loop lag monitor is already running")
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        await logger.ainfo("Loop lag monitor started", interval=self.interval, threshold=self.threshold)
+
+    async def stop(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, self.interval * 2)
+            self._watchdog = None
+        await logger.ainfo("Loop lag monitor stopped")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+
+            LOOP_LAG_SECONDS.set(lag)
+            LOOP_LAG_HISTOGRAM.observe(lag)
+
+            with self._pending_lock:
+                report, self._pending = self._pending, None
+
+            if report is not None:
+                report.duration = max(report.duration, lag)
+                self.reports.append(report)
+                LOOP_STALLS_TOTAL.inc()
+                if report.duration > LOOP_STALL_MAX_SECONDS.value():
+                    LOOP_STALL_MAX_SECONDS.set(report.duration)
+                await logger.awarning(
+                    "Event loop was blocked",
+                    duration=round(report.duration, 4),
+                    stack="".join(report.stack),
+                )
+            elif lag > self.threshold:
+                # Stall shorter than the watchdog resolution: the culprit is already gone
+                LOOP_STALLS_TOTAL.inc()
+                await logger.awarning("Event loop lag exceeded threshold", lag=round(lag, 4))
+
+    def _watch(self) -> None:
+        """Watchdog thread body: samples the loop thread stack while the heartbeat is late."""
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(poll):
+            blocked_for = time.monotonic() - self._last_beat - self.interval
+            if blocked_for < self.threshold:
+                continue
+
+            with self._pending_lock:
+                if self._pending is not None:
+                    self._pending.duration = blocked_for
+                    continue
+
+                frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001
+                stack = traceback.format_stack(frame) if frame is not None else []
+                self._pending = StallReport(started_at=time.time() - blocked_for, duration=blocked_for, stack=stack)
@@ -0,0 +1,284 @@
+import asyncio
+import contextvars
+import cProfile
+import json
+import marshal
+import pstats
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+import structlog
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.monitoring.name)
+
+PROFILED_SECONDS = REGISTRY.histogram(
+    "handler_profiled_seconds",
+    "Time spent in sampled handlers split by component",
+    labelnames=("handler", "component"),
+)
+PROFILED_TOTAL = REGISTRY.counter("handler_profiled_total", "Number of sampled handler executions", labelnames=("handler",))
+
+
+@dataclass(slots=True)
+class TimingBreakdown:
+    """Time accumulated by a single sampled update, in seconds."""
+
+    db: float = 0.0
+    api: float = 0.0
+    db_calls: int = 0
+    api_calls: int = 0
+
+
+_current_breakdown: contextvars.ContextVar[Optional[TimingBreakdown]] = contextvars.ContextVar("profiling_breakdown", default=None)
+
+
+@dataclass(slots=True)
+class ProfilingSettings:
+    """Runtime switches of the handler profiler."""
+
+    enabled: bool = False
+    sample_rate: float = 0.0
+    user_ids: FrozenSet[int] = frozenset()
+    directory: str = "profiles"
+    dump_every: int = 50
+
+
+@dataclass(slots=True)
+class _HandlerAggregate:
+    samples: int = 0
+    wall: float = 0.0
+    db: float = 0.0
+    api: float = 0.0
+    db_calls: int = 0
+    api_calls: int = 0
+    stats: Dict[Any, Any] = field(default_factory=dict)
+
+
+class HandlerProfiler:
+    """
+    Samples handler executions and aggregates their profile per handler.
+
+    An update is sampled when profiling is enabled and either the sender is listed in
+    ``user_ids`` or a random draw falls under ``sample_rate``. Sampled handlers get a
+    wall/DB/Telegram API/CPU breakdown and, when no other profile is running, a cProfile
+    trace. Aggregated pstats files and a ``breakdown.json`` summary are written to
+    ``directory`` every ``dump_every`` samples.
+
+    cProfile traces the whole thread, so other tasks scheduled while the handler awaits
+    leak into its profile; keep the sample rate low on busy workers.
+    """
+
+    def __init__(self, settings: Optional[ProfilingSettings] = None) -> None:
+        self.settings = settings or ProfilingSettings()
+        self._aggregates: Dict[str, _HandlerAggregate] = {}
+        self._profile_active = False
+        self._since_dump = 0
+        self._dump_task: Optional[asyncio.Task] = None
+
+    def configure(self, **changes: Any) -> ProfilingSettings:
+        """
+        Apply runtime changes to the profiler settings.
+
+        Args:
+            changes: Any of `enabled`, `sample_rate`, `user_ids`, `directory`, `dump_every`
+
+        Returns:
+            ProfilingSettings: Updated settings
+        """
+        for key, value in changes.items():
+            if key not in ProfilingSettings.__slots__:
+                continue
+            if key == "user_ids":
+                value = frozenset(int(user_id) for user_id in value or ())
+            setattr(self.settings, key, value)
+        logger.info("Profiler reconfigured", **{k: getattr(self.settings, k) for k in ProfilingSettings.__slots__})
+        return self.settings
+
+    def should_sample(self, user_id: Optional[int]) -> bool:
+        settings = self.settings
+        if not settings.enabled:
+            return False
+        if user_id is not None and user_id in settings.user_ids:
+            return True
+        return settings.sample_rate > 0 and random.random() < settings.sample_rate
+
+    def begin(self) -> tuple[TimingBreakdown, Optional[cProfile.Profile], contextvars.Token]:
+        """Start collecting a sample in the current context."""
+        breakdown = TimingBreakdown()
+        token = _current_breakdown.set(breakdown)
+
+        profile: Optional[cProfile.Profile] = None
+        if not self._profile_active:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self._profile_active = True
+            except ValueError:
+                # Another profiling tool (debugger, sampling profiler) owns the thread
+                profile = None
+        return breakdown, profile, token
+
+    def finish(
+            self,
+            handler_name: str,
+            wall: float,
+            breakdown: TimingBreakdown,
+            profile: Optional[cProfile.Profile],
+            token: contextvars.Token
+    ) -> None:
+        """Stop the sample and merge it into the per-handler aggregate."""
+        _current_breakdown.reset(token)
+        if profile is not None:
+            profile.disable()
+            self._profile_active = False
+
+        cpu = max(0.0, wall - breakdown.db - breakdown.api)
+        PROFILED_TOTAL.inc(handler=handler_name)
+        PROFILED_SECONDS.observe(breakdown.db, handler=handler_name, component="db")
+        PROFILED_SECONDS.observe(breakdown.api, handler=handler_name, component="api")
+        PROFILED_SECONDS.observe(cpu, handler=handler_name, component="cpu")
+
+        aggregate = self._aggregates.setdefault(handler_name, _HandlerAggregate())
+        aggregate.samples += 1
+        aggregate.wall += wall
+        aggregate.db += breakdown.db
+        aggregate.api += breakdown.api
+        aggregate.db_calls += breakdown.db_calls
+        aggregate.api_calls += breakdown.api_calls
+        if profile is not None:
+            profile.create_stats()
+            _merge_stats(aggregate.stats, profile.stats)
+
+        self._since_dump += 1
+        if self._since_dump >= self.settings.dump_every and (self._dump_task is None or self._dump_task.done()):
+            self._since_dump = 0
+            self._dump_task = asyncio.create_task(self.dump())
+
+    async def dump(self) -> Optional[Path]:
+        """
+        Write aggregated pstats and the breakdown summary without blocking the loop.
+
+        Returns:
+            Optional[Path]: Output directory or None if nothing was collected yet
+        """
+        if not self._aggregates:
+            return None
+
+        directory = Path(self.settings.directory)
+        snapshot = {name: (_summary(aggregate), dict(aggregate.stats)) for name, aggregate in self._aggregates.items()}
+        await asyncio.to_thread(_write_snapshot, directory, snapshot)
+        await logger.ainfo("Profiles dumped", directory=str(directory), handlers=len(snapshot))
+        return directory
+
+    def reset(self) -> None:
+        self._aggregates.clear()
+        self._since_dump = 0
+
+
+class ApiTimingMiddleware(BaseRequestMiddleware):
+    """Session middleware adding Telegram Bot API time to the sampled update breakdown."""
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        breakdown = _current_breakdown.get()
+        if breakdown is None:
+            return await make_request(bot, method)
+
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            breakdown.api += time.perf_counter() - start
+            breakdown.api_calls += 1
+
+
+def install_db_timing(engine: AsyncEngine) -> None:
+    """
+    Attach cursor execution hooks adding query time to the sampled update breakdown.
+
+    Args:
+        engine: Engine used by repositories
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current_breakdown.get() is not None:
+            conn.info.setdefault("_profiling_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        breakdown = _current_breakdown.get()
+        started = conn.info.get("_profiling_started")
+        if breakdown is None or not started:
+            return
+        breakdown.db += time.perf_counter() - started.pop()
+        breakdown.db_calls += 1
+
+
+def _merge_stats(target: Dict[Any, Any], source: Dict[Any, Any]) -> None:
+    """Same merge as ``pstats.Stats.add`` but on raw dicts, avoiding a Stats object per sample."""
+    for func, (cc, nc, tt, ct, callers) in source.items():
+        if func in target:
+            old_cc, old_nc, old_tt, old_ct, old_callers = target[func]
+            target[func] = (old_cc + cc, old_nc + nc, old_tt + tt, old_ct + ct, pstats.add_callers(old_callers, callers))
+        else:
+            target[func] = (cc, nc, tt, ct, dict(callers))
+
+
+def _summary(aggregate: _HandlerAggregate) -> Dict[str, Any]:
+    samples = aggregate.samples or 1
+    cpu = max(0.0, aggregate.wall - aggregate.db - aggregate.api)
+    return {
+        "samples": aggregate.samples,
+        "wall_avg": aggregate.wall / samples,
+        "db_avg": aggregate.db / samples,
+        "api_avg": aggregate.api / samples,
+        "cpu_avg": cpu / samples,
+        "db_calls_avg": aggregate.db_calls / samples,
+        "api_calls_avg": aggregate.api_calls / samples,
+    }
+
+
+def _write_snapshot(directory: Path, snapshot: Dict[str, tuple[Dict[str, Any], Dict[Any, Any]]]) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, (_, stats) in snapshot.items():
+        if stats:
+            with open(directory / f"{name}.pstats", "wb") as f:
+                marshal.dump(stats, f)
+    with open(directory / "breakdown.json", "w") as f:
+        json.dump({name: summary for name, (summary, _) in snapshot.items()}, f, indent=2)
+
+
+def settings_from_config(
+        enabled: Optional[bool] = None,
+        sample_rate: Optional[float] = None,
+        user_ids: Optional[Iterable[int]] = None,
+        directory: Optional[str] = None,
+        dump_every: Optional[int] = None
+) -> ProfilingSettings:
+    """Build profiler settings from the `profiling` configuration section, keeping defaults for empty values."""
+    default = ProfilingSettings()
+    return ProfilingSettings(
+        enabled=bool(enabled) if enabled is not None else default.enabled,
+        sample_rate=float(sample_rate) if sample_rate is not None else default.sample_rate,
+        user_ids=frozenset(user_ids or ()),
+        directory=directory or default.directory,
+        dump_every=int(dump_every) if dump_every else default.dump_every,
+    )
@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import structlog
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.monitoring.name)
+
+STARTUP_SECONDS = REGISTRY.gauge("startup_stage_seconds", "Duration of process startup stages", labelnames=("stage",))
+
+
+class StartupTimer:
+    """
+    Collects the startup timing breakdown: imports, config, wiring, migrations, connections.
+
+    Stages are timed with ``with timer.stage("name"):``; ``report()`` logs them together
+    with the total time since ``started_at`` and exports them as ``startup_stage_seconds``.
+    """
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        """
+        Args:
+            started_at: ``time.perf_counter()`` value taken as early as possible in the entrypoint
+        """
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.reported = False
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict[str, float]:
+        """Log and export the breakdown once; returns stage durations in seconds, including ``total``."""
+        stages = {**self.stages, "total": time.perf_counter() - self.started_at}
+        if not self.reported:
+            self.reported = True
+            for name, seconds in stages.items():
+                STARTUP_SECONDS.set(seconds, stage=name)
+            logger.info("Startup finished", **{f"{name}_ms": round(seconds * 1000, 1) for name, seconds in stages.items()})
+        return stages
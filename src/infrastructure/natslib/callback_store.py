@@ -0,0 +1,33 @@
+from typing import Optional
+
+from nats.js.errors import KeyDeletedError, KeyNotFoundError
+
+from src.callbacks.codec import CallbackStore
+from src.infrastructure.natslib.client import NatsClient
+
+CALLBACKS_BUCKET = "callbacks"
+
+
+class NatsCallbackStore(CallbackStore):
+    """
+    Keeps callback data that does not fit into 64 bytes in a NATS KV bucket.
+
+    Tokens are content hashes, so the same payload is stored once. Keys expire after
+    `ttl` seconds; buttons older than that stop matching any handler.
+    """
+
+    def __init__(self, nats_client: NatsClient, ttl: float = 7 * 24 * 60 * 60) -> None:
+        self.nats_client = nats_client
+        self.ttl = ttl
+
+    async def put(self, token: str, value: str) -> None:
+        kv = await self.nats_client.get_or_create_kv_bucket(CALLBACKS_BUCKET, history=1, ttl=self.ttl)
+        await kv.put(token, value.encode())
+
+    async def get(self, token: str) -> Optional[str]:
+        kv = await self.nats_client.get_or_create_kv_bucket(CALLBACKS_BUCKET, history=1, ttl=self.ttl)
+        try:
+            entry = await kv.get(token)
+        except (KeyNotFoundError, KeyDeletedError):
+            return None
+        return entry.value.decode() if entry.value else None
@@ -1,6 +1,6 @@
 import asyncio
-from typing import Optional, Any, Dict
-from contextlib import asynccontextmanager
+from typing import AsyncContextManager, Optional, Any, Dict
+from contextlib import asynccontextmanager, nullcontext
 
 import ormsgpack
 import structlog
@@ -10,6 +10,8 @@ from nats.js.errors import BucketNotFoundError
 from nats.js.kv import KeyValue
 from nats.errors import TimeoutError as NatsTimeoutError
 
+from src.infrastructure.resilience.breaker import CircuitBreaker, CircuitOpenError
+
 
 logger = structlog.getLogger("NATS")
 
@@ -17,14 +19,17 @@ logger = structlog.getLogger("NATS")
 class NatsClient:
     """NATS client connection manager with JetStream and KV support."""
 
-    def __init__(self, servers: str) -> None:
+    def __init__(self, servers: str, breaker: Optional[CircuitBreaker] = None) -> None:
         """
         Initialize NATS client with server address.
 
         Args:
             servers: NATS server connection string (e.g., "nats://localhost:4222")
+            breaker: Circuit breaker for KV operations; while it is open they raise
+                `CircuitOpenError` instead of waiting for a timeout
         """
         self._servers = servers
+        self._breaker = breaker
         self._client = Client()
         self._js: Optional[JetStreamContext] = None
         self._is_connected = False
@@ -64,6 +69,10 @@ class NatsClient:
         self._kv_stores.clear()
         await logger.ainfo("Disconnected from NATS")
 
+    def guard(self) -> AsyncContextManager:
+        """Context of a single request to the server, guarded by the breaker if there is one."""
+        return self._breaker.call() if self._breaker is not None else nullcontext()
+
     @asynccontextmanager
     async def connection(self):
         """Async context manager for managing NATS connection lifecycle."""
@@ -94,13 +103,14 @@ class NatsClient:
             await logger.aerror(f"KV bucket `{bucket_name}` does not exist")
             raise
 
-    async def get_or_create_kv_bucket(self, bucket_name: str, history: int = 10) -> KeyValue:
+    async def get_or_create_kv_bucket(self, bucket_name: str, history: int = 10, ttl: Optional[float] = None) -> KeyValue:
         """
         Get an existing KV bucket or create it if it doesn't exist.
 
         Args:
             bucket_name: Name of the KV bucket to access or create
             history: Number of historical values to keep (default: 10)
+            ttl: Expiration of every key in seconds, applied only when the bucket is created
 
         Returns:
             KeyValue: NATS KV store instance
@@ -117,13 +127,15 @@ class NatsClient:
 
         try:
             # First try to get existing bucket
-            kv = await self.jetstream.key_value(bucket_name)
+            async with self.guard():
+                kv = await self.jetstream.key_value(bucket_name)
             await logger.ainfo(f"Accessed existing KV bucket: {bucket_name}")
         except BucketNotFoundError:
             # If it doesn't exist, create it
             try:
-                kv = await self.jetstream.create_key_value(bucket=bucket_name, history=history)
-                await logger.ainfo(f"Created new KV bucket: {bucket_name} with history={history}")
+                async with self.guard():
+                    kv = await self.jetstream.create_key_value(bucket=bucket_name, history=history, ttl=ttl)
+                await logger.ainfo(f"Created new KV bucket: {bucket_name} with history={history}, ttl={ttl}")
             except Exception as e:
                 await logger.aerror(f"Failed to create KV bucket `{bucket_name}`: {str(e)}")
                 raise
@@ -155,7 +167,8 @@ class NatsClient:
         await logger.adebug("2")
         serialized_value = ormsgpack.packb(value)
         await logger.adebug("3")
-        await kv.put(key, serialized_value)
+        async with self.guard():
+            await kv.put(key, serialized_value)
         await logger.adebug(f"Stored value in KV bucket `{bucket_name}` under key `{key}`")
 
     async def get_kv(
@@ -180,10 +193,13 @@ class NatsClient:
         """
         kv = await self.get_or_create_kv_bucket(bucket_name)
         try:
-            entry = await kv.get(key)
+            async with self.guard():
+                entry = await kv.get(key)
             if entry and entry.value:
                 return ormsgpack.unpackb(entry.value)
             return None
+        except CircuitOpenError:
+            raise
         except NatsTimeoutError:
             await logger.awarning(f"Timeout getting key `{key}` from bucket `{bucket_name}`")
             raise
@@ -209,7 +225,8 @@ class NatsClient:
             ValueError: If bucket doesn't exist or client not connected
         """
         kv = await self.get_or_create_kv_bucket(bucket_name)
-        await kv.delete(key)
+        async with self.guard():
+            await kv.delete(key)
         await logger.adebug(f"Deleted key `{key}` from KV bucket `{bucket_name}`")
 
 
@@ -4,8 +4,7 @@ from typing import Optional, Callable, Any
 
 import ormsgpack
 import structlog
-from nats.aio.msg import Msg
-from nats.js.api import ConsumerConfig, AckPolicy, DeliverPolicy
+from nats.js.kv import KeyValue
 
 from ..client import NatsClient
 
@@ -24,18 +23,22 @@ class ConfigurationWatcher:
         """
         self._nats_client = nats_client
         self._watch_task: Optional[Task[Any]] = None
+        self._watcher: Optional[KeyValue.KeyWatcher] = None
 
     async def set_watching(
             self,
             bucket_name: str,
-            callback: Callable[[Msg], Any]
+            callback: Callable[[KeyValue.Entry], Any]
     ) -> None:
         """
         Start watching configuration changes in specified bucket.
 
+        Every process gets its own ephemeral ordered consumer (`KeyValue.watch`), so each
+        worker receives every change; the current value of each key is delivered first.
+
         Args:
             bucket_name: Name of the KV bucket to watch
-            callback: Async callback function to process messages
+            callback: Async callback function to process entries
 
         Raises:
             ValueError: If NATS client is not connected
@@ -43,29 +46,18 @@ class ConfigurationWatcher:
         if not self._nats_client.is_connected:
             raise ValueError("NATS client must be connected before watching")
 
-        subject = f"$KV.{bucket_name}.>"
-        consumer_config = ConsumerConfig(
-            durable_name=f"{bucket_name}_watcher",
-            ack_policy=AckPolicy.EXPLICIT,
-            deliver_policy=DeliverPolicy.ALL,
-        )
-
-        sub = await self._nats_client.jetstream.subscribe(
-            subject=subject,
-            durable=f"{bucket_name}_watcher",
-            config=consumer_config
-        )
+        kv = await self._nats_client.get_or_create_kv_bucket(bucket_name)
+        self._watcher = watcher = await kv.watch(">", ignore_deletes=True)
 
         async def watch_loop():
-            try:
-                async for msg in sub.messages:
-                    await callback(msg)
-            except asyncio.CancelledError:
-                await sub.unsubscribe()
-                raise
-            except Exception as e:
-                await logger.aerror(f"Error in watch loop: {str(e)}")
-                raise
+            async for entry in watcher:
+                if entry is None:
+                    continue  # end of initial values
+                try:
+                    await callback(entry)
+                except Exception as e:
+                    # A bad value must not stop watching for the next ones
+                    await logger.aerror(f"Error in watch callback: {str(e)}", key=entry.key)
 
         self._watch_task = asyncio.create_task(watch_loop())
         await logger.ainfo(
@@ -85,6 +77,12 @@ class ConfigurationWatcher:
         except asyncio.CancelledError:
             pass
         self._watch_task = None
+        if self._watcher is not None:
+            try:
+                await self._watcher.stop()
+            except Exception as e:
+                await logger.awarning(f"Watcher is not stopped cleanly: {str(e)}")
+            self._watcher = None
         await logger.ainfo("Configuration watcher stopped")
 
 
@@ -93,11 +91,10 @@ async def main():
     nats_client = NatsClient("nats://localhost:4222")
     config_watcher = ConfigurationWatcher(nats_client)
 
-    async def example_callback(msg: Msg) -> None:
-        """Example callback for processing configuration messages."""
-        data = ormsgpack.unpackb(msg.data)
+    async def example_callback(entry: KeyValue.Entry) -> None:
+        """Example callback for processing configuration entries."""
+        data = ormsgpack.unpackb(entry.value)
         print(f"Received configuration update: {data}")
-        await msg.ack()
 
     try:
         async with nats_client.connection():
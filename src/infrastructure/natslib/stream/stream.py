@@ -1,12 +1,14 @@
 import asyncio
-from typing import Optional, Callable, Any, Awaitable, Dict
+from contextlib import suppress
+from typing import Optional, Callable, Any, Awaitable, Dict, List
 from functools import partial
 
 import ormsgpack
 import structlog
 from nats.aio.msg import Msg
-from nats.js.api import ConsumerConfig, AckPolicy, DeliverPolicy
+from nats.js.api import ConsumerConfig, AckPolicy, DeliverPolicy, PubAck
 from nats.errors import TimeoutError as NATSTimeoutError
+from nats.js.errors import NotFoundError
 
 from ..client import NatsClient
 
@@ -15,9 +17,10 @@ logger = structlog.getLogger("NATS")
 
 class SubscriptionWrapper:
     """Wraps subscription-related data."""
-    def __init__(self, task: asyncio.Task, pull_sub) -> None:
+    def __init__(self, task: Optional[asyncio.Task], pull_sub) -> None:
         self.task = task
         self.pull_sub = pull_sub
+        self.batch: List[Msg] = []  # fetched messages whose callback has not returned yet
 
 
 class StreamClient:
@@ -35,6 +38,8 @@ class StreamClient:
         self._subscriptions: Dict[str, SubscriptionWrapper] = {}
         self._callback: Optional[Callable[[Msg], Awaitable[None]]] = None
         self._ack_wait_seconds: int = 10
+        self._batch_size: int = 1
+        self._draining = False
 
     async def _watch_subject(self, subject: str, durable_name: str) -> None:
         """Internal method to watch messages from a single subject."""
@@ -51,31 +56,57 @@ class StreamClient:
             config=consumer_config,
         )
 
+        wrapper = SubscriptionWrapper(task=None, pull_sub=pull_sub)
+
+        async def handle(msg: Msg) -> None:
+            try:
+                await self._callback(msg)
+            except Exception as e:
+                # One failing message must not stop the consumer or its siblings in the batch
+                await logger.aerror("Message callback failed", subject=subject, error=str(e))
+                if not msg.is_acked:
+                    with suppress(Exception):
+                        await msg.nak()
+            wrapper.batch.remove(msg)
+
         async def watch_loop():
             try:
-                while True:
+                while not self._draining:
                     try:
-                        msgs = await pull_sub.fetch(1, timeout=5)
-                        for msg in msgs:
-                            await self._callback(msg)
+                        wrapper.batch = await pull_sub.fetch(self._batch_size, timeout=5)
+                        if len(wrapper.batch) == 1:
+                            await handle(wrapper.batch[0])
+                        else:
+                            await asyncio.gather(*(handle(msg) for msg in list(wrapper.batch)))
                     except NATSTimeoutError:
                         await asyncio.sleep(1)
             except asyncio.CancelledError:
-                await pull_sub.unsubscribe()
+                await self._nak_unfinished(subject, wrapper.batch)
                 raise
             except Exception as e:
                 await logger.aerror("Error in watch loop", subject=subject, error=str(e))
                 raise
+            finally:
+                await pull_sub.unsubscribe()
 
-        task = asyncio.create_task(watch_loop())
-        self._subscriptions[subject] = SubscriptionWrapper(task=task, pull_sub=pull_sub)
+        wrapper.task = asyncio.create_task(watch_loop())
+        self._subscriptions[subject] = wrapper
         await logger.ainfo("Started watching subject", subject=subject)
 
+    @staticmethod
+    async def _nak_unfinished(subject: str, msgs: List[Msg]) -> None:
+        """Return messages of an interrupted batch for immediate redelivery instead of after ack_wait."""
+        unfinished = [msg for msg in msgs if not msg.is_acked]
+        if unfinished:
+            await asyncio.gather(*(msg.nak() for msg in unfinished), return_exceptions=True)
+            await logger.ainfo("Unfinished messages returned to the stream", subject=subject, count=len(unfinished))
+
     async def update_subjects(
         self,
         subjects: list[str],
         callback: Callable[[Msg], Awaitable[None]],
-        ack_wait_seconds: int = 10
+        ack_wait_seconds: int = 10,
+        batch_size: int = 1
     ) -> None:
         """
         Update the list of subjects to watch. Stops old and starts new ones.
@@ -84,12 +115,14 @@ class StreamClient:
             subjects: List of subjects to subscribe to
             callback: Async callback for handling messages
             ack_wait_seconds: Ack wait in seconds
+            batch_size: Messages fetched per pull; a batch is processed concurrently
         """
         if not self._nats_client.is_connected:
             raise ValueError("NATS client must be connected before watching")
 
         self._callback = callback
         self._ack_wait_seconds = ack_wait_seconds
+        self._batch_size = batch_size
 
         old_subjects = set(self._subscriptions.keys())
         new_subjects = set(subjects)
@@ -107,48 +140,84 @@ class StreamClient:
             await logger.ainfo("Stopped watching subject", subject=subject)
 
         for subject in to_add:
-            await self._watch_subject(subject, durable_name=f"{subject}_consumer")
+            # Durable names may not contain dots
+            await self._watch_subject(subject, durable_name=f"{subject}_consumer".replace(".", "_"))
 
-    async def create_stream(self, name: str, subjects: list[str]) -> None:
+    async def create_stream(self, name: str, subjects: list[str], **params: Any) -> None:
         """
-        Create a NATS JetStream stream if not exists.
+        Create a NATS JetStream stream, or bring the config of an existing one up to date.
 
         Args:
             name: Stream name
             subjects: List of subjects
+            params: Extra `StreamConfig` fields (e.g. `duplicate_window`)
         """
         jetstream = self._nats_client.jetstream
         try:
-            await jetstream.stream_info(name)
-            await logger.ainfo("Stream already exists", stream=name)
-        except Exception:
-            await jetstream.add_stream(name=name, subjects=subjects)
+            info = await jetstream.stream_info(name)
+        except NotFoundError:
+            await jetstream.add_stream(name=name, subjects=subjects, **params)
             await logger.ainfo("Stream created", stream=name, subjects=subjects)
+            return
+
+        config = info.config.evolve(subjects=subjects, **params)
+        if config == info.config:
+            await logger.ainfo("Stream already exists", stream=name)
+            return
+        await jetstream.update_stream(config=config)
+        await logger.ainfo("Stream config updated", stream=name, subjects=subjects)
 
-    async def publish(self, subject: str, message: dict) -> None:
+    async def publish(self, subject: str, message: dict, msg_id: Optional[str] = None) -> PubAck:
         """
         Publish message via JetStream.
 
         Args:
             subject: Target subject
             message: Serializable message
+            msg_id: Deduplication id, repeated publishes within the stream duplicate window are dropped
+
+        Returns:
+            PubAck: Stream acknowledgement, `duplicate` is set for dropped re-publishes
         """
         try:
             await logger.adebug("Publishing message", subject=subject, message=message)
             data = ormsgpack.packb(message)
-            await self._nats_client.jetstream.publish(subject, data)
+            headers = {"Nats-Msg-Id": msg_id} if msg_id else None
+            return await self._nats_client.jetstream.publish(subject, data, headers=headers)
         except Exception as e:
             await logger.aerror("Failed to publish message", subject=subject, error=str(e))
             raise
 
-    async def stop_all(self) -> None:
-        """Stop all watchers and clean resources."""
-        for subject, wrapper in self._subscriptions.items():
-            wrapper.task.cancel()
-            try:
-                await wrapper.task
-            except asyncio.CancelledError:
-                pass
-            await logger.ainfo("Stopped watching subject", subject=subject)
+    async def drain(self, timeout: float = 10.0) -> None:
+        """
+        Stop all watchers without losing fetched messages.
 
-        self._subscriptions.clear()
+        No new batches are fetched; batches in progress get `timeout` seconds to finish, then
+        they are cancelled and their unfinished messages are nak'ed, so another consumer
+        receives them right away instead of after `ack_wait`.
+
+        Args:
+            timeout: Seconds to wait for batches in progress
+        """
+        self._draining = True
+        try:
+            for wrapper in self._subscriptions.values():
+                if not wrapper.batch:
+                    wrapper.task.cancel()  # waiting for messages, nothing to finish
+
+            tasks = [wrapper.task for wrapper in self._subscriptions.values()]
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            for subject in self._subscriptions:
+                await logger.ainfo("Stopped watching subject", subject=subject)
+            self._subscriptions.clear()
+        finally:
+            self._draining = False
+
+    async def stop_all(self) -> None:
+        """Stop all watchers at once, unfinished messages are nak'ed."""
+        await self.drain(timeout=0)
@@ -8,8 +8,7 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
-from src import Settings
-from src.infrastructure.configuration.dynaconf_controller.main import Config
+from src.infrastructure.configuration.snapshot import load_settings
 from src.infrastructure.repository.models import Base
 
 logger: structlog.BoundLogger = structlog.get_logger("Alembic")
@@ -25,24 +24,30 @@ VERSION_TABLE_SCHEMA = "public"
 if config.attributes.get("configure_logger", True) and config.config_file_name:
     fileConfig(config.config_file_name)
 
-# Загрузка конфигурации из dynaconf
-config_loader = Config(env="DEV", url_templates={"postgresql": "postgresql+asyncpg"})
-try:
-    settings = Settings(**config_loader.raw)
-except ValidationError as e:
-    print("Ошибка конфигурации:\n")
-    for error in e.errors():
-        loc = ".".join(str(x) for x in error['loc'])
-        msg = error['msg']
-        print(f"  - {loc}: {msg}")
-    raise SystemExit(1)
+
+def load_database_url() -> str:
+    """Строка подключения из снимка конфигурации, если её не передало приложение"""
+    try:
+        settings = load_settings()
+    except ValidationError as e:
+        print("Ошибка конфигурации:\n")
+        for error in e.errors():
+            loc = ".".join(str(x) for x in error['loc'])
+            msg = error['msg']
+            print(f"  - {loc}: {msg}")
+        raise SystemExit(1)
+    return str(settings.postgresql_url)
+
+
+# Приложение передаёт URL через attributes, чтобы не собирать Config и Settings второй раз
+database_url = config.attributes.get("sqlalchemy_url") or load_database_url()
 
 # Проверка на пустой или не заданный URL
-if not settings.postgresql_url or not settings.postgresql_url.strip():
+if not database_url or not database_url.strip():
     raise RuntimeError("DATABASE_URL is not set or empty")
 
-config.set_main_option("sqlalchemy.url", settings.postgresql_url)
-logger.debug("PostgreSQL configuration loaded", url=settings.postgresql_url)
+config.set_main_option("sqlalchemy.url", database_url)
+logger.debug("PostgreSQL configuration loaded", url=database_url)
 
 
 def run_migrations_offline() -> None:
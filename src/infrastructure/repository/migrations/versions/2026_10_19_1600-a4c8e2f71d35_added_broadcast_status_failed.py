@@ -0,0 +1,32 @@
+"""added broadcast status failed
+
+Revision ID: a4c8e2f71d35
+Revises: 5e9a2c7d4f16
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f71d35'
+down_revision: Union[str, None] = '5e9a2c7d4f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE broadcaststatusenum ADD VALUE IF NOT EXISTS 'failed'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value: the type is recreated without it
+    op.execute("UPDATE broadcasts SET status = 'finished' WHERE status = 'failed'")
+    op.execute("ALTER TYPE broadcaststatusenum RENAME TO broadcaststatusenum_old")
+    op.execute("CREATE TYPE broadcaststatusenum AS ENUM ('created', 'enqueuing', 'enqueued', 'finished')")
+    op.execute("ALTER TABLE broadcasts ALTER COLUMN status TYPE broadcaststatusenum USING status::text::broadcaststatusenum")
+    op.execute("DROP TYPE broadcaststatusenum_old")
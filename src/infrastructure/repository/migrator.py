@@ -0,0 +1,126 @@
+import asyncio
+from typing import Optional, Set, Tuple
+
+import structlog
+from alembic import command as alembic_command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from alembic.script.revision import RevisionError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src import Loggers
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+ALEMBIC_INI = "alembic.ini"
+VERSION_TABLE = "alembic_version"
+
+
+class MigrationMode:
+    """Значения `application.migrations`"""
+
+    upgrade = "upgrade"  # догнать head при старте, если база отстаёт
+    verify = "verify"  # не запускаться на отстающей базе, миграции выполняет `python -m src.main.migrate`
+    skip = "skip"  # не обращаться к базе при старте
+
+    ALL = (upgrade, verify, skip)
+
+
+class PendingMigrationsError(RuntimeError):
+    pass
+
+
+def alembic_config(url: Optional[str] = None) -> AlembicConfig:
+    """
+    Конфигурация Alembic без настройки логгеров.
+
+    Args:
+        url: Строка подключения; если передана, env.py не загружает Settings повторно
+    """
+    config = AlembicConfig(file_=ALEMBIC_INI, attributes={"configure_logger": False})
+    if url:
+        config.attributes["sqlalchemy_url"] = url
+    return config
+
+
+def head_revisions(config: AlembicConfig) -> Set[str]:
+    """Head-ревизии из каталога миграций, без подключения к базе и без env.py"""
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def applied_revisions(config: AlembicConfig, current: Set[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    История базы по каталогу миграций.
+
+    Returns:
+        Tuple[Set[str], Set[str]]: Ревизии, выполненные на базе (текущие и все их предки),
+                                   и текущие ревизии, которых нет в каталоге этой сборки
+    """
+    script = ScriptDirectory.from_config(config)
+    known, unknown = set(), set()
+    for revision in current:
+        try:
+            script.revision_map.get_revision(revision)
+        except RevisionError:
+            unknown.add(revision)
+        else:
+            known.add(revision)
+
+    applied = {script_revision.revision for script_revision in script.iterate_revisions(tuple(known), "base")} if known else set()
+    return applied, unknown
+
+
+async def current_revisions(engine: AsyncEngine) -> Set[str]:
+    """Ревизии базы одним SELECT; пустое множество для базы без таблицы версий"""
+    async with engine.connect() as connection:
+        try:
+            result = await connection.execute(text(f"SELECT version_num FROM {VERSION_TABLE}"))
+        except DBAPIError:
+            return set()
+        return set(result.scalars())
+
+
+def upgrade(config: AlembicConfig, revision: str = "head") -> None:
+    alembic_command.upgrade(config, revision)
+
+
+async def ensure_migrations(engine: AsyncEngine, url: str, mode: str = MigrationMode.upgrade) -> str:
+    """
+    Проверить ревизию базы и при необходимости выполнить миграции.
+
+    Args:
+        engine: Движок приложения, используется только для чтения ревизии
+        url: Строка подключения для Alembic
+        mode: Один из `MigrationMode`
+
+    Returns:
+        str: `skipped`, `up_to_date`, `ahead` или `upgraded`
+
+    Raises:
+        PendingMigrationsError: База отстаёт от head в режиме `verify`
+    """
+    if mode not in MigrationMode.ALL:
+        raise ValueError(f"Unknown migrations mode `{mode}`, expected one of: {', '.join(MigrationMode.ALL)}")
+    if mode == MigrationMode.skip:
+        return "skipped"
+
+    config = alembic_config(url)
+    heads, current = head_revisions(config), await current_revisions(engine)
+    applied, unknown = applied_revisions(config, current)
+    if unknown:
+        # Базу уже обновила более новая сборка (rolling restart после `make migrate`):
+        # её миграции расширяют схему этой сборки, откатывать или догонять нечего
+        await logger.awarning("Database is ahead of this build", current=sorted(current), heads=sorted(heads), unknown=sorted(unknown))
+        return "ahead"
+    if heads <= applied:
+        return "up_to_date"
+
+    if mode == MigrationMode.verify:
+        raise PendingMigrationsError(f"Database revision {sorted(current)} is not at head {sorted(heads)}, run `make migrate`")
+
+    await logger.ainfo("Upgrading database", current=sorted(current), heads=sorted(heads))
+    # env.py запускает собственный event loop, поэтому Alembic работает в отдельном потоке
+    await asyncio.to_thread(upgrade, config)
+    return "upgraded"
@@ -2,8 +2,7 @@ import enum
 
 from sqlalchemy import BigInteger, Integer, Text, Enum, DateTime, func, ForeignKey, Boolean
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 from sqlalchemy.orm.decl_api import DeclarativeMeta
 
 Base: DeclarativeMeta = declarative_base()
@@ -60,6 +59,14 @@ class RoleEnum(str, enum.Enum):
     customer = "customer"
 
 
+class BroadcastStatusEnum(str, enum.Enum):
+    created = "created"
+    enqueuing = "enqueuing"
+    enqueued = "enqueued"
+    finished = "finished"
+    failed = "failed"  # Telegram rejected the text itself, the rest of the audience is skipped
+
+
 class UserModel(Base, SQLAlchemyMixin):
     __tablename__ = "users"
 
@@ -87,6 +94,7 @@ class FreelancerProfileAccountModel(Base, SQLAlchemyMixin):
     reviews_count: Mapped[int] = mapped_column(Integer, default=0)
     karma: Mapped[int] = mapped_column(Integer, default=0)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("UserModel", backref="profile", uselist=False)
     languages = relationship("ProfileAccountLanguageModel", back_populates="profile", cascade="all, delete-orphan")
@@ -115,3 +123,33 @@ class ProfileAccountStackModel(Base, SQLAlchemyMixin):
     url: Mapped[str] = mapped_column(Text, nullable=True)
 
     profile = relationship("FreelancerProfileAccountModel", back_populates="stacks")
+
+
+class BroadcastModel(Base, SQLAlchemyMixin):
+    __tablename__ = "broadcasts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    author_telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    status: Mapped[BroadcastStatusEnum] = mapped_column(Enum(BroadcastStatusEnum), nullable=False)
+
+    # Воркер, который сейчас ставит получателей в очередь, и срок его аренды
+    producer: Mapped[str] = mapped_column(Text, nullable=True)
+    lease_until: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    last_shard: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    last_user_id: Mapped[int] = mapped_column(Integer, default=0)
+    enqueued: Mapped[int] = mapped_column(Integer, default=0)
+    sent: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class BroadcastFailureModel(Base, SQLAlchemyMixin):
+    __tablename__ = "broadcast_failures"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    broadcast_id: Mapped[int] = mapped_column(ForeignKey("broadcasts.id", ondelete="CASCADE"), index=True, nullable=False)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
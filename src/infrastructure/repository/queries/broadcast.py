@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import or_, select, update, insert
+
+from src.core.domain.entities import BroadcastEntity, BroadcastFailureEntity
+from src.core.domain.interfaces.database.broadcast import AbstractBroadcastRepo
+from src.infrastructure.repository.models import BroadcastModel, BroadcastFailureModel, BroadcastStatusEnum
+from src.infrastructure.repository.query_base import Query
+
+
+class BroadcastQuery(Query, AbstractBroadcastRepo):
+    async def add_broadcast(self, broadcast: BroadcastEntity) -> BroadcastEntity:
+        if not broadcast:
+            raise ValueError("Entity must be mandatory")
+
+        result = await self.session.execute(
+            insert(BroadcastModel)
+            .values(broadcast.to_dict_database())
+            .returning(BroadcastModel)
+        )
+
+        return BroadcastEntity.from_dict(result.scalar_one().to_entity_dict())
+
+    async def get_broadcast(self, broadcast_id: int) -> Optional[BroadcastEntity]:
+        result = await self.session.execute(
+            select(BroadcastModel)
+            .where(BroadcastModel.id == broadcast_id)
+        )
+
+        broadcast_model: Optional[BroadcastModel] = result.scalar_one_or_none()
+        if not broadcast_model:
+            return None
+
+        return BroadcastEntity.from_dict(broadcast_model.to_entity_dict())
+
+    async def get_broadcasts_by_status(self, status: BroadcastStatusEnum) -> List[BroadcastEntity]:
+        result = await self.session.execute(
+            select(BroadcastModel)
+            .where(BroadcastModel.status == status)
+            .order_by(BroadcastModel.id)
+        )
+
+        return [BroadcastEntity.from_dict(model.to_entity_dict()) for model in result.scalars().all()]
+
+    async def set_status(self, broadcast_id: int, status: BroadcastStatusEnum) -> None:
+        await self.session.execute(
+            update(BroadcastModel)
+            .where(BroadcastModel.id == broadcast_id)
+            .values(status=status)
+        )
+
+    async def acquire_lease(self, broadcast_id: int, producer: str, lease_ttl: float) -> Optional[BroadcastEntity]:
+        # Compare-and-swap: the lease is taken only when it is free, expired or already ours
+        now = datetime.now(timezone.utc)
+        result = await self.session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.status.in_((BroadcastStatusEnum.created, BroadcastStatusEnum.enqueuing)),
+                or_(
+                    BroadcastModel.lease_until.is_(None),
+                    BroadcastModel.lease_until < now,
+                    BroadcastModel.producer == producer,
+                ),
+            )
+            .values(status=BroadcastStatusEnum.enqueuing, producer=producer, lease_until=now + timedelta(seconds=lease_ttl))
+            .returning(BroadcastModel)
+        )
+
+        broadcast_model: Optional[BroadcastModel] = result.scalar_one_or_none()
+        if not broadcast_model:
+            return None
+
+        return BroadcastEntity.from_dict(broadcast_model.to_entity_dict())
+
+    async def save_checkpoint(
+            self,
+            broadcast_id: int,
+            producer: str,
+            lease_ttl: float,
+            last_user_id: int,
+            enqueued: int,
+            last_shard: int = 0,
+    ) -> bool:
+        # Checkpoint of a producer that lost its lease is dropped, its batch is counted by the new owner
+        result = await self.session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.status == BroadcastStatusEnum.enqueuing,
+                BroadcastModel.producer == producer,
+            )
+            .values(
+                last_shard=last_shard,
+                last_user_id=last_user_id,
+                enqueued=BroadcastModel.enqueued + enqueued,
+                lease_until=datetime.now(timezone.utc) + timedelta(seconds=lease_ttl),
+            )
+        )
+
+        return result.rowcount > 0
+
+    async def release_lease(self, broadcast_id: int, producer: str) -> bool:
+        result = await self.session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.status == BroadcastStatusEnum.enqueuing,
+                BroadcastModel.producer == producer,
+            )
+            .values(status=BroadcastStatusEnum.enqueued, producer=None, lease_until=None)
+        )
+
+        return result.rowcount > 0
+
+    async def add_progress(self, broadcast_id: int, sent: int, failed: int) -> BroadcastEntity:
+        result = await self.session.execute(
+            update(BroadcastModel)
+            .where(BroadcastModel.id == broadcast_id)
+            .values(sent=BroadcastModel.sent + sent, failed=BroadcastModel.failed + failed)
+            .returning(BroadcastModel)
+        )
+
+        return BroadcastEntity.from_dict(result.scalar_one().to_entity_dict())
+
+    async def finish_if_complete(self, broadcast_id: int) -> bool:
+        # Single statement: the row lock serializes it with concurrent progress updates
+        result = await self.session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.status == BroadcastStatusEnum.enqueued,
+                BroadcastModel.sent + BroadcastModel.failed >= BroadcastModel.enqueued,
+            )
+            .values(status=BroadcastStatusEnum.finished)
+        )
+
+        return result.rowcount > 0
+
+    async def add_failures(self, failures: List[BroadcastFailureEntity]) -> None:
+        if not failures:
+            return
+
+        await self.session.execute(
+            insert(BroadcastFailureModel),
+            [failure.to_dict_database() for failure in failures]
+        )
@@ -1,15 +1,16 @@
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import insert
 
 from src.core.domain.entities import FreelancerProfileEntity
 from src.core.domain.interfaces.database.profile import AbstractFreelancerProfileRepo
 from src.infrastructure.repository.models import FreelancerProfileAccountModel
-from src.infrastructure.repository.query_base import Query
+from src.infrastructure.repository.query_base import Query, read_only
 
 
 class FreelancerProfileQuery(Query, AbstractFreelancerProfileRepo):
+    @read_only
     async def get_profile_by_user_id(self, user_id: int) -> Optional[FreelancerProfileEntity]:
         result = await self.session.execute(
             select(FreelancerProfileAccountModel)
@@ -33,7 +34,11 @@ class FreelancerProfileQuery(Query, AbstractFreelancerProfileRepo):
         result = await self.session.execute(
             insert(FreelancerProfileAccountModel)
             .values(values)
-            .on_conflict_do_update(index_elements=["user_id"], set_={k: v for k, v in values.items() if k != "id"})
+            .on_conflict_do_update(
+                index_elements=["user_id"],
+                # onupdate is not applied to ON CONFLICT, the version is bumped explicitly
+                set_={**{k: v for k, v in values.items() if k != "id"}, "updated_at": func.now()}
+            )
             .returning(FreelancerProfileAccountModel)
         )
 
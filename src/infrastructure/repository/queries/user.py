@@ -1,15 +1,16 @@
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 
-from src.core.domain.entities import UserEntity
+from src.core.domain.entities import UserEntity, BroadcastRecipientEntity
 from src.core.domain.interfaces.database.user import AbstractUserRepo
 from src.infrastructure.repository.models import UserModel
-from src.infrastructure.repository.query_base import Query
+from src.infrastructure.repository.query_base import Query, read_only
 
 
 class UserQuery(Query, AbstractUserRepo):
+    @read_only
     async def get_user_by_telegram_id(self, user_telegram_id: int) -> Optional[UserEntity]:
         result = await self.session.execute(
             select(UserModel)
@@ -22,6 +23,18 @@ class UserQuery(Query, AbstractUserRepo):
 
         return UserEntity.from_dict(user_model.to_entity_dict())
 
+    @read_only
+    async def get_users_by_telegram_ids(self, user_telegram_ids: List[int]) -> List[UserEntity]:
+        if not user_telegram_ids:
+            return []
+
+        result = await self.session.execute(
+            select(UserModel)
+            .where(UserModel.telegram_id.in_(user_telegram_ids))
+        )
+
+        return [UserEntity.from_dict(user_model.to_entity_dict()) for user_model in result.scalars()]
+
 
     async def add_user(self, user: UserEntity) -> UserEntity:
         if not user:
@@ -37,3 +50,15 @@ class UserQuery(Query, AbstractUserRepo):
         )
 
         return UserEntity.from_dict(result.scalar_one_or_none().to_entity_dict())
+
+    async def stream_recipients(self, after_user_id: int = 0, batch_size: int = 1000) -> AsyncIterator[List[BroadcastRecipientEntity]]:
+        """Server-side cursor over users ordered by id, yielded in batches."""
+        result = await self.session.stream(
+            select(UserModel.id, UserModel.telegram_id)
+            .where(UserModel.id > after_user_id)
+            .order_by(UserModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        async for rows in result.partitions():
+            yield [BroadcastRecipientEntity(user_id=row.id, telegram_id=row.telegram_id) for row in rows]
@@ -1,4 +1,35 @@
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.core.domain.entities import PageEntity, PageRequestEntity
+
+AFTER, BEFORE = ">", "<"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def read_only(method: F) -> F:
+    """Пометить метод репозитория как читающий: при наличии реплик он выполняется на реплике"""
+    method.__read_only__ = True
+    return method
+
+
+def is_read_only(method: Any) -> bool:
+    return getattr(method, "__read_only__", False)
+
+
+def parse_cursor(cursor: Optional[str]) -> tuple[str, Optional[int]]:
+    """
+    Разобрать курсор keyset-пагинации `>id` / `<id`.
+
+    Курсор приходит из callback_data и может быть подделан: некорректный курсор означает первую страницу.
+    """
+    if cursor and cursor[0] in (AFTER, BEFORE) and cursor[1:].isdecimal():
+        return cursor[0], int(cursor[1:])
+    return AFTER, None
 
 
 class Query:
@@ -6,3 +37,54 @@ class Query:
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+
+    async def paginate(
+            self,
+            statement: Select,
+            request: PageRequestEntity,
+            key: Optional[InstrumentedAttribute] = None,
+            mapper: Callable[[Any], Any] = lambda row: row,
+    ) -> PageEntity:
+        """
+        Выбрать страницу без COUNT: запрашивается `limit + 1` строк, лишняя означает следующую страницу.
+
+        Args:
+            statement: select(...) одной сущности
+            request: Запрос страницы
+            key: Уникальная сортируемая колонка (обычно id) — включает режим курсора (keyset),
+                 иначе используется OFFSET
+            mapper: Преобразование модели в сущность
+
+        Returns:
+            PageEntity
+        """
+        if key is None:
+            result = await self.session.execute(statement.offset(request.offset).limit(request.limit + 1))
+            rows = result.scalars().all()
+            return PageEntity(items=[mapper(row) for row in rows[:request.limit]], has_next=len(rows) > request.limit)
+
+        direction, value = parse_cursor(request.cursor)
+        if direction == BEFORE:
+            statement = statement.where(key < value).order_by(key.desc())
+        else:
+            statement = statement.where(key > value).order_by(key) if value is not None else statement.order_by(key)
+
+        result = await self.session.execute(statement.limit(request.limit + 1))
+        rows = result.scalars().all()
+        more = len(rows) > request.limit
+        rows = rows[:request.limit]
+        if direction == BEFORE:
+            rows.reverse()
+        if not rows:
+            return PageEntity()
+
+        first, last = getattr(rows[0], key.key), getattr(rows[-1], key.key)
+        # Идём вперёд: назад можно, если пришли по курсору; идём назад: вперёд можно всегда
+        has_prev = more if direction == BEFORE else value is not None
+        has_next = more if direction == AFTER else True
+        return PageEntity(
+            items=[mapper(row) for row in rows],
+            has_next=has_next,
+            next_cursor=f"{AFTER}{last}" if has_next else None,
+            prev_cursor=f"{BEFORE}{first}" if has_prev else None,
+        )
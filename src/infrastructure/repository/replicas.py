@@ -0,0 +1,234 @@
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.repository.query_base import is_read_only
+from src.infrastructure.resilience.dependencies import POSTGRES_FAILURES
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+DB_READS_TOTAL = REGISTRY.counter("db_reads_total", "Read-only repository calls by target", labelnames=("target",))
+DB_REPLICA_HEALTHY = REGISTRY.gauge("db_replica_healthy", "Replica health: 1 healthy, 0 excluded from routing", labelnames=("replica",))
+
+R = TypeVar("R")
+
+
+def replica_urls(primary_url: str, replicas: Optional[str]) -> List[str]:
+    """
+    URL реплик из `postgresql.replicas`: через запятую полные URL или `host[:port]`,
+    для которых логин, пароль и база берутся из URL основного сервера.
+    """
+    urls = []
+    primary = make_url(primary_url)
+    for item in (replicas or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "://" in item:
+            urls.append(item)
+            continue
+        host, _, port = item.partition(":")
+        urls.append(primary.set(host=host, port=int(port) if port else primary.port).render_as_string(hide_password=False))
+    return urls
+
+
+class ReplicaPool:
+    """
+    Пул реплик для чтения.
+
+    * Реплика выбирается по кругу среди здоровых, одна на update.
+    * Реплика, на которой чтение упало с ошибкой соединения, исключается до проверки:
+      каждые `check_interval` секунд исключённым репликам отправляется `SELECT 1`.
+    * После записи пользователь `sticky_ttl` секунд читает с основного сервера — реплика
+      может отставать, а следующий update должен видеть свою запись.
+    """
+
+    def __init__(
+            self,
+            urls: List[str],
+            check_interval: float = 5.0,
+            check_timeout: float = 2.0,
+            sticky_ttl: float = 5.0,
+            sticky_size: int = 100000,
+            **engine_options: Any,
+    ) -> None:
+        self.engines: List[AsyncEngine] = [create_async_engine(url=url, **engine_options) for url in urls]
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.sticky_ttl = sticky_ttl
+        self.sticky_size = sticky_size
+
+        self._healthy: List[bool] = [True] * len(self.engines)
+        self._next = 0
+        self._writers: OrderedDict[Hashable, float] = OrderedDict()
+        self._checker: Optional[asyncio.Task] = None
+        for index in range(len(self.engines)):
+            DB_REPLICA_HEALTHY.set(1, replica=str(index))
+
+    async def start(self) -> None:
+        if self._checker is None and self.engines:
+            self._checker = asyncio.create_task(self._check_loop())
+
+    async def close(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            await asyncio.gather(self._checker, return_exceptions=True)
+            self._checker = None
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
+
+    def acquire(self, key: Optional[Hashable] = None) -> Optional[AsyncEngine]:
+        """Следующая здоровая реплика; None — читать с основного сервера."""
+        if key is not None and self._recent_writer(key):
+            return None
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            if self._healthy[index]:
+                return self.engines[index]
+        return None
+
+    def written(self, key: Optional[Hashable]) -> None:
+        """Запомнить запись пользователя `key`: его чтения уходят на основной сервер."""
+        if key is None or not self.sticky_ttl:
+            return
+        self._writers[key] = time.monotonic() + self.sticky_ttl
+        self._writers.move_to_end(key)
+        if len(self._writers) > self.sticky_size:
+            self._writers.popitem(last=False)
+
+    def mark_down(self, engine: AsyncEngine, error: BaseException) -> None:
+        index = self.engines.index(engine)
+        if self._healthy[index]:
+            self._healthy[index] = False
+            DB_REPLICA_HEALTHY.set(0, replica=str(index))
+            logger.warning("Replica excluded from reads", replica=index, error=str(error))
+
+    def _recent_writer(self, key: Hashable) -> bool:
+        expires = self._writers.get(key)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        del self._writers[key]
+        return False
+
+    async def _check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            for index, engine in enumerate(self.engines):
+                if not self._healthy[index] and await self._ping(engine):
+                    self._healthy[index] = True
+                    DB_REPLICA_HEALTHY.set(1, replica=str(index))
+                    await logger.ainfo("Replica is back in rotation", replica=index)
+
+    async def _ping(self, engine: AsyncEngine) -> bool:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            return True
+        except POSTGRES_FAILURES:
+            return False
+
+
+class ReadRouting:
+    """
+    Маршрутизация чтений одного update.
+
+    Сессия реплики открывается при первом чтении. После первой записи, а также после
+    ошибки реплики все чтения update идут в основную сессию: она видит свои
+    незафиксированные изменения (read-your-writes).
+    """
+
+    def __init__(self, pool: ReplicaPool, key: Optional[Hashable] = None) -> None:
+        self.pool = pool
+        self.key = key
+        self.wrote = False
+        self._engine = pool.acquire(key)
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def replica_session(self) -> Optional[AsyncSession]:
+        if self.wrote or self._engine is None:
+            return None
+        if self._session is None:
+            self._session = AsyncSession(self._engine)
+        return self._session
+
+    def repo(self, factory: Callable[[AsyncSession], R], primary: R) -> R:
+        """Репозиторий, читающий с реплики и пишущий в `primary`."""
+        if self._engine is None:
+            return primary
+        return RoutedRepo(routing=self, factory=factory, primary=primary)  # type: ignore[return-value]
+
+    def replica_failed(self, error: BaseException) -> None:
+        if self._engine is not None:
+            self.pool.mark_down(self._engine, error)
+            self._engine = None
+
+    def write(self) -> None:
+        if not self.wrote:
+            self.wrote = True
+            self.pool.written(self.key)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class RoutedRepo:
+    """Прокси репозитория: методы `@read_only` выполняются на реплике, остальные — на основном сервере."""
+
+    def __init__(self, routing: ReadRouting, factory: Callable[[AsyncSession], Any], primary: Any) -> None:
+        self._routing = routing
+        self._factory = factory
+        self._primary = primary
+        self._replica: Optional[Any] = None
+        self._methods: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+
+        value = getattr(self._primary, name)
+        if not inspect.iscoroutinefunction(value):
+            return value
+        method = self._methods[name] = self._read(name) if is_read_only(value) else self._write(value)
+        return method
+
+    def _read(self, name: str) -> Callable[..., Any]:
+        async def read(*args: Any, **kwargs: Any) -> Any:
+            session = self._routing.replica_session
+            if session is not None:
+                if self._replica is None:
+                    self._replica = self._factory(session)
+                try:
+                    result = await getattr(self._replica, name)(*args, **kwargs)
+                except POSTGRES_FAILURES as err:
+                    # Реплика недоступна: чтение повторяется на основном сервере
+                    self._routing.replica_failed(err)
+                else:
+                    DB_READS_TOTAL.inc(target="replica")
+                    return result
+            DB_READS_TOTAL.inc(target="primary")
+            return await getattr(self._primary, name)(*args, **kwargs)
+
+        return read
+
+    def _write(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        async def write(*args: Any, **kwargs: Any) -> Any:
+            self._routing.write()
+            return await method(*args, **kwargs)
+
+        return write
@@ -0,0 +1,101 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.repository.replicas import replica_urls
+
+DB_SHARD_SESSIONS_TOTAL = REGISTRY.counter("db_shard_sessions_total", "Update sessions by shard", labelnames=("shard",))
+
+R = TypeVar("R")
+
+_MULTIPLIER = 2862933555777941757
+_MASK = (1 << 64) - 1
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping, Veach): номер корзины для `key` из `buckets`.
+    При добавлении шарда в конец переезжает только ~1/N ключей, и все — на новый шард.
+    """
+    key &= _MASK
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * _MULTIPLIER + 1) & _MASK
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_urls(primary_url: str, shards: Optional[str]) -> List[str]:
+    """
+    URL всех шардов: нулевой — основной сервер, за ним `postgresql.shards` в том же
+    формате, что и реплики (полные URL или `host[:port]` с учётными данными основного).
+    """
+    return [primary_url, *replica_urls(primary_url, shards)]
+
+
+class ShardMap:
+    """
+    Шарды пользователей и анкет: шард выбирается по `telegram_id` через `jump_hash`.
+
+    * Нулевой шард — основной движок приложения, на нём же остаются рассылки и реплики.
+    * У каждого шарда свой пул соединений; движки дополнительных шардов принадлежат
+      `ShardMap` и закрываются в `close`.
+    * `users.id` уникален только внутри шарда: связи между таблицами не выходят за шард,
+      а пользователи разных шардов различаются парой (шард, id).
+    * Порядок шардов в конфигурации — часть схемы данных: новый шард добавляется
+      только в конец, и переехавших пользователей нужно перенести отдельно.
+    """
+
+    def __init__(self, primary: AsyncEngine, urls: List[str], **engine_options: Any) -> None:
+        """
+        Args:
+            primary: Движок основного сервера, нулевой шард
+            urls: Строки подключения дополнительных шардов, начиная с первого
+        """
+        self.engines: List[AsyncEngine] = [primary, *(create_async_engine(url=url, **engine_options) for url in urls)]
+        self.urls: List[str] = [primary.url.render_as_string(hide_password=False), *urls]
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def shard_for(self, telegram_id: int) -> int:
+        if len(self.engines) == 1:
+            return 0
+        return jump_hash(telegram_id, len(self.engines))
+
+    def session_shard(self, telegram_id: Optional[int]) -> int:
+        """Шард для сессии update; события без пользователя идут на нулевой шард."""
+        shard = 0 if telegram_id is None else self.shard_for(telegram_id)
+        DB_SHARD_SESSIONS_TOTAL.inc(shard=str(shard))
+        return shard
+
+    async def fan_out(
+            self,
+            telegram_ids: Iterable[int],
+            call: Callable[[AsyncSession, List[int]], Awaitable[Iterable[R]]],
+    ) -> List[R]:
+        """
+        Пакетный запрос по нескольким шардам: `telegram_ids` группируются по шардам,
+        `call(session, ids)` выполняется на каждом затронутом шарде параллельно,
+        результаты склеиваются. Порядок результатов не гарантируется.
+
+        Example:
+            users = await shards.fan_out(ids, lambda session, ids: UserService(repo=UserQuery(session)).get_users(ids))
+        """
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for telegram_id in telegram_ids:
+            groups[self.shard_for(telegram_id)].append(telegram_id)
+
+        async def run(shard: int, ids: List[int]) -> Iterable[R]:
+            async with AsyncSession(self.engines[shard]) as session:
+                return await call(session, ids)
+
+        results = await asyncio.gather(*(run(shard, ids) for shard, ids in groups.items()))
+        return [item for result in results for item in result]
+
+    async def close(self) -> None:
+        await asyncio.gather(*(engine.dispose() for engine in self.engines[1:]))
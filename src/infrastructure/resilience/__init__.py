@@ -0,0 +1,4 @@
+from src.infrastructure.resilience.breaker import BREAKERS, BreakerRegistry, BreakerState, CircuitBreaker, CircuitOpenError, Guarded
+from src.infrastructure.resilience.storage import GuardedStorage
+
+__all__ = ['BREAKERS', 'BreakerRegistry', 'BreakerState', 'CircuitBreaker', 'CircuitOpenError', 'Guarded', 'GuardedStorage']
@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import inspect
+import time
+from enum import Enum
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+import structlog
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.monitoring.name)
+
+BREAKER_STATE = REGISTRY.gauge("circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", labelnames=("name",))
+BREAKER_REJECTED_TOTAL = REGISTRY.counter("circuit_breaker_rejected_total", "Calls rejected by an open circuit breaker", labelnames=("name",))
+BREAKER_FAILURES_TOTAL = REGISTRY.counter("circuit_breaker_failures_total", "Dependency failures seen by a circuit breaker", labelnames=("name",))
+BREAKER_TRANSITIONS_TOTAL = REGISTRY.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes",
+    labelnames=("name", "state"),
+)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class BreakerState(Enum):
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class CircuitOpenError(Exception):
+    """The dependency is considered down, the call was not made."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit `{name}` is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one dependency.
+
+    * closed: calls pass; `failure_threshold` consecutive failures open the circuit.
+    * open: calls fail immediately with `CircuitOpenError` for `reset_timeout` seconds.
+    * half-open: up to `half_open_calls` probe calls pass at once, others are rejected;
+      a successful probe closes the circuit, a failed one opens it again.
+
+    Only `failure_exceptions` count as failures; other errors (integrity violations,
+    missing keys) mean the dependency answered and count as success.
+
+    Used as ``async with breaker.call():`` or through ``breaker.guard(func)``. Every call
+    carries its own probe token, so a call admitted in one state and finished in another
+    is accounted for the state it was admitted in.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_exceptions: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError),
+            failure_threshold: int = 5,
+            reset_timeout: float = 10.0,
+            half_open_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_exceptions = failure_exceptions
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+
+        self.state = BreakerState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0  # bumped on every transition, identifies the half-open period of a probe
+        BREAKER_STATE.set(self.state.value, name=name)
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are rejected without trying the dependency."""
+        return self.state == BreakerState.open and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self) -> Optional[int]:
+        """
+        Admit a call or raise `CircuitOpenError`.
+
+        Returns:
+            Optional[int]: Probe token for a call admitted in half-open state, None for
+                           a regular call; pass it to `after_call` or `release`
+        """
+        if self.state == BreakerState.open:
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                BREAKER_REJECTED_TOTAL.inc(name=self.name)
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self._transition(BreakerState.half_open)
+
+        if self.state == BreakerState.half_open:
+            if self._probes >= self.half_open_calls:
+                BREAKER_REJECTED_TOTAL.inc(name=self.name)
+                raise CircuitOpenError(self.name, 0.0)
+            self._probes += 1
+            return self._generation
+        return None
+
+    def after_call(self, error: Optional[BaseException], probe: Optional[int] = None) -> None:
+        # A probe of an earlier half-open period is a regular call: its slot was reset on transition
+        current = self.release(probe)
+
+        if error is not None and isinstance(error, self.failure_exceptions):
+            BREAKER_FAILURES_TOTAL.inc(name=self.name)
+            self._failures += 1
+            if current or (self.state == BreakerState.closed and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._transition(BreakerState.open)
+            return
+
+        self._failures = 0
+        if current:
+            self._transition(BreakerState.closed)
+
+    def release(self, probe: Optional[int]) -> bool:
+        """Free the probe slot of a call that ended without a verdict; True if the probe is current."""
+        if probe is None or probe != self._generation:
+            return False
+        self._probes -= 1
+        return True
+
+    def call(self) -> "BreakerCall":
+        """Context of a single call to the dependency."""
+        return BreakerCall(self)
+
+    def guard(self, func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            async with self.call():
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    def _transition(self, state: BreakerState) -> None:
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        self._generation += 1
+        self._probes = 0
+        if state == BreakerState.closed:
+            self._failures = 0
+        BREAKER_STATE.set(state.value, name=self.name)
+        BREAKER_TRANSITIONS_TOTAL.inc(name=self.name, state=state.name)
+        log = logger.warning if state == BreakerState.open else logger.info
+        log("Circuit breaker state changed", breaker=self.name, previous=previous.name, state=state.name)
+
+
+class BreakerCall:
+    """`async with breaker.call():` — one call with its own probe token."""
+
+    __slots__ = ("_breaker", "_probe")
+
+    def __init__(self, breaker: CircuitBreaker) -> None:
+        self._breaker = breaker
+        self._probe: Optional[int] = None
+
+    async def __aenter__(self) -> CircuitBreaker:
+        self._probe = self._breaker.before_call()
+        return self._breaker
+
+    async def __aexit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        if isinstance(exc, asyncio.CancelledError):
+            # Cancellation of the caller says nothing about the dependency
+            self._breaker.release(self._probe)
+            return
+        self._breaker.after_call(exc, self._probe)
+
+
+class BreakerRegistry:
+    """Named breakers shared by every client of a dependency in the process."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._defaults: Dict[str, Any] = {}
+
+    def configure(self, **defaults: Any) -> None:
+        """Set `failure_threshold`, `reset_timeout`, `half_open_calls` for all breakers."""
+        self._defaults.update(defaults)
+        for breaker in self._breakers.values():
+            for key, value in defaults.items():
+                setattr(breaker, key, value)
+
+    def register(self, name: str, failure_exceptions: Tuple[Type[BaseException], ...]) -> CircuitBreaker:
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(name=name, failure_exceptions=failure_exceptions, **self._defaults)
+        return self._breakers[name]
+
+    def get(self, name: str) -> CircuitBreaker:
+        return self._breakers[name]
+
+
+BREAKERS = BreakerRegistry()
+
+
+class Guarded:
+    """
+    Proxy that runs every coroutine method of `target` through `breaker`.
+
+    Used for repositories: `UserService(repo=Guarded(UserQuery(session), breaker))`.
+    Other attributes are returned as is.
+    """
+
+    __slots__ = ("_target", "_breaker", "_methods")
+
+    def __init__(self, target: Any, breaker: CircuitBreaker) -> None:
+        self._target = target
+        self._breaker = breaker
+        self._methods: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+        value = getattr(self._target, name)
+        if not inspect.iscoroutinefunction(value):
+            return value
+        method = self._methods[name] = self._breaker.guard(value)
+        return method
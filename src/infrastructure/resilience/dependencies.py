@@ -0,0 +1,38 @@
+"""Breakers of the bot's external dependencies and the errors that mean "dependency is down"."""
+import asyncio
+from typing import Tuple, Type
+
+from nats.errors import ConnectionClosedError, NoServersError
+from nats.errors import TimeoutError as NatsTimeoutError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from src.infrastructure.resilience.breaker import BREAKERS, CircuitBreaker
+
+POSTGRES = "postgres"
+REDIS = "redis"
+NATS = "nats"
+
+# Connection refused/reset are OSError; timeouts are OSError subclasses since 3.11
+POSTGRES_FAILURES: Tuple[Type[BaseException], ...] = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+REDIS_FAILURES: Tuple[Type[BaseException], ...] = (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+NATS_FAILURES: Tuple[Type[BaseException], ...] = (
+    NatsTimeoutError,
+    ConnectionClosedError,
+    NoServersError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+
+def postgres_breaker() -> CircuitBreaker:
+    return BREAKERS.register(POSTGRES, POSTGRES_FAILURES)
+
+
+def redis_breaker() -> CircuitBreaker:
+    return BREAKERS.register(REDIS, REDIS_FAILURES)
+
+
+def nats_breaker() -> CircuitBreaker:
+    return BREAKERS.register(NATS, NATS_FAILURES)
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StateType, StorageKey
+
+from src.infrastructure.resilience.breaker import CircuitBreaker, CircuitOpenError
+
+
+class GuardedStorage(BaseStorage):
+    """
+    FSM storage behind a circuit breaker.
+
+    While the circuit is open reads degrade to "no state, no data", so updates still reach
+    handlers that do not depend on FSM; writes fail fast with `CircuitOpenError`.
+    """
+
+    def __init__(self, storage: BaseStorage, breaker: CircuitBreaker) -> None:
+        self.storage = storage
+        self.breaker = breaker
+
+    async def start(self) -> None:
+        start = getattr(self.storage, "start", None)
+        if start is not None:
+            await start()
+
+    async def close(self) -> None:
+        await self.storage.close()
+
+    def create_isolation(self, **kwargs: Any) -> BaseEventIsolation:
+        return self.storage.create_isolation(**kwargs)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        async with self.breaker.call():
+            await self.storage.set_state(key=key, state=state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        try:
+            async with self.breaker.call():
+                return await self.storage.get_state(key=key)
+        except CircuitOpenError:
+            return None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        async with self.breaker.call():
+            await self.storage.set_data(key=key, data=data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        try:
+            async with self.breaker.call():
+                return await self.storage.get_data(key=key)
+        except CircuitOpenError:
+            return {}
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> Dict[str, Any]:
+        async with self.breaker.call():
+            return await self.storage.update_data(key=key, data=data)
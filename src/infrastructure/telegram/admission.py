@@ -0,0 +1,66 @@
+import math
+import time
+from enum import IntEnum
+from typing import Optional
+
+
+class Priority(IntEnum):
+    """Shed order under overload: `low` first, `normal` only under hard overload, `high` never."""
+
+    low = 0
+    normal = 1
+    high = 2
+
+
+class LoadTracker:
+    """
+    In-flight updates and a time-decayed EWMA of their processing time.
+
+    Without fresh samples the average decays towards zero with `decay` seconds time
+    constant, so a latency spike cannot keep the bot shedding after traffic stopped.
+    """
+
+    def __init__(
+            self,
+            max_in_flight: int = 200,
+            hard_in_flight: int = 400,
+            latency_threshold: float = 2.0,
+            alpha: float = 0.1,
+            decay: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            max_in_flight: Soft limit, `low` priority is shed above it
+            hard_in_flight: Hard limit, `normal` priority is shed above it
+            latency_threshold: Soft limit for the latency average (seconds); twice as much is the hard one
+            alpha: EWMA weight of a new sample
+            decay: Time constant (seconds) of the average decay without samples
+        """
+        self.max_in_flight = max_in_flight
+        self.hard_in_flight = hard_in_flight
+        self.latency_threshold = latency_threshold
+        self.alpha = alpha
+        self.decay = decay
+
+        self.in_flight = 0
+        self._latency = 0.0
+        self._sampled_at: Optional[float] = None
+
+    def latency(self, now: Optional[float] = None) -> float:
+        if self._sampled_at is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return self._latency * math.exp(-max(0.0, now - self._sampled_at) / self.decay)
+
+    def observe(self, seconds: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._latency = self.latency(now) + self.alpha * (seconds - self.latency(now))
+        self._sampled_at = now
+
+    def admits(self, priority: Priority, now: Optional[float] = None) -> bool:
+        if priority >= Priority.high:
+            return True
+        latency = self.latency(now)
+        if priority == Priority.low:
+            return self.in_flight < self.max_in_flight and latency < self.latency_threshold
+        return self.in_flight < self.hard_in_flight and latency < self.latency_threshold * 2
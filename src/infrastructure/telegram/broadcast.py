@@ -0,0 +1,406 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from contextlib import suppress
+from functools import partial
+from typing import Dict, List, Optional
+
+import ormsgpack
+import structlog
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from nats.aio.msg import Msg
+from nats.js.api import RetentionPolicy
+from nats.js.errors import BadRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src import Loggers
+from src.core.domain.entities import BroadcastEntity, BroadcastFailureEntity
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.natslib.stream.stream import StreamClient
+from src.infrastructure.repository.models import BroadcastStatusEnum
+from src.infrastructure.repository.queries.broadcast import BroadcastQuery
+from src.infrastructure.repository.queries.user import UserQuery
+from src.infrastructure.repository.sharding import ShardMap
+from src.use_cases.services.broadcast import BroadcastService
+from src.use_cases.services.user import UserService
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+BROADCAST_STREAM = "BROADCASTS"
+BROADCAST_SUBJECT = "broadcasts.send"
+# Re-enqueue after a crash must not double-send, keep publish ids long enough
+DUPLICATE_WINDOW_SECONDS = 24 * 60 * 60
+# Acked messages leave the work queue; messages nobody consumed are dropped after a week
+MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+BROADCAST_SENT_TOTAL = REGISTRY.counter("broadcast_sent_total", "Broadcast messages delivered")
+BROADCAST_FAILED_TOTAL = REGISTRY.counter("broadcast_failed_total", "Broadcast recipients that cannot be reached")
+
+# Bad requests caused by the recipient, not by the text: only these are recorded as failures
+RECIPIENT_ERRORS = ("chat not found", "user is deactivated", "peer_id_invalid", "have no rights to send")
+
+
+def is_recipient_error(err: TelegramBadRequest) -> bool:
+    message = err.message.lower()
+    return any(marker in message for marker in RECIPIENT_ERRORS)
+
+
+class LeaseLostError(RuntimeError):
+    """Another worker took over producing the broadcast."""
+
+
+class BroadcastTextError(ValueError):
+    """Telegram rejected the broadcast text (e.g. broken HTML markup)."""
+
+
+class BroadcastEngine:
+    """
+    Sends a message to every user through a JetStream work queue.
+
+    * The producer walks the user shards in order, streams recipients of each with a
+      server-side cursor in `user_id` order and publishes one message per recipient with
+      the dedup id `<broadcast>:<user>` (`<broadcast>:<shard>:<user>` past shard 0, ids
+      are unique only within a shard). After each batch the shard and last `user_id` are
+      checkpointed, so an interrupted broadcast resumes from there and already published
+      ids are dropped by the stream. Broadcast rows themselves live on shard 0.
+    * Only one worker produces a broadcast: it holds a lease on the broadcast row,
+      extended by every checkpoint. Every `lease_ttl` seconds each worker looks for
+      unfinished broadcasts, including ones still `created`, and takes over those whose
+      lease has expired; a checkpoint of a producer that lost its lease is rejected.
+    * Workers pull `worker_batch` messages at a time and send them concurrently; pacing
+      is left to `OutboundScheduler` on the bot session. `retry_after` naks the message
+      with a delay, unreachable recipients (blocked bot, deleted account) are recorded.
+      Any other bad request means the text itself is rejected: the broadcast is marked
+      `failed` and its remaining messages are dropped. The text is checked up front by
+      sending it to the author first.
+    * Progress counters and failures are buffered and written in bulk every
+      `flush_interval` seconds or `flush_size` messages. Messages are acked only after
+      their results are stored, so counters never lag behind the stream; while the
+      database is unavailable they are marked in progress so they are not redelivered.
+    * `stop` lets batches in progress finish, naks the rest for immediate redelivery and
+      stores the results of everything that was sent.
+    """
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            stream_client: StreamClient,
+            bot: Bot,
+            batch_size: int = 1000,
+            worker_batch: int = 50,
+            flush_size: int = 500,
+            flush_interval: float = 2.0,
+            ack_wait: int = 60,
+            lease_ttl: float = 60.0,
+            shards: Optional[ShardMap] = None,
+    ) -> None:
+        self.engine = engine
+        self.shards = shards
+        self.stream_client = stream_client
+        self.bot = bot
+        self.batch_size = batch_size
+        self.worker_batch = worker_batch
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.ack_wait = ack_wait
+        self.lease_ttl = lease_ttl
+        self.producer_id = uuid.uuid4().hex
+
+        self._texts: Dict[int, Optional[str]] = {}
+        self._producers: Dict[int, asyncio.Task] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lease_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+
+        self._acks: List[Msg] = []
+        self._sent: Dict[int, int] = defaultdict(int)
+        self._failures: List[BroadcastFailureEntity] = []
+
+    async def start(self) -> None:
+        """Create the stream, start workers and resume interrupted broadcasts."""
+        try:
+            await self.stream_client.create_stream(
+                name=BROADCAST_STREAM,
+                subjects=[BROADCAST_SUBJECT],
+                retention=RetentionPolicy.WORK_QUEUE,
+                duplicate_window=DUPLICATE_WINDOW_SECONDS,
+                max_age=MAX_AGE_SECONDS,
+            )
+        except BadRequestError as err:
+            # JetStream cannot turn an existing limits stream into a work queue: bound its age at least
+            await logger.awarning("Broadcast stream is not a work queue, recreate it when empty", error=str(err))
+            await self.stream_client.create_stream(
+                name=BROADCAST_STREAM,
+                subjects=[BROADCAST_SUBJECT],
+                duplicate_window=DUPLICATE_WINDOW_SECONDS,
+                max_age=MAX_AGE_SECONDS,
+            )
+        await self.stream_client.update_subjects(
+            subjects=[BROADCAST_SUBJECT],
+            callback=self._deliver,
+            ack_wait_seconds=self.ack_wait,
+            batch_size=self.worker_batch,
+        )
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        await self.resume_unfinished()
+        self._lease_task = asyncio.create_task(self._lease_loop())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop producers and workers, storing results of already sent messages.
+
+        Args:
+            timeout: Seconds for batches in progress, their unfinished messages are nak'ed after it
+        """
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+        for task in self._producers.values():
+            task.cancel()
+        await asyncio.gather(*self._producers.values(), return_exceptions=True)
+        await self.stream_client.drain(timeout=timeout)
+
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+    async def broadcast(self, text: str, author_telegram_id: Optional[int] = None) -> BroadcastEntity:
+        """
+        Create a broadcast and start enqueuing its recipients in the background.
+
+        The author receives the message first, so a text Telegram cannot parse is rejected
+        before anyone else gets it.
+
+        Args:
+            text: Message text (HTML)
+            author_telegram_id: Administrator who started the broadcast
+
+        Returns:
+            BroadcastEntity: Created broadcast
+
+        Raises:
+            BroadcastTextError: Telegram rejected the text
+        """
+        if author_telegram_id is not None:
+            try:
+                await self.bot.send_message(chat_id=author_telegram_id, text=text)
+            except TelegramBadRequest as err:
+                raise BroadcastTextError(err.message) from err
+
+        async with AsyncSession(self.engine) as session, session.begin():
+            broadcast = await BroadcastService(repo=BroadcastQuery(session)).create(
+                text=text,
+                author_telegram_id=author_telegram_id,
+            )
+
+        self._texts[broadcast.id] = broadcast.text
+        self._start_producer(broadcast)
+        await logger.ainfo("Broadcast created", broadcast_id=broadcast.id, author=author_telegram_id)
+        return broadcast
+
+    async def resume_unfinished(self) -> None:
+        """Start producers for broadcasts that are not fully enqueued; they run only if the lease is free."""
+        async with AsyncSession(self.engine) as session:
+            unfinished = await BroadcastService(repo=BroadcastQuery(session)).get_unfinished()
+
+        for broadcast in unfinished:
+            self._texts[broadcast.id] = broadcast.text
+            if broadcast.status != BroadcastStatusEnum.enqueued and broadcast.id not in self._producers:
+                self._start_producer(broadcast)
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl)
+            try:
+                await self.resume_unfinished()
+            except Exception as err:
+                await logger.awarning("Unfinished broadcasts are not checked", error=str(err))
+
+    def _start_producer(self, broadcast: BroadcastEntity) -> None:
+        task = asyncio.create_task(self._enqueue(broadcast))
+        self._producers[broadcast.id] = task
+        task.add_done_callback(partial(self._producer_done, broadcast.id))
+
+    def _producer_done(self, broadcast_id: int, task: asyncio.Task) -> None:
+        self._producers.pop(broadcast_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Status stays `enqueuing`: the broadcast continues from its checkpoint by the lease loop
+            logger.error("Broadcast enqueue failed", broadcast_id=broadcast_id, error=str(task.exception()))
+
+    async def _enqueue(self, broadcast: BroadcastEntity) -> None:
+        async with AsyncSession(self.engine) as session, session.begin():
+            leased = await BroadcastService(repo=BroadcastQuery(session)).acquire_lease(
+                broadcast_id=broadcast.id,
+                producer=self.producer_id,
+                lease_ttl=self.lease_ttl,
+            )
+        if leased is None:
+            return  # produced by another worker or already enqueued
+
+        await logger.ainfo(
+            "Broadcast enqueuing",
+            broadcast_id=leased.id,
+            last_shard=leased.last_shard,
+            last_user_id=leased.last_user_id,
+        )
+        enqueued = 0
+        shard_engines = self.shards.engines if self.shards is not None else [self.engine]
+        try:
+            for shard in range(leased.last_shard, len(shard_engines)):
+                after_user_id = leased.last_user_id if shard == leased.last_shard else 0
+                enqueued += await self._enqueue_shard(leased, shard, shard_engines[shard], after_user_id)
+
+            async with AsyncSession(self.engine) as session, session.begin():
+                if not await BroadcastService(repo=BroadcastQuery(session)).release_lease(broadcast_id=leased.id, producer=self.producer_id):
+                    raise LeaseLostError
+        except LeaseLostError:
+            await logger.awarning("Broadcast lease lost, another worker continues", broadcast_id=leased.id, enqueued=enqueued)
+            return
+
+        async with AsyncSession(self.engine) as session, session.begin():
+            # Workers may have finished every message before the status changed
+            await BroadcastService(repo=BroadcastQuery(session)).finish_if_complete(broadcast_id=broadcast.id)
+        await logger.ainfo("Broadcast enqueued", broadcast_id=broadcast.id, enqueued=enqueued)
+
+    async def _enqueue_shard(self, broadcast: BroadcastEntity, shard: int, engine: AsyncEngine, after_user_id: int) -> int:
+        enqueued = 0
+        # The cursor needs its own transaction for the whole scan, checkpoints are committed separately
+        async with AsyncSession(engine) as read_session, read_session.begin():
+            recipients = UserService(repo=UserQuery(read_session)).stream_recipients(
+                after_user_id=after_user_id,
+                batch_size=self.batch_size,
+            )
+            async for batch in recipients:
+                # A batch interrupted before its checkpoint is published again on resume;
+                # the stream drops those duplicates and the batch is counted only once below
+                await asyncio.gather(*(
+                    self.stream_client.publish(
+                        BROADCAST_SUBJECT,
+                        {"broadcast_id": broadcast.id, "telegram_id": recipient.telegram_id},
+                        # Shard 0 keeps the pre-sharding id, broadcasts in progress stay deduplicated
+                        msg_id=f"{broadcast.id}:{recipient.user_id}" if shard == 0 else f"{broadcast.id}:{shard}:{recipient.user_id}",
+                    )
+                    for recipient in batch
+                ))
+                enqueued += len(batch)
+
+                async with AsyncSession(self.engine) as session, session.begin():
+                    saved = await BroadcastService(repo=BroadcastQuery(session)).save_checkpoint(
+                        broadcast_id=broadcast.id,
+                        producer=self.producer_id,
+                        lease_ttl=self.lease_ttl,
+                        last_user_id=batch[-1].user_id,
+                        enqueued=len(batch),
+                        last_shard=shard,
+                    )
+                if not saved:
+                    raise LeaseLostError
+        return enqueued
+
+    async def _deliver(self, msg: Msg) -> None:
+        try:
+            try:
+                payload = ormsgpack.unpackb(msg.data)
+                broadcast_id, telegram_id = payload["broadcast_id"], payload["telegram_id"]
+            except (ormsgpack.MsgpackDecodeError, KeyError, TypeError) as err:
+                # Redelivery cannot fix a malformed message, drop it for good
+                await logger.aerror("Broadcast message is undecodable", data=msg.data, error=str(err))
+                await msg.term()
+                return
+
+            text = await self._text(broadcast_id)
+            if text is None:
+                await msg.ack()  # broadcast was deleted or failed
+                return
+
+            await self.bot.send_message(chat_id=telegram_id, text=text)
+        except TelegramRetryAfter as err:
+            await msg.nak(delay=err.retry_after)
+            return
+        except (TelegramForbiddenError, TelegramBadRequest) as err:
+            if isinstance(err, TelegramBadRequest) and not is_recipient_error(err):
+                await self._fail(broadcast_id, error=err.message)
+                await msg.ack()
+                return
+            self._failures.append(BroadcastFailureEntity(
+                broadcast_id=broadcast_id,
+                telegram_id=telegram_id,
+                error=err.message,
+            ))
+        except Exception as err:
+            # Database or network hiccup: the message is retried later, the worker keeps going
+            await logger.awarning("Broadcast delivery failed", data=msg.data, error=str(err))
+            await msg.nak(delay=self.flush_interval * 5)
+            return
+        else:
+            self._sent[broadcast_id] += 1
+
+        # No awaits after this point: a message cancelled on shutdown is either nak'ed or stored
+        self._acks.append(msg)
+        if len(self._acks) >= self.flush_size:
+            self._flush_requested.set()
+
+    async def _text(self, broadcast_id: int) -> Optional[str]:
+        if broadcast_id not in self._texts:
+            async with AsyncSession(self.engine) as session:
+                broadcast = await BroadcastService(repo=BroadcastQuery(session)).get(broadcast_id=broadcast_id)
+            failed = broadcast is None or broadcast.status == BroadcastStatusEnum.failed
+            self._texts[broadcast_id] = None if failed else broadcast.text
+        return self._texts[broadcast_id]
+
+    async def _fail(self, broadcast_id: int, error: str) -> None:
+        """Stop a broadcast whose text Telegram rejects; its producer loses the lease on the next checkpoint."""
+        if self._texts.get(broadcast_id) is None:
+            return  # already stopped by a concurrent message of the batch
+        async with AsyncSession(self.engine) as session, session.begin():
+            await BroadcastService(repo=BroadcastQuery(session)).set_status(broadcast_id=broadcast_id, status=BroadcastStatusEnum.failed)
+        # Only once the status is stored: otherwise the redelivered message must stop the broadcast again
+        self._texts[broadcast_id] = None
+        await logger.aerror("Broadcast text rejected by Telegram, broadcast stopped", broadcast_id=broadcast_id, error=error)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Store buffered progress and failures in one transaction, then ack their messages."""
+        async with self._flush_lock:
+            if not self._acks:
+                return
+
+            acks, sent, failures = self._acks, self._sent, self._failures
+            self._acks, self._sent, self._failures = [], defaultdict(int), []
+
+            failed: Dict[int, int] = defaultdict(int)
+            for failure in failures:
+                failed[failure.broadcast_id] += 1
+
+            try:
+                async with AsyncSession(self.engine) as session, session.begin():
+                    service = BroadcastService(repo=BroadcastQuery(session))
+                    await service.add_failures(failures=failures)
+                    for broadcast_id in sent.keys() | failed.keys():
+                        await service.add_progress(broadcast_id=broadcast_id, sent=sent[broadcast_id], failed=failed[broadcast_id])
+                        if await service.finish_if_complete(broadcast_id=broadcast_id):
+                            self._texts.pop(broadcast_id, None)
+                            await logger.ainfo("Broadcast finished", broadcast_id=broadcast_id)
+            except Exception as err:
+                # Keep results for the next attempt; messages stay unacked until then
+                self._acks[:0] = acks
+                self._failures[:0] = failures
+                for broadcast_id, count in sent.items():
+                    self._sent[broadcast_id] += count
+                await logger.aerror("Broadcast progress flush failed", error=str(err), pending=len(self._acks))
+                # Already sent: restart their ack_wait, otherwise the stream redelivers and they are sent again
+                await asyncio.gather(*(msg.in_progress() for msg in self._acks), return_exceptions=True)
+                return
+
+            BROADCAST_SENT_TOTAL.inc(sum(sent.values()))
+            BROADCAST_FAILED_TOTAL.inc(len(failures))
+            await asyncio.gather(*(msg.ack() for msg in acks), return_exceptions=True)
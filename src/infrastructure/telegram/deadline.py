@@ -0,0 +1,76 @@
+"""
+Time budget of the update being processed.
+
+`deadline(budget)` wraps the update in one `asyncio.timeout` and publishes it through
+`CURRENT_DEADLINE`, so code below can see how much time is left (`remaining()`), move the
+deadline for the selected router or handler (`Deadline.reschedule`) and bound work in
+tasks it spawns (`within_deadline()`: the context var is copied into them, the timeout is not).
+When the deadline expires the update task is cancelled; `async with` blocks on the way up
+(DB session, locks) are exited normally, so connections go back to the pool.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+
+class Deadline:
+    """Deadline of one update, in event loop time."""
+
+    __slots__ = ("started", "timeout", "owner")
+
+    def __init__(self, started: float, timeout: asyncio.Timeout) -> None:
+        self.started = started
+        self.timeout = timeout
+        self.owner: Optional[str] = None  # router whose budget applies, for logs and metrics
+
+    @property
+    def when(self) -> Optional[float]:
+        return self.timeout.when()
+
+    def remaining(self) -> Optional[float]:
+        when = self.timeout.when()
+        return None if when is None else when - asyncio.get_running_loop().time()
+
+    def reschedule(self, budget: Optional[float]) -> None:
+        """Count `budget` seconds from the start of the update (None removes the limit)."""
+        if self.timeout.expired():
+            return
+        self.timeout.reschedule(None if budget is None else self.started + budget)
+
+    def expired(self) -> bool:
+        return self.timeout.expired()
+
+
+CURRENT_DEADLINE: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+@asynccontextmanager
+async def deadline(budget: Optional[float]) -> AsyncIterator[Deadline]:
+    """
+    Run the block within `budget` seconds.
+
+    Raises:
+        TimeoutError: The deadline expired; check `Deadline.expired()` to tell it from
+            timeouts raised by the code inside
+    """
+    started = asyncio.get_running_loop().time()
+    async with asyncio.timeout_at(None if budget is None else started + budget) as timeout:
+        current = Deadline(started=started, timeout=timeout)
+        token = CURRENT_DEADLINE.set(current)
+        try:
+            yield current
+        finally:
+            CURRENT_DEADLINE.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current update, None outside an update or without a limit."""
+    current = CURRENT_DEADLINE.get()
+    return current.remaining() if current is not None else None
+
+
+def within_deadline() -> asyncio.Timeout:
+    """Timeout at the deadline of the update that spawned the current task."""
+    current = CURRENT_DEADLINE.get()
+    return asyncio.timeout_at(current.when if current is not None else None)
@@ -0,0 +1,151 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from nats.js.errors import KeyWrongLastSequenceError
+from nats.js.kv import KeyValue
+from redis.asyncio import Redis
+
+from src.infrastructure.natslib.client import NatsClient
+
+SEEN_UPDATES_BUCKET = "updates_seen"
+
+
+class UpdateWindow:
+    """
+    Sliding bitmap of recently seen `update_id`s.
+
+    Telegram numbers updates sequentially, so the last `size` ids fit into `size / 8`
+    bytes: one bit per id, addressed by `update_id % size`. Moving the high watermark
+    clears the bits of ids that left the window. Ids older than the window are unknown
+    to it and `seen()` returns None for them.
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        self.size = size
+        self._bits = bytearray((size + 7) // 8)
+        self._high: Optional[int] = None
+
+    def seen(self, update_id: int) -> Optional[bool]:
+        if self._high is None or update_id > self._high:
+            return False
+        if update_id <= self._high - self.size:
+            return None
+        index = update_id % self.size
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def add(self, update_id: int) -> None:
+        if self._high is None:
+            self._high = update_id
+        elif update_id > self._high:
+            if update_id - self._high >= self.size:
+                self._bits[:] = bytes(len(self._bits))
+            else:
+                for stale in range(self._high + 1, update_id):
+                    index = stale % self.size
+                    self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+            self._high = update_id
+        elif update_id <= self._high - self.size:
+            return
+
+        index = update_id % self.size
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def discard(self, update_id: int) -> None:
+        if self._high is None or update_id > self._high or update_id <= self._high - self.size:
+            return
+        index = update_id % self.size
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class UpdateClaims(ABC):
+    """
+    Shared set of processed updates; the first worker to claim an update processes it.
+
+    A claim is held "in progress" for `processing_ttl` seconds only. `confirm` keeps it
+    for the full `ttl` after the update is processed, `release` drops it when processing
+    failed, so the retry Telegram sends for a failed webhook delivery is not a duplicate.
+    A worker that dies mid-update leaves the claim to expire after `processing_ttl`.
+    """
+
+    @abstractmethod
+    async def claim(self, bot_id: int, update_id: int) -> bool:
+        """True if the update is not processed or being processed by anyone else."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def confirm(self, bot_id: int, update_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, bot_id: int, update_id: int) -> None:
+        raise NotImplementedError
+
+
+class RedisUpdateClaims(UpdateClaims):
+    def __init__(self, redis: Redis, ttl: int = 3600, processing_ttl: float = 60.0, prefix: str = "updates:seen") -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.processing_ttl = processing_ttl
+        self.prefix = prefix
+
+    async def claim(self, bot_id: int, update_id: int) -> bool:
+        return bool(await self.redis.set(self._key(bot_id, update_id), b"p", nx=True, px=int(self.processing_ttl * 1000)))
+
+    async def confirm(self, bot_id: int, update_id: int) -> None:
+        await self.redis.set(self._key(bot_id, update_id), b"1", ex=self.ttl)
+
+    async def release(self, bot_id: int, update_id: int) -> None:
+        await self.redis.delete(self._key(bot_id, update_id))
+
+    def _key(self, bot_id: int, update_id: int) -> str:
+        return f"{self.prefix}:{bot_id}:{update_id}"
+
+
+class NatsUpdateClaims(UpdateClaims):
+    """
+    Claims in a NATS KV bucket; `create` fails for an existing key, the bucket TTL expires them.
+
+    KV keys have no individual TTL, so an in-progress claim stores its deadline
+    (`p<unix time>`) and an expired one is taken over with a revision check.
+    """
+
+    def __init__(self, nats_client: NatsClient, ttl: float = 3600, processing_ttl: float = 60.0) -> None:
+        self.nats_client = nats_client
+        self.ttl = ttl
+        self.processing_ttl = processing_ttl
+        self._kv: Optional[KeyValue] = None
+
+    async def claim(self, bot_id: int, update_id: int) -> bool:
+        kv = await self._bucket()
+        key = f"{bot_id}.{update_id}"
+        try:
+            await kv.create(key, self._in_progress())
+        except KeyWrongLastSequenceError:
+            pass
+        else:
+            return True
+
+        entry = await kv.get(key)
+        value = entry.value or b""
+        if not value.startswith(b"p") or float(value[1:]) > time.time():
+            return False
+        try:
+            await kv.update(key, self._in_progress(), last=entry.revision)
+        except KeyWrongLastSequenceError:
+            return False  # taken over by another worker first
+        return True
+
+    async def confirm(self, bot_id: int, update_id: int) -> None:
+        await (await self._bucket()).put(f"{bot_id}.{update_id}", b"1")
+
+    async def release(self, bot_id: int, update_id: int) -> None:
+        await (await self._bucket()).delete(f"{bot_id}.{update_id}")
+
+    async def _bucket(self) -> KeyValue:
+        if self._kv is None:
+            self._kv = await self.nats_client.get_or_create_kv_bucket(SEEN_UPDATES_BUCKET, history=1, ttl=self.ttl)
+        return self._kv
+
+    def _in_progress(self) -> bytes:
+        return b"p%.3f" % (time.time() + self.processing_ttl)
@@ -0,0 +1,253 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional
+
+import structlog
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.telegram.deadline import remaining
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+OUTBOUND_WAIT_SECONDS = REGISTRY.histogram(
+    "telegram_outbound_wait_seconds",
+    "Time outgoing requests spent waiting for rate limit tokens",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+OUTBOUND_RETRY_AFTER_TOTAL = REGISTRY.counter("telegram_outbound_retry_after_total", "429 responses handled by the scheduler")
+OUTBOUND_COALESCED_TOTAL = REGISTRY.counter("telegram_outbound_coalesced_total", "Edits superseded by a newer edit of the same message")
+OUTBOUND_TRACKED_CHATS = REGISTRY.gauge("telegram_outbound_tracked_chats", "Chats with rate limiting state in memory")
+
+# Methods that do not count towards send limits and must be answered quickly
+PRIORITY_METHODS = (AnswerCallbackQuery,)
+EDIT_METHOD_PREFIX = "EditMessage"
+# Resolves a pending edit whose owner was cancelled before the edit was sent
+_HANDED_OVER = object()
+
+
+class RateLimiter:
+    """
+    GCRA token bucket: `rate` requests per second with bursts of up to `burst` requests.
+
+    `reserve` always succeeds and returns the moment the caller is allowed to proceed,
+    so waiters are served in arrival order without polling.
+    """
+
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (max(1, burst) - 1)
+        self.tat = 0.0  # theoretical arrival time of the next request
+
+    def reserve(self, now: float) -> float:
+        tat = max(self.tat, now)
+        allowed_at = max(now, tat - self.tolerance)
+        self.tat = tat + self.interval
+        return allowed_at
+
+    def pause_until(self, moment: float) -> None:
+        """Block the bucket until `moment` (used after Telegram returns `retry_after`)."""
+        self.tat = max(self.tat, moment + self.tolerance)
+
+    def idle(self, now: float) -> bool:
+        return self.tat <= now
+
+
+@dataclass(slots=True)
+class _ChatState:
+    limiter: RateLimiter
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass(slots=True)
+class _PendingEdit:
+    method: TelegramMethod[Any]
+    future: asyncio.Future
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Session middleware enforcing Telegram send limits for every outgoing request.
+
+    * Requests addressed to a chat are serialized per chat (order is preserved) and pass
+      the chat bucket (`private_chat_rate` or `group_chat_rate`) and then the global one.
+    * `answerCallbackQuery` and requests without a chat bypass the queues entirely.
+    * `TelegramRetryAfter` pauses the chat bucket of a queued request and the request is retried up to
+      `max_retries` times, unless the update deadline expires before the retry.
+    * While an edit of a message waits for its turn, newer edits of the same message
+      replace it; all callers receive the result of the edit that was actually sent. If the
+      caller that queued the edit is cancelled, a waiting caller sends the newest text instead.
+    """
+
+    def __init__(
+            self,
+            global_rate: float = 30.0,
+            private_chat_rate: float = 1.0,
+            group_chat_rate: float = 20 / 60,
+            chat_burst: int = 3,
+            max_retries: int = 3,
+            prune_every: int = 1024,
+    ) -> None:
+        self.global_limiter = RateLimiter(rate=global_rate, burst=max(1, int(global_rate)))
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.prune_every = prune_every
+
+        self._chats: Dict[Hashable, _ChatState] = {}
+        self._pending_edits: Dict[tuple, _PendingEdit] = {}
+        self._requests = 0
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if isinstance(method, PRIORITY_METHODS) or chat_id is None:
+            return await self._send_with_retries(make_request, bot, method, chat=None)
+
+        edit_key = self._edit_key(method)
+        if edit_key is None:
+            return await self._scheduled(make_request, bot, method, chat_id)
+
+        handed_over = False
+        while True:
+            pending = self._pending_edits.get(edit_key)
+            if pending is None:
+                break
+            if not handed_over:
+                # A previous edit of this message is still queued: send only the newest text
+                pending.method = method
+                OUTBOUND_COALESCED_TOTAL.inc()
+            outcome = await asyncio.shield(pending.future)
+            if outcome is not _HANDED_OVER:
+                return outcome
+            # The caller that owned the edit was cancelled: one of the waiters sends the newest text
+            # instead; a newer edit queued meanwhile is joined as is, so the text never goes back
+            method = pending.method
+            handed_over = True
+
+        pending = _PendingEdit(method=method, future=asyncio.get_running_loop().create_future())
+        self._pending_edits[edit_key] = pending
+        try:
+            result = await self._scheduled(make_request, bot, None, chat_id, pending=(edit_key, pending))
+        except asyncio.CancelledError:
+            # Cancellation belongs to the owner only, waiters must not lose their edit because of it
+            if not pending.future.done():
+                pending.future.set_result(_HANDED_OVER)
+            raise
+        except BaseException as err:
+            if not pending.future.done():
+                pending.future.set_exception(err)
+                pending.future.exception()  # mark as retrieved when nobody else awaits it
+            raise
+        finally:
+            if self._pending_edits.get(edit_key) is pending:
+                del self._pending_edits[edit_key]
+        pending.future.set_result(result)
+        return result
+
+    async def _scheduled(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: Optional[TelegramMethod[TelegramType]],
+            chat_id: Any,
+            pending: Optional[tuple] = None,
+    ) -> Response[TelegramType]:
+        state = self._chat_state(chat_id)
+        async with state.lock:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await self._wait(state.limiter.reserve(loop.time()))
+            await self._wait(self.global_limiter.reserve(loop.time()))
+            OUTBOUND_WAIT_SECONDS.observe(loop.time() - started)
+
+            if pending is not None:
+                # From now on newer edits must be sent separately
+                edit_key, edit = pending
+                if self._pending_edits.get(edit_key) is edit:
+                    del self._pending_edits[edit_key]
+                method = edit.method
+            return await self._send_with_retries(make_request, bot, method, chat=state)
+
+    async def _send_with_retries(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+            chat: Optional[_ChatState],
+    ) -> Response[TelegramType]:
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as err:
+                attempt += 1
+                OUTBOUND_RETRY_AFTER_TOTAL.inc()
+                if attempt > self.max_retries:
+                    raise
+                loop = asyncio.get_running_loop()
+                resume_at = loop.time() + err.retry_after
+                # Requests outside the queues took no tokens: their 429 must not stall other sends
+                if chat is not None:
+                    chat.limiter.pause_until(resume_at)
+                left = remaining()
+                if left is not None and err.retry_after >= left:
+                    raise  # the update deadline expires before the retry
+                await logger.awarning(
+                    "Telegram flood control, retrying",
+                    method=type(method).__name__,
+                    retry_after=err.retry_after,
+                    attempt=attempt,
+                )
+                await asyncio.sleep(err.retry_after)
+
+    def _chat_state(self, chat_id: Any) -> _ChatState:
+        # Before the lookup: a state just created is idle and unlocked, pruning must not drop it
+        self._requests += 1
+        if self._requests % self.prune_every == 0:
+            self._prune()
+
+        state = self._chats.get(chat_id)
+        if state is None:
+            state = _ChatState(limiter=RateLimiter(rate=self._chat_rate(chat_id), burst=self.chat_burst))
+            self._chats[chat_id] = state
+        return state
+
+    def _chat_rate(self, chat_id: Any) -> float:
+        # Groups, supergroups and channels have negative ids or @usernames
+        if isinstance(chat_id, str) or chat_id < 0:
+            return self.group_chat_rate
+        return self.private_chat_rate
+
+    def _prune(self) -> None:
+        """Forget chats whose buckets are full again, keeping memory proportional to active chats."""
+        now = asyncio.get_running_loop().time()
+        idle = [chat_id for chat_id, state in self._chats.items() if state.limiter.idle(now) and not state.lock.locked()]
+        for chat_id in idle:
+            del self._chats[chat_id]
+        OUTBOUND_TRACKED_CHATS.set(len(self._chats))
+
+    @staticmethod
+    def _edit_key(method: TelegramMethod[Any]) -> Optional[tuple]:
+        name = type(method).__name__
+        if not name.startswith(EDIT_METHOD_PREFIX):
+            return None
+        return name, getattr(method, "chat_id", None), getattr(method, "message_id", None), getattr(method, "inline_message_id", None)
+
+    @staticmethod
+    async def _wait(allowed_at: float) -> None:
+        delay = allowed_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,142 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData, CallbackQueryFilter
+from aiogram.types import Message, TelegramObject
+
+from src.callbacks.codec import INLINE_MARKER, SEPARATOR, STORED_MARKER, CompactCallbackData
+
+KeyFunc = Callable[[TelegramObject], Optional[Hashable]]
+HandlerKeys = Callable[[HandlerObject], Optional[Set[Hashable]]]
+
+
+def callback_key(event: TelegramObject) -> Optional[Hashable]:
+    """`~1|...` and `!1|token` → ("code", "1"), `prefix:...` → ("prefix", "prefix")."""
+    data = getattr(event, "data", None)
+    if not data:
+        return None
+    if data[0] in (INLINE_MARKER, STORED_MARKER):
+        return "code", data[1:].partition(SEPARATOR)[0]
+    return "prefix", data.partition(":")[0]
+
+
+def callback_handler_keys(handler: HandlerObject) -> Optional[Set[Hashable]]:
+    """Keys of a handler whose first filter is `SomeCallback.filter()`, None for anything else."""
+    if not handler.filters or not isinstance(handler.filters[0].callback, CallbackQueryFilter):
+        return None
+    callback_data: type[CallbackData] = handler.filters[0].callback.callback_data
+    if callback_data.__separator__ != ":":
+        return None
+
+    keys: Set[Hashable] = {("prefix", callback_data.__prefix__)}
+    if issubclass(callback_data, CompactCallbackData):
+        keys.add(("code", callback_data.__code__))
+    return keys
+
+
+def command_key(event: TelegramObject) -> Optional[Hashable]:
+    """`/start@bot payload` → "start"."""
+    if not isinstance(event, Message):
+        return None
+    text = event.text or event.caption
+    if not text or text[0] != "/":
+        return None
+    return text[1:].split(maxsplit=1)[0].partition("@")[0] if len(text) > 1 else None
+
+
+def command_handler_keys(handler: HandlerObject) -> Optional[Set[Hashable]]:
+    """Keys of a handler whose first filter is `Command("name", ...)` with plain names."""
+    if not handler.filters or not isinstance(handler.filters[0].callback, Command):
+        return None
+    command: Command = handler.filters[0].callback
+    if command.prefix != "/" or command.ignore_case or not command.commands:
+        return None
+    if not all(isinstance(name, str) for name in command.commands):
+        return None
+    return set(command.commands)
+
+
+class IndexedEventObserver(TelegramEventObserver):
+    """
+    Observer that checks only the handlers which can match the event.
+
+    Handlers are indexed by the key of their first filter (callback prefix/code, command
+    name); handlers with other filters are checked for every event. Candidates are kept
+    in registration order, so the first matching handler is the same as in the plain chain.
+    """
+
+    def __init__(self, router: Router, event_name: str, event_key: KeyFunc, handler_keys: HandlerKeys) -> None:
+        super().__init__(router=router, event_name=event_name)
+        self.event_key = event_key
+        self.handler_keys = handler_keys
+        self._index: Optional[Tuple[Dict[Hashable, List[HandlerObject]], List[HandlerObject]]] = None
+        self._indexed_count = 0
+
+    def _build_index(self) -> Tuple[Dict[Hashable, List[HandlerObject]], List[HandlerObject]]:
+        keyed: Dict[Hashable, Set[int]] = {}
+        linear: List[int] = []
+        for position, handler in enumerate(self.handlers):
+            keys = self.handler_keys(handler)
+            if keys is None:
+                linear.append(position)
+                continue
+            for key in keys:
+                keyed.setdefault(key, set()).add(position)
+
+        fallback = [self.handlers[position] for position in linear]
+        index = {
+            key: [self.handlers[position] for position in sorted(positions.union(linear))]
+            for key, positions in keyed.items()
+        }
+        return index, fallback
+
+    def candidates(self, event: TelegramObject) -> List[HandlerObject]:
+        if self._index is None or self._indexed_count != len(self.handlers):
+            # Handlers may also be appended to `self.handlers` directly
+            self._index, self._indexed_count = self._build_index(), len(self.handlers)
+        index, fallback = self._index
+        key = self.event_key(event)
+        return index.get(key, fallback) if key is not None else fallback
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        for handler in self.candidates(event):
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+
+        return UNHANDLED
+
+
+class IndexedRouter(Router):
+    """
+    Router with indexed dispatch of `message` commands and `callback_query` data.
+
+    `deadline` is the time budget of updates handled by this router and its children,
+    counted from the start of the update (see `HandlerDeadlineMiddleware`).
+    """
+
+    def __init__(self, *, name: Optional[str] = None, deadline: Optional[float] = None) -> None:
+        super().__init__(name=name)
+        self.deadline = deadline
+        self.message = IndexedEventObserver(router=self, event_name="message", event_key=command_key, handler_keys=command_handler_keys)
+        self.callback_query = IndexedEventObserver(
+            router=self,
+            event_name="callback_query",
+            event_key=callback_key,
+            handler_keys=callback_handler_keys,
+        )
+        self.observers["message"] = self.message
+        self.observers["callback_query"] = self.callback_query
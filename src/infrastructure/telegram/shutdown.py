@@ -0,0 +1,52 @@
+import asyncio
+from typing import Set
+
+import structlog
+
+from src import Loggers
+from src.infrastructure.metrics import REGISTRY
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+SHUTDOWN_CANCELLED_TOTAL = REGISTRY.counter("updates_cancelled_on_shutdown_total", "Updates still running when the drain timeout expired")
+
+
+class InFlightUpdates:
+    """
+    Tasks processing updates, for draining on shutdown.
+
+    Polling and the webhook handler run every update in its own task; aiogram does not
+    wait for them when it stops, and their updates are already confirmed to Telegram.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: Set[asyncio.Task] = set()
+
+    def add(self, task: asyncio.Task) -> None:
+        if task in self.tasks:
+            return  # several updates fed from one task (`handle_as_tasks=False`, tests)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Wait up to `timeout` seconds for running updates, then cancel the rest.
+
+        Returns:
+            int: Number of cancelled updates
+        """
+        tasks = {task for task in self.tasks if task is not asyncio.current_task()}
+        if not tasks:
+            return 0
+
+        await logger.ainfo("Draining updates", in_flight=len(tasks), timeout=timeout)
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        # Cancellation exits `async with` blocks, DB connections go back to the pool
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if pending:
+            SHUTDOWN_CANCELLED_TOTAL.inc(len(pending))
+            await logger.awarning("Updates cancelled on shutdown", cancelled=len(pending))
+        return len(pending)
@@ -0,0 +1,93 @@
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+from redis.asyncio import Redis
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    """`rate` requests per second with bursts of up to `burst` requests."""
+
+    rate: float
+    burst: int = 1
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        return self.interval * (self.burst - 1)
+
+
+class Limiter(ABC):
+    @abstractmethod
+    async def hit(self, key: Hashable, limit: Limit) -> float:
+        """Take a token; returns 0 if allowed, otherwise seconds until the next one."""
+        raise NotImplementedError
+
+
+class MemoryLimiter(Limiter):
+    """
+    Token buckets as GCRA: one float per key (theoretical arrival time) instead of a
+    (tokens, timestamp) pair. A key whose TAT is in the past is a full bucket, so such
+    keys are swept every `sweep_every` hits and memory stays proportional to active users.
+    """
+
+    def __init__(self, sweep_every: int = 10000) -> None:
+        self.sweep_every = sweep_every
+        self._tat: Dict[Hashable, float] = {}
+        self._hits = 0
+
+    def hit_now(self, key: Hashable, limit: Limit, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._hits += 1
+        if self._hits >= self.sweep_every:
+            self._sweep(now)
+
+        tat = max(self._tat.get(key, now), now)
+        wait = tat - limit.tolerance - now
+        if wait > 0:
+            return wait
+        self._tat[key] = tat + limit.interval
+        return 0.0
+
+    async def hit(self, key: Hashable, limit: Limit) -> float:
+        return self.hit_now(key, limit)
+
+    def _sweep(self, now: float) -> None:
+        self._hits = 0
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+# KEYS[1] - ключ, ARGV: interval, tolerance (секунды); время берётся у Redis, общее для всех воркеров
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local interval, tolerance = tonumber(ARGV[1]), tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local wait = tat - tolerance - now
+if wait > 0 then return tostring(wait) end
+local ttl = math.ceil((tat + interval - now) * 1000)
+redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', ttl)
+return '0'
+"""
+
+
+class RedisLimiter(Limiter):
+    """The same GCRA in a Lua script, shared by all workers."""
+
+    def __init__(self, redis: Redis, prefix: str = "throttle") -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: Hashable, limit: Limit) -> float:
+        name = f"{self.prefix}:{':'.join(map(str, key)) if isinstance(key, tuple) else key}"
+        return float(await self._script(keys=[name], args=[limit.interval, limit.tolerance]))
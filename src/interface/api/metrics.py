@@ -0,0 +1,16 @@
+from aiohttp import web
+from aiohttp.web_request import Request
+from aiohttp.web_response import Response
+
+from src.infrastructure.metrics import REGISTRY
+
+
+async def router_metrics(_: Request) -> Response:
+    """
+    Exporting application metrics in the Prometheus text format `/metrics`.
+
+    :param _: Request object
+    :return: text/plain; version=0.0.4
+    """
+
+    return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
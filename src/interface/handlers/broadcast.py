@@ -0,0 +1,29 @@
+import html
+
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from src.infrastructure.telegram.broadcast import BroadcastEngine, BroadcastTextError
+from src.infrastructure.telegram.router import IndexedRouter
+
+# Доступ ограничивается фильтром администраторов в routers_installer;
+# создание рассылки пишет в базу и JetStream, бюджет больше обычного
+router = IndexedRouter(name=__name__, deadline=30.0)
+
+
+@router.message(Command("broadcast"))
+async def broadcast_command(
+        message: Message,
+        command: CommandObject,
+        broadcast_engine: BroadcastEngine
+) -> None:
+    if not command.args:
+        await message.answer(text="Использование: <code>/broadcast текст сообщения</code>")
+        return
+
+    try:
+        broadcast = await broadcast_engine.broadcast(text=command.args, author_telegram_id=message.from_user.id)
+    except BroadcastTextError as err:
+        await message.answer(text=f"Telegram не принял текст рассылки: <code>{html.escape(str(err))}</code>")
+        return
+    await message.answer(text=f"Рассылка <b>#{broadcast.id}</b> запущена")
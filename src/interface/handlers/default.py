@@ -1,14 +1,33 @@
-from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from src.callbacks.user import SetRoleCallback, Commands
 from src.core.domain.entities import UserEntity, FreelancerProfileEntity
-from src.infrastructure.keyboard import generate_keyboard, template
+from src.infrastructure.keyboard import KeyboardTemplate, template
 from src.infrastructure.repository.models import RoleEnum
+from src.infrastructure.telegram.router import IndexedRouter
 from src.use_cases.services.profile import FreelancerProfileService
 
-router = Router(name=__name__)
+router = IndexedRouter(name=__name__)
+
+ROLE_KEYBOARD = KeyboardTemplate(
+    buttons=[
+        [
+            template("Я фрилансер", callback_data=SetRoleCallback(role=RoleEnum.freelancer)),
+            template("Я заказчик", callback_data=SetRoleCallback(role=RoleEnum.customer))
+        ]
+    ],
+    inline=True
+)
+
+ACCOUNT_KEYBOARD = KeyboardTemplate(
+    buttons=[
+        [
+            template("Личный кабинет", callback_data=Commands(command="profile_account"))
+        ]
+    ],
+    inline=True
+)
 
 
 @router.message(Command("start"))
@@ -28,25 +47,10 @@ async def start_command(
             f"  - Получать опыт и участвовать в активностях команды\n\n"
             f"<b>Для начала укажи, кто ты:</b>"
         )
-        keyboard = generate_keyboard(
-            buttons=[
-                [
-                    template("Я фрилансер", callback_data=SetRoleCallback(role=RoleEnum.freelancer)),
-                    template("Я заказчик", callback_data=SetRoleCallback(role=RoleEnum.customer))
-                ]
-            ],
-            inline=True
-        )
+        keyboard = ROLE_KEYBOARD.markup
     else:
         text = f"<b>С возвращением, {user_entity.full_name}!</b>"
-        keyboard = generate_keyboard(
-            buttons=[
-                [
-                    template("Личный кабинет", callback_data=Commands(command="profile_account"))
-                ]
-            ],
-            inline=True
-        )
+        keyboard = ACCOUNT_KEYBOARD.markup
 
     await message.answer(
         text=text,
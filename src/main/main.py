@@ -1,20 +1,28 @@
-import asyncio
+import time
 
-import structlog
-from alembic.config import Config as AlembicConfig
-from alembic import command as alembic_command
+STARTED_AT = time.perf_counter()
 
-from src import Loggers
-from src.core.application import TelegramBotManager
-from src.core.domain.errors.default import UnexpectedErrorInBotStartup
+import asyncio  # noqa: E402
+import logging  # noqa: E402
+
+import structlog  # noqa: E402
+
+from src import Loggers  # noqa: E402
+from src.core.application import TelegramBotManager  # noqa: E402
+from src.core.domain.errors.default import UnexpectedErrorInBotStartup  # noqa: E402
+from src.infrastructure.monitoring.startup import StartupTimer  # noqa: E402
 
 logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
 
 
 async def main():
-    manager = TelegramBotManager()
+    startup = StartupTimer(started_at=STARTED_AT)
+    startup.record("imports", time.perf_counter() - STARTED_AT)
+    manager = TelegramBotManager(startup=startup)
 
     try:
+        # Миграции не выполняются на каждом старте: сверяется ревизия, см. `application.migrations`
+        await manager.check_migrations()
         await manager.start_polling()
     except Exception as err:
         raise UnexpectedErrorInBotStartup(logger) from err
@@ -23,8 +31,8 @@ async def main():
 if __name__ == "__main__":
     Loggers(developer_mode=True)
 
-    alembic_config = AlembicConfig(file_="alembic.ini", attributes={"configure_logger": False})
-    alembic_command.upgrade(alembic_config, "head")
-    logger.info("Database migrations updated")
-
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        # Буферы обработчиков логов сбрасываются до выхода процесса
+        logging.shutdown()
@@ -0,0 +1,20 @@
+import structlog
+
+from src import Loggers
+from src.infrastructure.configuration.snapshot import load_settings
+from src.infrastructure.repository.migrator import alembic_config, upgrade
+from src.infrastructure.repository.sharding import shard_urls
+
+logger: structlog.BoundLogger = structlog.getLogger(Loggers.main.name)
+
+
+if __name__ == "__main__":
+    # Разовый запуск миграций перед выкаткой; воркеры стартуют с `application.migrations: verify`
+    Loggers(developer_mode=True)
+
+    settings = load_settings()
+    postgresql = settings.postgresql
+    # Схема одна на все шарды: миграции выполняются на каждом по очереди
+    for shard, url in enumerate(shard_urls(str(settings.postgresql_url), postgresql and postgresql.shards)):
+        upgrade(alembic_config(url))
+        logger.info("Database migrations updated", shard=shard)
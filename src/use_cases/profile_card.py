@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from src.core.domain.entities import DetectGitEntity, FreelancerProfileEntity
+from src.infrastructure.metrics import REGISTRY
+from src.use_cases.profile import detect_git_platform, detect_url
+
+PROFILE_CARD_CACHE_TOTAL = REGISTRY.counter("profile_card_cache_total", "Profile card renders served from cache", labelnames=("result",))
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileCard:
+    """Отрисованная карточка профиля. Разделяется между всеми зрителями, не изменять."""
+
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
+
+def render_profile_card(profile: FreelancerProfileEntity, full_name: str) -> ProfileCard:
+    """
+    Собирает HTML карточки профиля.
+
+    Args:
+        profile [FreelancerProfileEntity] - Профиль фрилансера
+        full_name [str] - Имя владельца профиля
+
+    Returns:
+        ProfileCard
+    """
+    detect_git: Optional[DetectGitEntity] = detect_git_platform(url=profile.git)
+    git = f" ● {detect_git.value}: {profile.git}\n" if detect_git else ""
+
+    site = f" ● Личный сайт: {profile.personal_site_url}\n" if detect_url(url=profile.personal_site_url) else ""
+
+    build_languages = [
+        f"<a href={lang.url}>{lang.name}</a>"
+        for lang in profile.languages
+    ]
+    languages = f" ● Опыт в языках: {','.join(build_languages)}\n" if build_languages else ""
+
+    build_stacks = [
+        f"<a href={stack.url}>{stack.name}</a>"
+        for stack in profile.stacks
+    ]
+    stacks = f" ● Стек: {','.join(build_stacks)}\n" if build_stacks else ""
+
+    reviews = f"Найдено {profile.reviews_count} отзывов <a href='www.google.com'>[Посмотреть]</a>" if profile.reviews_count else "Отзывов пока нет"
+    verification = "✅ Пользователь верифицирован" if profile.is_verified else "Пользователь не верифицирован"
+
+    text = (
+        f"<u>📂 Профиль: {full_name}</u>\n"
+        f"<i>{profile.bio or 'Био отсутствует'}</i>\n\n"
+        f"<b>{git}</b>"
+        f"<b>{site}</b>"
+        f"<b>{languages}</b>"
+        f"<b>{stacks}</b>"
+        f"<b>{reviews}</b>\n"
+        f"\n"
+        f"<b>Карма: {profile.karma} <a href='www.google.com'>[Что это?]</a></b>\n"
+        f"<i>{verification}</i> <b><a href='www.google.com'>[Что это?]</a></b>"
+    )
+    return ProfileCard(text=text)
+
+
+class ProfileCardCache:
+    """
+    LRU отрисованных карточек: одна запись на профиль, ключ версии — `updated_at` профиля, имя владельца
+    и содержимое языков и стека (их строки не меняют `updated_at` профиля).
+    Профиль определяется парой (шард, id): id профилей уникальны только внутри шарда.
+
+    Профиль, прочитанный из БД после записи, имеет новую версию, поэтому устаревшая карточка
+    не будет отдана даже без явной инвалидации (в том числе в других процессах);
+    `invalidate` лишь освобождает память сразу после записи.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self._cards: OrderedDict[Tuple[int, int], Tuple[tuple, ProfileCard]] = OrderedDict()
+
+    def get(self, profile: FreelancerProfileEntity, full_name: str, shard: int = 0) -> ProfileCard:
+        if profile.id is None:
+            return render_profile_card(profile=profile, full_name=full_name)
+
+        key = (shard, profile.id)
+        version = (
+            profile.updated_at or profile.created_at,
+            full_name,
+            tuple((lang.name, lang.url) for lang in profile.languages),
+            tuple((stack.name, stack.url) for stack in profile.stacks),
+        )
+        cached = self._cards.get(key)
+        if cached is not None and cached[0] == version:
+            self._cards.move_to_end(key)
+            PROFILE_CARD_CACHE_TOTAL.inc(result="hit")
+            return cached[1]
+
+        PROFILE_CARD_CACHE_TOTAL.inc(result="miss")
+        card = render_profile_card(profile=profile, full_name=full_name)
+        self._cards[key] = (version, card)
+        self._cards.move_to_end(key)
+        if len(self._cards) > self.max_size:
+            self._cards.popitem(last=False)
+        return card
+
+    def invalidate(self, profile_id: Optional[int], shard: int = 0) -> None:
+        self._cards.pop((shard, profile_id), None)
+
+
+PROFILE_CARDS = ProfileCardCache()
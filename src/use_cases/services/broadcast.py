@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from src.core.domain.entities import BroadcastEntity, BroadcastFailureEntity
+from src.core.domain.interfaces.database.broadcast import AbstractBroadcastRepo
+from src.infrastructure.repository.models import BroadcastStatusEnum
+
+
+class BroadcastService:
+    def __init__(self, repo: AbstractBroadcastRepo) -> None:
+        self.repo = repo
+
+    async def create(self, text: str, author_telegram_id: Optional[int] = None) -> BroadcastEntity:
+        return await self.repo.add_broadcast(broadcast=BroadcastEntity(text=text, author_telegram_id=author_telegram_id))
+
+    async def get(self, broadcast_id: int) -> Optional[BroadcastEntity]:
+        return await self.repo.get_broadcast(broadcast_id=broadcast_id)
+
+    async def get_unfinished(self) -> List[BroadcastEntity]:
+        return (
+            await self.repo.get_broadcasts_by_status(status=BroadcastStatusEnum.created)
+            + await self.repo.get_broadcasts_by_status(status=BroadcastStatusEnum.enqueuing)
+            + await self.repo.get_broadcasts_by_status(status=BroadcastStatusEnum.enqueued)
+        )
+
+    async def set_status(self, broadcast_id: int, status: BroadcastStatusEnum) -> None:
+        await self.repo.set_status(broadcast_id=broadcast_id, status=status)
+
+    async def acquire_lease(self, broadcast_id: int, producer: str, lease_ttl: float) -> Optional[BroadcastEntity]:
+        return await self.repo.acquire_lease(broadcast_id=broadcast_id, producer=producer, lease_ttl=lease_ttl)
+
+    async def save_checkpoint(
+            self,
+            broadcast_id: int,
+            producer: str,
+            lease_ttl: float,
+            last_user_id: int,
+            enqueued: int,
+            last_shard: int = 0,
+    ) -> bool:
+        return await self.repo.save_checkpoint(
+            broadcast_id=broadcast_id,
+            producer=producer,
+            lease_ttl=lease_ttl,
+            last_user_id=last_user_id,
+            enqueued=enqueued,
+            last_shard=last_shard,
+        )
+
+    async def release_lease(self, broadcast_id: int, producer: str) -> bool:
+        return await self.repo.release_lease(broadcast_id=broadcast_id, producer=producer)
+
+    async def add_progress(self, broadcast_id: int, sent: int, failed: int) -> BroadcastEntity:
+        return await self.repo.add_progress(broadcast_id=broadcast_id, sent=sent, failed=failed)
+
+    async def finish_if_complete(self, broadcast_id: int) -> bool:
+        return await self.repo.finish_if_complete(broadcast_id=broadcast_id)
+
+    async def add_failures(self, failures: List[BroadcastFailureEntity]) -> None:
+        await self.repo.add_failures(failures=failures)
@@ -2,14 +2,25 @@ from typing import Optional
 
 from src.core.domain.entities import FreelancerProfileEntity
 from src.core.domain.interfaces.database.profile import AbstractFreelancerProfileRepo
+from src.use_cases.profile_card import PROFILE_CARDS, ProfileCard
 
 
 class FreelancerProfileService:
-    def __init__(self, repo: AbstractFreelancerProfileRepo) -> None:
+    def __init__(self, repo: AbstractFreelancerProfileRepo, shard: int = 0) -> None:
+        """
+        Args:
+            shard: Шард, на котором работает `repo`: id профилей уникальны только внутри шарда
+        """
         self.repo = repo
+        self.shard = shard
 
     async def get_profile_by_user_id(self, user_id: int) -> Optional[FreelancerProfileEntity]:
         return await self.repo.get_profile_by_user_id(user_id=user_id)
 
     async def add_profile(self, profile: FreelancerProfileEntity) -> FreelancerProfileEntity:
-        return await self.repo.add_profile(profile=profile)
+        profile = await self.repo.add_profile(profile=profile)
+        PROFILE_CARDS.invalidate(profile_id=profile.id, shard=self.shard)
+        return profile
+
+    def get_card(self, profile: FreelancerProfileEntity, full_name: str) -> ProfileCard:
+        return PROFILE_CARDS.get(profile=profile, full_name=full_name, shard=self.shard)
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
-from src.core.domain.entities import UserEntity
+from src.core.domain.entities import UserEntity, BroadcastRecipientEntity
 from src.core.domain.interfaces.database.user import AbstractUserRepo
 
 
@@ -11,5 +11,11 @@ class UserService:
     async def get_user(self, user_telegram_id: int) -> Optional[UserEntity]:
         return await self.repo.get_user_by_telegram_id(user_telegram_id=user_telegram_id)
 
+    async def get_users(self, user_telegram_ids: List[int]) -> List[UserEntity]:
+        return await self.repo.get_users_by_telegram_ids(user_telegram_ids=user_telegram_ids)
+
     async def add_user(self, user: UserEntity) -> UserEntity:
         return await self.repo.add_user(user=user)
+
+    def stream_recipients(self, after_user_id: int = 0, batch_size: int = 1000) -> AsyncIterator[List[BroadcastRecipientEntity]]:
+        return self.repo.stream_recipients(after_user_id=after_user_id, batch_size=batch_size)
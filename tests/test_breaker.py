@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.resilience.breaker import BreakerState, CircuitBreaker, CircuitOpenError
+
+
+def opened(half_open_calls=2):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0, half_open_calls=half_open_calls)
+    breaker.after_call(OSError())
+    assert breaker.state == BreakerState.open
+    return breaker
+
+
+async def test_probe_slots_are_not_leaked_across_periods():
+    breaker = opened()
+    first, second = breaker.call(), breaker.call()
+    await first.__aenter__()
+    await second.__aenter__()
+    assert breaker.state == BreakerState.half_open
+
+    await first.__aexit__(None, None, None)
+    assert breaker.state == BreakerState.closed
+    # Второй пробник допущен в прошлом полуоткрытом периоде и не должен занимать слот нового
+    await second.__aexit__(None, None, None)
+
+    breaker.after_call(OSError())
+    for _ in range(2):
+        await breaker.call().__aenter__()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+async def test_stale_probe_failure_does_not_reopen_closed_breaker():
+    breaker = opened()
+    breaker.failure_threshold = 3
+    first, second = breaker.call(), breaker.call()
+    await first.__aenter__()
+    await second.__aenter__()
+
+    await first.__aexit__(None, None, None)
+    await second.__aexit__(OSError, OSError(), None)
+    assert breaker.state == BreakerState.closed
+
+
+async def test_regular_call_finishing_in_half_open_is_not_a_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0, half_open_calls=1)
+    regular = breaker.call()
+    await regular.__aenter__()
+    breaker.after_call(OSError())
+    probe = breaker.before_call()
+    assert breaker.state == BreakerState.half_open
+
+    await regular.__aexit__(None, None, None)
+    assert breaker.state == BreakerState.half_open
+    breaker.after_call(None, probe)
+    assert breaker.state == BreakerState.closed
+
+
+async def test_cancelled_probe_frees_its_slot():
+    breaker = opened(half_open_calls=1)
+
+    async def call():
+        async with breaker.call():
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert breaker.state == BreakerState.half_open
+    breaker.before_call()
@@ -0,0 +1,44 @@
+import pytest
+from aiogram.types import CallbackQuery, User
+
+from src.callbacks.user import Commands, SetRoleCallback
+from src.infrastructure.repository.models import RoleEnum
+
+
+def callback_query(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="user"), chat_instance="1", data=data)
+
+
+@pytest.mark.parametrize("role", list(RoleEnum))
+def test_enum_round_trip(role):
+    packed = SetRoleCallback(role=role).pack()
+
+    assert SetRoleCallback.unpack(packed).role is role
+
+
+@pytest.mark.parametrize("data", ["~1|z", "~1|-1", "~1|", "~1|?"])
+def test_unpack_rejects_bad_enum_index(data):
+    with pytest.raises(ValueError):
+        SetRoleCallback.unpack(data)
+
+
+@pytest.mark.parametrize("data", ["~1", "~1|1|1"])
+def test_unpack_rejects_wrong_arity(data):
+    with pytest.raises(TypeError):
+        SetRoleCallback.unpack(data)
+
+
+def test_unpack_rejects_foreign_code():
+    with pytest.raises(ValueError):
+        SetRoleCallback.unpack(Commands(command="start").pack())
+
+
+@pytest.mark.parametrize("data", ["~1|z", "~1|-1", "~1", "~2|start"])
+async def test_filter_ignores_bad_input(data):
+    assert await SetRoleCallback.filter()(callback_query(data)) is False
+
+
+async def test_filter_matches_packed_data():
+    result = await SetRoleCallback.filter()(callback_query(SetRoleCallback(role=RoleEnum.customer).pack()))
+
+    assert result["callback_data"].role is RoleEnum.customer
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import Update
+from fakeredis import FakeAsyncRedis
+
+from src.core.domain.middlewares.dedup import DeduplicationMiddleware
+from src.infrastructure.telegram.dedup import RedisUpdateClaims, UpdateWindow
+
+
+class Handler:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, event, data):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+async def redis():
+    redis = FakeAsyncRedis()
+    yield redis
+    await redis.aclose(close_connection_pool=True)
+
+
+def deliver(middleware, handler, update_id=10):
+    return middleware(handler, Update(update_id=update_id), {"bot": SimpleNamespace(id=1)})
+
+
+async def test_retry_after_failed_delivery_is_processed(redis):
+    middleware = DeduplicationMiddleware(claims=RedisUpdateClaims(redis))
+    handler = Handler(RuntimeError("webhook 500"))
+
+    with pytest.raises(RuntimeError):
+        await deliver(middleware, handler)
+    assert await deliver(middleware, handler) == "ok"
+    assert await deliver(middleware, handler) is UNHANDLED
+    assert handler.calls == 2
+
+
+async def test_retry_on_another_worker_after_failure(redis):
+    first, second = DeduplicationMiddleware(claims=RedisUpdateClaims(redis)), DeduplicationMiddleware(claims=RedisUpdateClaims(redis))
+    handler = Handler(asyncio.CancelledError())
+
+    with pytest.raises(asyncio.CancelledError):
+        await deliver(first, handler)
+    assert await deliver(second, handler) == "ok"
+    assert await deliver(first, handler) is UNHANDLED
+
+
+async def test_update_in_progress_is_not_processed_twice(redis):
+    first, second = DeduplicationMiddleware(claims=RedisUpdateClaims(redis)), DeduplicationMiddleware(claims=RedisUpdateClaims(redis))
+    started, finish = asyncio.Event(), asyncio.Event()
+
+    async def slow(event, data):
+        started.set()
+        await finish.wait()
+        return "ok"
+
+    task = asyncio.create_task(deliver(first, slow))
+    await started.wait()
+    assert await deliver(second, Handler()) is UNHANDLED
+    finish.set()
+    assert await task == "ok"
+
+
+async def test_stale_in_progress_claim_expires(redis):
+    claims = RedisUpdateClaims(redis, processing_ttl=0.05)
+
+    assert await claims.claim(1, 10)
+    assert not await claims.claim(1, 10)
+    await asyncio.sleep(0.1)
+    assert await claims.claim(1, 10)
+    await claims.confirm(1, 10)
+    assert await redis.ttl("updates:seen:1:10") > 60
+
+
+def test_window_discard():
+    window = UpdateWindow(size=64)
+    window.add(5)
+    window.add(6)
+    window.discard(5)
+
+    assert window.seen(5) is False
+    assert window.seen(6) is True
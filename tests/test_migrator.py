@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure.repository.migrator import (
+    MigrationMode,
+    PendingMigrationsError,
+    alembic_config,
+    ensure_migrations,
+    head_revisions,
+)
+
+URL = "sqlite+aiosqlite://"
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(URL)
+    yield engine
+    await engine.dispose()
+
+
+async def stamp(engine, *revisions):
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        for revision in revisions:
+            await connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+async def test_database_at_head_is_up_to_date(engine):
+    await stamp(engine, *head_revisions(alembic_config(URL)))
+
+    assert await ensure_migrations(engine, URL, MigrationMode.verify) == "up_to_date"
+
+
+async def test_database_ahead_of_build_is_accepted(engine):
+    await stamp(engine, "ffffffffffff")
+
+    assert await ensure_migrations(engine, URL, MigrationMode.verify) == "ahead"
+    assert await ensure_migrations(engine, URL, MigrationMode.upgrade) == "ahead"
+
+
+async def test_database_behind_head_is_pending(engine):
+    await stamp(engine, "8d2f4c6a1b93")
+
+    with pytest.raises(PendingMigrationsError):
+        await ensure_migrations(engine, URL, MigrationMode.verify)
+
+
+async def test_empty_database_is_pending(engine):
+    with pytest.raises(PendingMigrationsError):
+        await ensure_migrations(engine, URL, MigrationMode.verify)
@@ -0,0 +1,29 @@
+import pytest
+
+from src.infrastructure.keyboard import Paginator, SequenceSource
+from src.infrastructure.repository.query_base import AFTER, BEFORE, parse_cursor
+
+
+@pytest.mark.parametrize(("cursor", "expected"), [(">15", (AFTER, 15)), ("<3", (BEFORE, 3)), (None, (AFTER, None))])
+def test_parse_cursor(cursor, expected):
+    assert parse_cursor(cursor) == expected
+
+
+@pytest.mark.parametrize("cursor", [">", "<", "x1", ">abc", "<-1", ">1.5", ">²", "7"])
+def test_parse_cursor_falls_back_to_first_page(cursor):
+    assert parse_cursor(cursor) == (AFTER, None)
+
+
+@pytest.mark.parametrize("page", [-1, -100])
+async def test_paginator_clamps_negative_page(page):
+    source = SequenceSource(list(range(12)))
+    paginator = Paginator(
+        None,
+        source=source,
+        item_renderer=lambda item: item,
+        paginate_callback_factory=None,
+        items_per_page=5,
+        page=page,
+    )
+
+    assert (await paginator.fetch()).items == [0, 1, 2, 3, 4]
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from src.core.domain.entities import FreelancerProfileEntity, ProfileLanguageEntity, ProfileStackEntity
+from src.use_cases.profile_card import ProfileCardCache
+
+UPDATED_AT = datetime(2026, 10, 19)
+
+
+def profile(languages=(), stacks=()):
+    return FreelancerProfileEntity(
+        id=1,
+        updated_at=UPDATED_AT,
+        languages=[ProfileLanguageEntity(profile_id=1, name=name) for name in languages],
+        stacks=[ProfileStackEntity(profile_id=1, name=name) for name in stacks],
+    )
+
+
+def test_unchanged_profile_is_served_from_cache():
+    cache = ProfileCardCache()
+
+    assert cache.get(profile(languages=["Python"]), "user") is cache.get(profile(languages=["Python"]), "user")
+
+
+def test_language_and_stack_edits_render_a_new_card():
+    cache = ProfileCardCache()
+    cache.get(profile(languages=["Python"]), "user")
+
+    assert "Rust" in cache.get(profile(languages=["Python", "Rust"]), "user").text
+    assert "aiogram" in cache.get(profile(languages=["Python", "Rust"], stacks=["aiogram"]), "user").text
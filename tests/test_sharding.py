@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Update
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.domain.entities import FreelancerProfileEntity
+from src.core.domain.middlewares.database import SessionMiddleware
+from src.infrastructure.repository.sharding import ShardMap, jump_hash
+from src.use_cases.profile_card import ProfileCardCache
+
+
+def test_jump_hash_is_stable():
+    # Значения — часть схемы данных: их изменение переселяет пользователей между шардами
+    assert [jump_hash(key, 10) for key in (0, 1, 2, 42, 123456789, 2 ** 63 + 5)] == [0, 6, 6, 2, 7, 8]
+    assert jump_hash(5, 1) == 0
+
+
+def test_jump_hash_moves_keys_only_to_new_bucket():
+    for buckets in range(1, 8):
+        moved = 0
+        for key in range(5000):
+            before, after = jump_hash(key, buckets), jump_hash(key, buckets + 1)
+            if before != after:
+                assert after == buckets
+                moved += 1
+        assert moved < 5000 / (buckets + 1) * 1.2
+
+
+@pytest.fixture
+async def shards(tmp_path):
+    urls = [f"sqlite+aiosqlite:///{tmp_path / f'shard{shard}.db'}" for shard in range(3)]
+    shard_map = ShardMap(primary=create_async_engine(urls[0]), urls=urls[1:])
+    for shard, engine in enumerate(shard_map.engines):
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE TABLE users (telegram_id INTEGER PRIMARY KEY, shard INTEGER)"))
+    yield shard_map
+    await shard_map.close()
+    await shard_map.engines[0].dispose()
+
+
+async def test_fan_out_queries_each_shard_with_its_own_ids(shards):
+    telegram_ids = list(range(1, 40))
+    for telegram_id in telegram_ids:
+        shard = shards.shard_for(telegram_id)
+        async with shards.engines[shard].begin() as connection:
+            await connection.execute(text("INSERT INTO users VALUES (:id, :shard)"), {"id": telegram_id, "shard": shard})
+
+    calls = []
+
+    async def call(session, ids):
+        calls.append(ids)
+        result = await session.execute(text(f"SELECT telegram_id, shard FROM users WHERE telegram_id IN ({','.join(map(str, ids))})"))
+        return result.all()
+
+    rows = await shards.fan_out(telegram_ids, call)
+
+    assert sorted(telegram_id for telegram_id, _ in rows) == telegram_ids
+    assert all(shard == shards.shard_for(telegram_id) for telegram_id, shard in rows)
+    assert len(calls) == len(shards)
+
+
+async def test_session_middleware_opens_session_on_user_shard(shards):
+    middleware = SessionMiddleware(engine=shards.engines[0], shards=shards)
+    seen = {}
+
+    async def handler(event, data):
+        seen.update(engine=data["user_query"].repo.session.bind, shard=data["freelancer_profile_query"].shard)
+
+    for telegram_id in range(1, 20):
+        shard = shards.shard_for(telegram_id)
+        await middleware(handler, Update(update_id=telegram_id), {"event_from_user": SimpleNamespace(id=telegram_id)})
+        assert seen == {"engine": shards.engines[shard], "shard": shard}
+
+    await middleware(handler, Update(update_id=100), {})
+    assert seen == {"engine": shards.engines[0], "shard": 0}
+
+
+def test_profile_cards_of_same_id_on_different_shards_do_not_collide():
+    cache = ProfileCardCache()
+    profile = FreelancerProfileEntity(id=1, user_id=1, bio="первый шард")
+    other = FreelancerProfileEntity(id=1, user_id=1, bio="второй шард")
+
+    assert "первый шард" in cache.get(profile, "Анна", shard=0).text
+    assert "второй шард" in cache.get(other, "Анна", shard=1).text
+
+    cache.invalidate(profile_id=1, shard=1)
+    assert cache.get(profile, "Анна", shard=0) is cache.get(profile, "Анна", shard=0)
@@ -0,0 +1,34 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+from src.infrastructure.configuration.snapshot import load_settings, read_snapshot
+hit = read_snapshot() is not None
+load_settings()
+print("hit" if hit else "miss")
+"""
+
+
+def start_process(workdir: Path) -> str:
+    env = {key: value for key, value in os.environ.items() if "__" not in key}
+    env.update(PYTHONPATH=str(ROOT), SETTINGS_SNAPSHOT=str(workdir / ".cache" / "settings.msgpack"))
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_second_process_reads_snapshot_with_env_file(tmp_path):
+    (tmp_path / "src" / "config").mkdir(parents=True)
+    shutil.copy(ROOT / "src" / "config" / "settings.yml", tmp_path / "src" / "config" / "settings.yml")
+    # Deployment layout from `make denv`: overrides live in .env, not in the environment
+    (tmp_path / ".env").write_text("APPLICATION__TOKEN=42:TEST\nPOSTGRESQL__DB=bot\n")
+
+    assert start_process(tmp_path) == "miss"
+    assert start_process(tmp_path) == "hit"
+
+    (tmp_path / ".env").write_text("APPLICATION__TOKEN=42:OTHER\nPOSTGRESQL__DB=bot\n")
+    assert start_process(tmp_path) == "miss"